@@ -0,0 +1,88 @@
+# benchmarks/bench_separation.py
+# Mede o tempo de frame com 15, 100 e 500 inimigos, comparando a separação
+# antiga (todos contra todos) com a nova (hash espacial).
+#
+#   python benchmarks/bench_separation.py [--frames 120] [--counts 15 100 500]
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import main
+from enemy import Enemy
+from settings import *
+
+def brute_force_separation(self):
+    # Versão antiga: compara com todos os inimigos do grupo
+    for enemy in self.all_enemies:
+        if enemy != self:
+            if self.hitbox.colliderect(enemy.hitbox):
+                push_direction = pygame.math.Vector2(self.hitbox.center) - pygame.math.Vector2(enemy.hitbox.center)
+                if push_direction.magnitude() > 0:
+                    push_direction = push_direction.normalize()
+                    self.pos += push_direction * 0.5
+                    self.hitbox.center = round(self.pos.x), round(self.pos.y)
+                    self.rect.center = self.hitbox.center
+
+def populate(game, amount):
+    game.enemy_sprites.empty()
+    for sprite in game.visible_sprites.sprites():
+        if sprite is not game.player: sprite.kill()
+    player_center = pygame.math.Vector2(game.player.rect.center)
+    candidates = [t for t in game.world.data.spawn_tiles()
+                  if (pygame.math.Vector2(t) * TILE_SIZE - player_center).magnitude() < 1200]
+    enemy_types = [e for e in main.ENEMIES_DATA if e not in ('minion', 'lucifer')]
+    for _ in range(amount):
+        col, row = random.choice(candidates)
+        pos = (col * TILE_SIZE + TILE_SIZE // 2, row * TILE_SIZE + TILE_SIZE // 2)
+        Enemy(pos, [game.visible_sprites, game.enemy_sprites], game.player, game.enemy_sprites,
+              random.choice(enemy_types), lambda *args: None, game.hud, game.collision_grid, game.game_clock)
+
+def measure(game, amount, frames, separation):
+    game.setup_map(amount)
+    populate(game, amount)
+    Enemy.check_separation = separation
+    spent = [0.0]
+    def timed(self):
+        start = time.perf_counter()
+        separation(self)
+        spent[0] += time.perf_counter() - start
+    Enemy.check_separation = timed
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.enemy_sprites.rebuild_hash()
+        game.visible_sprites.update()
+        game.visible_sprites.custom_draw(game.player)
+    total = time.perf_counter() - start
+    return total / frames * 1000, spent[0] / frames * 1000
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--counts', type=int, nargs='+', default=[15, 100, 500])
+    args = parser.parse_args()
+
+    game = main.Game()
+    game.apply_difficulty('MEDIUM')
+    game.max_enemies = max(args.counts)
+    spatial_separation = Enemy.check_separation
+
+    print(f"{'inimigos':>9} | {'antes frame':>12} {'(separação)':>12} | {'depois frame':>12} {'(separação)':>12}")
+    for amount in args.counts:
+        before = measure(game, amount, args.frames, brute_force_separation)
+        after = measure(game, amount, args.frames, spatial_separation)
+        print(f"{amount:>9} | {before[0]:>9.2f} ms {before[1]:>9.2f} ms | {after[0]:>9.2f} ms {after[1]:>9.2f} ms")
+    Enemy.check_separation = spatial_separation
+    pygame.quit()
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,250 @@
+# benchmarks/suite.py
+# Cenários repetíveis montados com as classes do jogo (mapa com semente,
+# inimigos de cada tipo, balas, partículas, luta contra o boss e geração de
+# mapa). Mede update, colisão e desenho separados, sem janela, e grava JSON.
+#
+#   python benchmarks/suite.py [--frames 300] [--scenarios enemies boss ...]
+#                              [--output resultados.json] [--maps mapas.avsm]
+#                              [--baseline base.json --threshold 10]
+#
+# Com --maps (biblioteca gerada por map_data.py), os mapas das sementes
+# usadas vêm do disco em vez de serem gerados.
+# Com --baseline, compara a mediana de cada fase com a do arquivo salvo e
+# termina com código 1 se alguma piorou mais que --threshold por cento.
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import platform
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+import main
+from enemy import Enemy, Boss
+from player import Player
+from particles import Particle
+from map_data import MapGenerator, MapLibrary
+from game_clock import GameClock
+from settings import *
+
+SCENARIOS = ['enemies', 'bullets', 'particles', 'boss', 'mapgen']
+
+# -------------------------------------------------------------
+# MONTAGEM DOS CENÁRIOS
+# -------------------------------------------------------------
+def reset(game, seed):
+    game.game_clock.reset()
+    game.apply_difficulty('MEDIUM')
+    game.setup_map(seed) # Também semeia o random global
+    game.game_state = 'playing'
+    game.max_enemies = 0 # Sem spawn automático: a carga é só a do cenário
+    game.player.die = lambda: None # Player imortal, senão o combate para
+
+def tiles_near(game, distance=1200):
+    center = pygame.math.Vector2(game.player.rect.center)
+    return [tile for tile in game.world.data.spawn_tiles()
+            if (pygame.math.Vector2(tile) * TILE_SIZE - center).magnitude() < distance]
+
+def fill_enemies(game, per_type, candidates):
+    alive = {}
+    for enemy in game.enemy_sprites:
+        alive[enemy.enemy_name] = alive.get(enemy.enemy_name, 0) + 1
+    for enemy_name in ENEMIES_DATA:
+        if enemy_name == 'lucifer': continue
+        for _ in range(per_type - alive.get(enemy_name, 0)):
+            col, row = random.choice(candidates)
+            pos = (col * TILE_SIZE + TILE_SIZE // 2, row * TILE_SIZE + TILE_SIZE // 2)
+            Enemy(pos, [game.visible_sprites, game.enemy_sprites], game.player, game.enemy_sprites,
+                  enemy_name, game.spawn_specific_enemy, game.hud, game.collision_grid, game.game_clock)
+
+def fill_bullets(game, amount):
+    stats = WEAPONS_DATA['machinegun']
+    for _ in range(amount - len(game.bullet_sprites)):
+        pos = (game.player.rect.centerx + random.uniform(-400, 400), game.player.rect.centery + random.uniform(-300, 300))
+        game.create_bullet(pos, random.uniform(0, 360), stats['bullet_speed'], stats['bullet_lifetime'],
+                           stats['color'], stats['damage'])
+
+def fill_particles(game, amount):
+    system = game.visible_sprites.particles
+    system.budget = max(system.budget, amount)
+    for _ in range(amount - len(system)):
+        pos = (game.player.rect.centerx + random.uniform(-600, 600), game.player.rect.centery + random.uniform(-340, 340))
+        Particle(pos, [game.visible_sprites], game.collision_grid, lifetime_range=(400, 800))
+
+# -------------------------------------------------------------
+# MEDIÇÃO
+# -------------------------------------------------------------
+def summarize(samples):
+    values = np.array(samples) * 1000
+    return {'mean_ms': round(float(values.mean()), 4), 'median_ms': round(float(np.median(values)), 4),
+            'p95_ms': round(float(np.percentile(values, 95)), 4), 'max_ms': round(float(values.max()), 4)}
+
+def run_frames(game, frames, warmup, refill):
+    """Roda `warmup` + `frames` passos; `refill()` repõe a carga fora da medição.
+    Update e colisão são medidos embrulhando os métodos que update_playing chama."""
+    timings = {'update': [], 'collision': [], 'draw': [], 'frame': []}
+    counts = {'enemies': [], 'bullets': [], 'enemy_bullets': [], 'particles': []}
+    current = {}
+
+    def timed(phase, method):
+        def wrapper():
+            start = time.perf_counter()
+            method()
+            current[phase] = current.get(phase, 0.0) + time.perf_counter() - start
+        return wrapper
+    game.update_entities = timed('update', game.update_entities)
+    game.resolve_collisions = timed('collision', game.resolve_collisions)
+
+    for frame in range(warmup + frames):
+        refill()
+        game.hud.score = 0 # O placar não pode disparar a troca para a arena do boss
+        current.clear()
+        start = time.perf_counter()
+        game.update_playing()
+        draw_start = time.perf_counter()
+        game.draw_playing()
+        end = time.perf_counter()
+        if frame < warmup: continue
+        timings['update'].append(current.get('update', 0.0))
+        timings['collision'].append(current.get('collision', 0.0))
+        timings['draw'].append(end - draw_start)
+        timings['frame'].append(end - start)
+        counts['enemies'].append(len(game.enemy_sprites))
+        counts['bullets'].append(len(game.bullet_sprites))
+        counts['enemy_bullets'].append(len(game.enemy_bullet_sprites))
+        counts['particles'].append(len(game.visible_sprites.particles))
+
+    del game.update_entities, game.resolve_collisions
+    return {'phases': {phase: summarize(samples) for phase, samples in timings.items()},
+            'counts': {name: round(statistics.mean(values), 1) for name, values in counts.items()}}
+
+def scenario_enemies(game, args):
+    reset(game, args.seed)
+    candidates = tiles_near(game)
+    return run_frames(game, args.frames, args.warmup, lambda: fill_enemies(game, args.enemies, candidates))
+
+def scenario_bullets(game, args):
+    reset(game, args.seed)
+    return run_frames(game, args.frames, args.warmup, lambda: fill_bullets(game, args.bullets))
+
+def scenario_particles(game, args):
+    reset(game, args.seed)
+    return run_frames(game, args.frames, args.warmup, lambda: fill_particles(game, args.particles))
+
+def scenario_boss(game, args):
+    reset(game, args.seed)
+    game.start_boss_fight()
+    boss = next(enemy for enemy in game.enemy_sprites if isinstance(enemy, Boss))
+    frame = [0]
+    def volley():
+        # Fica na fase 2 (a mais pesada) e nunca morre: a luta não acaba no meio
+        boss.health = max(boss.health, boss.stats['phase_2_threshold'] * 0.8)
+        frame[0] += 1
+        if frame[0] % args.volley_interval == 0 and boss.alive(): boss.shoot_circle()
+    result = run_frames(game, args.frames, args.warmup, volley)
+    game.boss_fight_active = False
+    return result
+
+def scenario_mapgen(game, args):
+    timings = {'generate': [], 'arena': [], 'setup_map': [], 'setup_prefetched': []}
+    for repeat in range(args.map_repeats):
+        random.seed(args.seed + repeat)
+        start = time.perf_counter()
+        MapGenerator().get_map()
+        timings['generate'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        MapGenerator().generate_arena()
+        timings['arena'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        game.setup_map(args.seed + repeat)
+        timings['setup_map'].append(time.perf_counter() - start)
+        # Mapa já gerado na thread: no frame fica só a montagem dos sprites
+        game.prefetch_map(args.seed + repeat) # (com biblioteca não há o que pré-gerar)
+        if game.next_map: game.next_map[1].result()
+        start = time.perf_counter()
+        game.setup_map(args.seed + repeat)
+        timings['setup_prefetched'].append(time.perf_counter() - start)
+        if args.maps:
+            start = time.perf_counter()
+            MapLibrary(args.maps).get(args.seed + repeat)
+            timings.setdefault('library_load', []).append(time.perf_counter() - start)
+    return {'phases': {phase: summarize(samples) for phase, samples in timings.items()}, 'counts': {}}
+
+# -------------------------------------------------------------
+# COMPARAÇÃO COM A BASE
+# -------------------------------------------------------------
+def compare(results, baseline, threshold, min_ms):
+    """Lista de (cenário, fase, base, atual, variação %) e se alguma passou do limite."""
+    rows, failed = [], False
+    for name, scenario in results['scenarios'].items():
+        base_scenario = baseline.get('scenarios', {}).get(name)
+        if base_scenario is None: continue
+        for phase, stats in scenario['phases'].items():
+            base_stats = base_scenario['phases'].get(phase)
+            if base_stats is None: continue
+            base, now = base_stats['median_ms'], stats['median_ms']
+            change = (now - base) / base * 100 if base else 0.0
+            # Fases muito curtas são só ruído
+            regressed = change > threshold and max(base, now) >= min_ms
+            failed |= regressed
+            rows.append((name, phase, base, now, change, regressed))
+    return rows, failed
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--enemies', type=int, default=10, help='inimigos de cada tipo')
+    parser.add_argument('--bullets', type=int, default=200)
+    parser.add_argument('--particles', type=int, default=1000)
+    parser.add_argument('--volley-interval', type=int, default=30, help='frames entre rajadas do boss')
+    parser.add_argument('--map-repeats', type=int, default=5)
+    parser.add_argument('--maps', default=None, help='biblioteca de mapas pré-gerados')
+    parser.add_argument('--output', default=None, help='arquivo JSON com os resultados')
+    parser.add_argument('--baseline', default=None, help='JSON de uma execução anterior')
+    parser.add_argument('--threshold', type=float, default=10.0, help='piora máxima aceita (%%)')
+    parser.add_argument('--min-ms', type=float, default=0.05, help='ignora fases com mediana abaixo disso')
+    args = parser.parse_args()
+
+    # Relógio próprio: os cenários não dependem do relógio global
+    game = main.Game(headless=True, autopilot_seed=args.seed, map_library=args.maps, clock=GameClock())
+    # Sem janela o Game desliga a montagem das imagens; aqui ela faz parte do que é medido
+    Player.render = Enemy.render = True
+    results = {
+        'meta': {'python': platform.python_version(), 'pygame': pygame.version.ver, 'numpy': np.__version__,
+                 'platform': platform.platform(), 'args': vars(args)},
+        'scenarios': {},
+    }
+    for name in args.scenarios:
+        results['scenarios'][name] = globals()[f'scenario_{name}'](game, args)
+        phases = results['scenarios'][name]['phases']
+        print(f"{name:>10} | " + '  '.join(f"{phase} {stats['median_ms']:.3f} ms" for phase, stats in phases.items()))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        rows, failed = compare(results, baseline, args.threshold, args.min_ms)
+        print(f"\n{'cenário':>10} {'fase':>10} | {'base':>9} {'atual':>9} | variação")
+        for name, phase, base, now, change, regressed in rows:
+            print(f"{name:>10} {phase:>10} | {base:>6.3f} ms {now:>6.3f} ms | {change:+6.1f}%{'  <-- PIOROU' if regressed else ''}")
+    pygame.quit()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -0,0 +1,315 @@
+# collision.py
+import math
+import numpy as np
+from settings import *
+
+# Camadas do índice de colisão
+WALL_LAYER = 'wall'
+LAVA_LAYER = 'lava'
+MOVEMENT_LAYERS = (WALL_LAYER, LAVA_LAYER)
+
+# Célula de um chunk que ainda não foi trazido do mundo
+UNLOADED = object()
+
+# -------------------------------------------------------------
+# ÍNDICE DE COLISÃO POR GRADE DE TILES
+# -------------------------------------------------------------
+class CollisionGrid:
+    """Guarda os retângulos dos tiles estáticos indexados por (coluna, linha).
+    Uma consulta AABB só olha os tiles que o retângulo encosta.
+
+    Com um `World`, as células são trazidas chunk a chunk na primeira
+    consulta que passa por elas (as vazias ficam guardadas como None) e
+    somem quando o mundo descarta o chunk."""
+
+    def __init__(self):
+        self.layers = {WALL_LAYER: {}, LAVA_LAYER: {}}
+        # Quanto o rect de um tile pode "vazar" para fora da sua célula
+        # (a parede tem a frente desenhada 20px acima da célula)
+        self.margins = {WALL_LAYER: 0, LAVA_LAYER: 0}
+        # Camadas com algum tile (as vazias nem são percorridas)
+        self.present = {WALL_LAYER: False, LAVA_LAYER: False}
+        # Matrizes de ocupação para consultas vetorizadas (montadas sob demanda)
+        self.occupancy_cache = {}
+        self.world = None
+
+    def clear(self):
+        for layer in self.layers.values():
+            layer.clear()
+        for name in self.margins:
+            self.margins[name] = 0
+            self.present[name] = False
+        self.occupancy_cache.clear()
+        self.world = None
+
+    def set_world(self, world):
+        self.clear()
+        self.world = world
+        self.margins.update(world.margins)
+        self.present.update(world.present)
+        world.on_evict.append(self.drop_chunk)
+
+    def load_cell(self, layer, col, row):
+        """Rect (ou None) de uma célula ainda não vista: traz o chunk inteiro."""
+        if self.world is None: return None
+        chunk_col, chunk_row = col // CHUNK_TILES, row // CHUNK_TILES
+        rects = self.world.chunk(chunk_col, chunk_row).rects
+        cells = [(cell_col, cell_row)
+                 for cell_row in range(chunk_row * CHUNK_TILES, (chunk_row + 1) * CHUNK_TILES)
+                 for cell_col in range(chunk_col * CHUNK_TILES, (chunk_col + 1) * CHUNK_TILES)]
+        for name, layer_cells in self.layers.items():
+            chunk_rects = rects[name]
+            for cell in cells:
+                layer_cells[cell] = chunk_rects.get(cell)
+        return self.layers[layer][(col, row)]
+
+    def drop_chunk(self, key):
+        chunk_col, chunk_row = key
+        for layer_cells in self.layers.values():
+            for row in range(chunk_row * CHUNK_TILES, (chunk_row + 1) * CHUNK_TILES):
+                for col in range(chunk_col * CHUNK_TILES, (chunk_col + 1) * CHUNK_TILES):
+                    layer_cells.pop((col, row), None)
+
+    def add(self, layer, col, row, rect):
+        self.layers[layer][(col, row)] = rect
+        self.present[layer] = True
+        self.occupancy_cache.pop(layer, None)
+        cell_x = col * TILE_SIZE
+        cell_y = row * TILE_SIZE
+        overflow = max(cell_x - rect.left, cell_y - rect.top,
+                       rect.right - (cell_x + TILE_SIZE), rect.bottom - (cell_y + TILE_SIZE))
+        if overflow > self.margins[layer]:
+            self.margins[layer] = overflow
+
+    def query(self, rect, layers=MOVEMENT_LAYERS):
+        """Gera os rects que colidem com `rect`, na mesma ordem em que o grupo
+        de sprites antigo era percorrido (camada por camada, linha por linha).
+        O chamador pode empurrar `rect` entre uma iteração e outra: a faixa de
+        células é recalculada a cada passo, como no laço antigo."""
+        for name in layers:
+            if not self.present[name]: continue
+            cells = self.layers[name]
+            margin = self.margins[name]
+            row = (rect.top - margin) // TILE_SIZE
+            while row <= (rect.bottom + margin - 1) // TILE_SIZE:
+                col = (rect.left - margin) // TILE_SIZE
+                while col <= (rect.right + margin - 1) // TILE_SIZE:
+                    tile_rect = cells.get((col, row), UNLOADED)
+                    if tile_rect is UNLOADED: tile_rect = self.load_cell(name, col, row)
+                    if tile_rect is not None and tile_rect.colliderect(rect):
+                        yield tile_rect
+                    col += 1
+                row += 1
+
+    def collides(self, rect, layers=MOVEMENT_LAYERS):
+        for _ in self.query(rect, layers):
+            return True
+        return False
+
+    def occupancy(self, layer):
+        """Matriz (linhas, colunas, 4) com left/top/right/bottom do tile de cada
+        célula; células vazias ficam com tamanho zero e nunca colidem."""
+        bounds = self.occupancy_cache.get(layer)
+        if bounds is None:
+            cells = self.layers[layer]
+            cols = max((col for col, _ in cells), default=-1) + 1
+            rows = max((row for _, row in cells), default=-1) + 1
+            bounds = np.zeros((rows, cols, 4), dtype=np.int32)
+            for (col, row), rect in cells.items():
+                bounds[row, col] = (rect.left, rect.top, rect.right, rect.bottom)
+            self.occupancy_cache[layer] = bounds
+        return bounds
+
+    def collides_many(self, lefts, tops, rights, bottoms, layers=MOVEMENT_LAYERS):
+        """Versão vetorizada de `collides` para vários rects de uma vez (arrays
+        de inteiros), com o mesmo teste exato do colliderect."""
+        hit = np.zeros(len(lefts), dtype=bool)
+        if not len(lefts): return hit
+        origin_x = origin_y = 0
+        if self.world is not None:
+            # Com um World, a ocupação sai da grade só numa janela alinhada aos
+            # chunks (costuma ser a mesma de um frame para o outro); as células
+            # passam a ser contadas a partir do canto dela
+            reach = max(self.margins[name] for name in layers)
+            chunk_px = CHUNK_TILES * TILE_SIZE
+            window = (max(int(tops.min()) - reach, 0) // chunk_px * CHUNK_TILES,
+                      (int(bottoms.max()) + reach) // chunk_px * CHUNK_TILES + CHUNK_TILES,
+                      max(int(lefts.min()) - reach, 0) // chunk_px * CHUNK_TILES,
+                      (int(rights.max()) + reach) // chunk_px * CHUNK_TILES + CHUNK_TILES)
+            origin_y, origin_x = window[0] * TILE_SIZE, window[2] * TILE_SIZE
+        for name in layers:
+            if not self.present[name]: continue
+            if self.world is not None:
+                cached = self.occupancy_cache.get(name)
+                if cached is None or cached[0] != window:
+                    cached = self.occupancy_cache[name] = (window, self.world.cell_bounds(name, *window))
+                bounds = cached[1]
+            else:
+                bounds = self.occupancy(name)
+            if bounds.size == 0: continue
+            margin = self.margins[name]
+            rows, cols = bounds.shape[:2]
+            start_col = (lefts - (margin + origin_x)) // TILE_SIZE
+            end_col = (rights + (margin - 1 - origin_x)) // TILE_SIZE
+            start_row = (tops - (margin + origin_y)) // TILE_SIZE
+            end_row = (bottoms + (margin - 1 - origin_y)) // TILE_SIZE
+            span_col = int(np.max(end_col - start_col, initial=0))
+            span_row = int(np.max(end_row - start_row, initial=0))
+            for d_row in range(span_row + 1):
+                row = start_row + d_row
+                for d_col in range(span_col + 1):
+                    col = start_col + d_col
+                    inside = (row <= end_row) & (col <= end_col) & (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+                    if not inside.any(): continue
+                    tile = bounds[row[inside], col[inside]]
+                    hit[inside] |= ((tile[:, 0] < rights[inside]) & (lefts[inside] < tile[:, 2]) &
+                                    (tile[:, 1] < bottoms[inside]) & (tops[inside] < tile[:, 3]))
+        return hit
+
+    def raycast(self, start, end, half_size=(0, 0), layers=(WALL_LAYER,)):
+        """Percorre as células da grade entre `start` e `end` (DDA) e retorna o
+        rect do primeiro tile atingido por um retângulo de meia-largura
+        `half_size` que viaja nesse caminho, ou None."""
+        x0, y0 = start
+        dx, dy = end[0] - x0, end[1] - y0
+        half_w, half_h = half_size
+        reach = max([self.margins[name] for name in layers] + [0])
+        reach = int((reach + max(half_w, half_h)) // TILE_SIZE) + 1
+
+        col, row = int(x0 // TILE_SIZE), int(y0 // TILE_SIZE)
+        end_col, end_row = int(end[0] // TILE_SIZE), int(end[1] // TILE_SIZE)
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+        next_t_col = ((col + (dx > 0)) * TILE_SIZE - x0) / dx if dx else math.inf
+        next_t_row = ((row + (dy > 0)) * TILE_SIZE - y0) / dy if dy else math.inf
+        delta_t_col = TILE_SIZE / abs(dx) if dx else math.inf
+        delta_t_row = TILE_SIZE / abs(dy) if dy else math.inf
+
+        best_rect, best_t = None, math.inf
+        checked = set()
+        while True:
+            # Um tile pode vazar para a célula vizinha (frente da parede + tamanho do tiro)
+            for near_row in range(row - reach, row + reach + 1):
+                for near_col in range(col - reach, col + reach + 1):
+                    for name in layers:
+                        tile_rect = self.layers[name].get((near_col, near_row), UNLOADED)
+                        if tile_rect is UNLOADED: tile_rect = self.load_cell(name, near_col, near_row)
+                        if tile_rect is None or (name, near_col, near_row) in checked: continue
+                        checked.add((name, near_col, near_row))
+                        t = segment_enter_time(x0, y0, dx, dy, tile_rect, half_w, half_h)
+                        if t is not None and t < best_t:
+                            best_rect, best_t = tile_rect, t
+            # O primeiro acerto já está garantido quando a célula atual termina depois dele
+            cell_exit_t = min(next_t_col, next_t_row)
+            if best_t <= cell_exit_t or cell_exit_t >= 1.0 or (col, row) == (end_col, end_row):
+                break
+            if next_t_col < next_t_row:
+                col += step_col
+                next_t_col += delta_t_col
+            else:
+                row += step_row
+                next_t_row += delta_t_row
+        return best_rect
+
+def segment_enter_time(x0, y0, dx, dy, rect, half_w, half_h):
+    """Instante (0..1) em que o segmento entra no rect expandido, ou None."""
+    t_enter, t_exit = 0.0, 1.0
+    for origin, delta, low, high in ((x0, dx, rect.left - half_w, rect.right + half_w),
+                                     (y0, dy, rect.top - half_h, rect.bottom + half_h)):
+        if delta == 0:
+            if not low < origin < high: return None
+            continue
+        t_low = (low - origin) / delta
+        t_high = (high - origin) / delta
+        if t_low > t_high: t_low, t_high = t_high, t_low
+        t_enter = max(t_enter, t_low)
+        t_exit = min(t_exit, t_high)
+        if t_enter >= t_exit: return None
+    return t_enter
+
+# -------------------------------------------------------------
+# HASH ESPACIAL (VIZINHANÇA ENTRE INIMIGOS)
+# -------------------------------------------------------------
+class SpatialHash:
+    """Baldes uniformes de `cell_size` pixels. É reconstruído uma vez por frame;
+    cada sprite entra em todos os baldes que a hitbox dele encosta."""
+
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE):
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.order = {}
+
+    def rebuild(self, sprites):
+        self.buckets.clear()
+        self.order.clear()
+        size = self.cell_size
+        for index, sprite in enumerate(sprites):
+            self.order[sprite] = index
+            box = sprite.hitbox
+            for row in range(box.top // size, (box.bottom - 1) // size + 1):
+                for col in range(box.left // size, (box.right - 1) // size + 1):
+                    bucket = self.buckets.get((col, row))
+                    if bucket is None:
+                        self.buckets[(col, row)] = [sprite]
+                    else:
+                        bucket.append(sprite)
+
+    def query(self, rect):
+        """Sprites dos baldes que `rect` encosta, na ordem em que foram inseridos."""
+        size = self.cell_size
+        found = set()
+        for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for col in range(rect.left // size, (rect.right - 1) // size + 1):
+                bucket = self.buckets.get((col, row))
+                if bucket: found.update(bucket)
+        return sorted(found, key=self.order.__getitem__)
+
+# -------------------------------------------------------------
+# BROAD PHASE DO COMBATE (SWEEP AND PRUNE NO EIXO X)
+# -------------------------------------------------------------
+BULLET, ENEMY, PLAYER, ENEMY_BULLET = 0, 1, 2, 3
+
+def find_combat_contacts(player, bullets, enemies, enemy_bullets):
+    """Ordena tudo pelo x da hitbox e varre uma vez só, testando apenas os pares
+    que se sobrepõem no eixo x. Retorna:
+      - {bala: [inimigos]} na ordem dos grupos (igual ao groupcollide)
+      - inimigos encostando no player
+      - balas inimigas encostando no player"""
+    entries = []
+    for kind, group in ((BULLET, bullets), (ENEMY, enemies), (ENEMY_BULLET, enemy_bullets)):
+        for order, sprite in enumerate(group):
+            entries.append((sprite.hitbox.left, kind, order, sprite))
+    entries.append((player.hitbox.left, PLAYER, 0, player))
+    entries.sort(key=lambda entry: entry[:3])
+
+    # Pares que cada tipo precisa testar
+    partners = {BULLET: (ENEMY,), ENEMY: (BULLET, PLAYER), PLAYER: (ENEMY, ENEMY_BULLET), ENEMY_BULLET: (PLAYER,)}
+    active = {BULLET: [], ENEMY: [], PLAYER: [], ENEMY_BULLET: []}
+    bullet_pairs = []
+    enemy_contacts = []
+    bullet_contacts = []
+
+    for left, kind, order, sprite in entries:
+        hitbox = sprite.hitbox
+        for other_kind in partners[kind]:
+            still_active = []
+            for other_order, other in active[other_kind]:
+                other_box = other.hitbox
+                if other_box.right < left: continue # Já ficou para trás no eixo x
+                still_active.append((other_order, other))
+                if not hitbox.colliderect(other_box): continue
+                if kind == BULLET: bullet_pairs.append((order, other_order, sprite, other))
+                elif other_kind == BULLET: bullet_pairs.append((other_order, order, other, sprite))
+                elif kind == PLAYER:
+                    (enemy_contacts if other_kind == ENEMY else bullet_contacts).append((other_order, other))
+                else:
+                    (enemy_contacts if kind == ENEMY else bullet_contacts).append((order, sprite))
+            active[other_kind] = still_active
+        active[kind].append((order, sprite))
+
+    bullet_hits = {}
+    for _, _, bullet, enemy in sorted(bullet_pairs, key=lambda pair: pair[:2]):
+        bullet_hits.setdefault(bullet, []).append(enemy)
+    enemy_contacts = [sprite for _, sprite in sorted(enemy_contacts, key=lambda pair: pair[0])]
+    bullet_contacts = [sprite for _, sprite in sorted(bullet_contacts, key=lambda pair: pair[0])]
+    return bullet_hits, enemy_contacts, bullet_contacts
@@ -0,0 +1,96 @@
+# controls.py
+import math
+import random
+import pygame
+from settings import *
+
+# -------------------------------------------------------------
+# ENTRADA DE UM FRAME
+# -------------------------------------------------------------
+class PressedKeys(frozenset):
+    """Conjunto de teclas que responde como o retorno de pygame.key.get_pressed()."""
+    def __getitem__(self, key):
+        return key in self
+
+class InputState:
+    """Teclas, botões do mouse e ponto de mira (em coordenadas do mundo)."""
+    __slots__ = ('keys', 'mouse_buttons', 'aim')
+
+    def __init__(self, keys, mouse_buttons, aim):
+        self.keys = keys
+        self.mouse_buttons = mouse_buttons
+        self.aim = aim
+
+# -------------------------------------------------------------
+# CONTROLES
+# -------------------------------------------------------------
+class KeyboardMouse:
+    """Teclado e mouse de verdade; a mira é o mouse convertido pela câmera
+    do último desenho (a que o jogador está vendo)."""
+    def read(self, player):
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        offset = player.camera_group.draw_offset
+        return InputState(pygame.key.get_pressed(), pygame.mouse.get_pressed(),
+                          (mouse_x + offset.x, mouse_y + offset.y))
+
+class AutoPilot:
+    """Jogador automático para rodar sem janela: vai atrás do inimigo mais
+    próximo (desviando quando trava numa parede), foge de quem chega perto,
+    mira e atira nele, recarrega quando acaba a munição e alterna as armas.
+    Usa um gerador próprio para não mexer no random global."""
+
+    DIRECTIONS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+    MOVE_KEYS = {-1: (pygame.K_a, pygame.K_w), 1: (pygame.K_d, pygame.K_s)}
+    WEAPON_KEYS = (pygame.K_1, pygame.K_2, pygame.K_3)
+
+    def __init__(self, enemies, seed=0, flee_distance=200, shoot_distance=800, weapon_interval=600):
+        self.enemies = enemies
+        self.rng = random.Random(seed)
+        self.flee_distance = flee_distance
+        self.shoot_distance = shoot_distance
+        self.weapon_interval = weapon_interval
+        self.direction = self.rng.choice(self.DIRECTIONS)
+        self.direction_frames = 0
+        self.last_pos = None
+        self.frame = 0
+        self.aim = (0, 0)
+
+    def read(self, player):
+        self.frame += 1
+        center = player.hitbox.center
+        nearest, nearest_distance = None, math.inf
+        for enemy in self.enemies:
+            distance = math.hypot(enemy.hitbox.centerx - center[0], enemy.hitbox.centery - center[1])
+            if distance < nearest_distance:
+                nearest, nearest_distance = enemy, distance
+
+        # Movimento: foge de quem está perto, vai atrás de quem está longe;
+        # travou numa parede, desvia numa direção sorteada por um tempo
+        stuck = self.last_pos == center
+        self.last_pos = center
+        self.direction_frames -= 1
+        if nearest is not None and nearest_distance < self.flee_distance:
+            self.direction = self.heading(center, nearest.hitbox.center, -1)
+        elif stuck or (nearest is None and self.direction_frames <= 0):
+            self.direction = self.rng.choice(self.DIRECTIONS)
+            self.direction_frames = self.rng.randint(30, 180)
+        elif nearest is not None and nearest_distance > self.shoot_distance and self.direction_frames <= 0:
+            self.direction = self.heading(center, nearest.hitbox.center, 1)
+
+        keys = set()
+        if self.direction[0]: keys.add(self.MOVE_KEYS[self.direction[0]][0])
+        if self.direction[1]: keys.add(self.MOVE_KEYS[self.direction[1]][1])
+        if player.current_ammo == 0: keys.add(pygame.K_r)
+        if self.frame % self.weapon_interval == 0:
+            keys.add(self.WEAPON_KEYS[(self.frame // self.weapon_interval) % len(self.WEAPON_KEYS)])
+
+        shooting = nearest is not None and nearest_distance < self.shoot_distance
+        if nearest is not None: self.aim = nearest.hitbox.center
+        return InputState(PressedKeys(keys), (shooting, False, False), self.aim)
+
+    @staticmethod
+    def heading(origin, target, sign):
+        """Direção (-1/0/1 em cada eixo) para `target` (sign=1) ou para longe dele (-1)."""
+        dx, dy = target[0] - origin[0], target[1] - origin[1]
+        return (sign * int(math.copysign(1, dx)) if abs(dx) > 8 else 0,
+                sign * int(math.copysign(1, dy)) if abs(dy) > 8 else 0)
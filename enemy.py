@@ -2,14 +2,21 @@
 import pygame
 import math
 import random 
+import numpy as np
 from settings import *
+from game_clock import game_clock
 from particles import Particle
+from surface_cache import glow_surface
 
 class Enemy(pygame.sprite.Sprite):
+    # Desligado no modo sem janela: a imagem não é montada (o estado anima igual)
+    render = True
+
     # Novos argumentos: spawn_callback e hud
-    def __init__(self, pos, groups, player, all_enemies, obstacle_sprites, enemy_name, spawn_callback, hud): 
+    def __init__(self, pos, groups, player, all_enemies, enemy_name, spawn_callback, hud, collision_grid, clock=game_clock): 
         super().__init__(groups)
         
+        self.clock = clock
         self.enemy_name = enemy_name
         self.stats = ENEMIES_DATA[enemy_name]
         
@@ -24,9 +31,10 @@ class Enemy(pygame.sprite.Sprite):
         self.color = self.stats['color']
         
         # --- VISUAL ---
+        # O quadro (self.image) vem do atlas compartilhado do tipo; ver animate
         visual_padding = 50
         self.image_size = self.size + visual_padding
-        self.image = pygame.Surface((self.image_size, self.image_size), pygame.SRCALPHA)
+        self.image = self.current_frame(0)
         self.rect = self.image.get_rect(center=pos)
         
         # --- COLISÃO ---
@@ -38,7 +46,7 @@ class Enemy(pygame.sprite.Sprite):
         
         self.player = player
         self.all_enemies = all_enemies
-        self.obstacle_sprites = obstacle_sprites
+        self.collision_grid = collision_grid
         
         # Variáveis de IA
         self.stuck_timer = 0
@@ -57,30 +65,31 @@ class Enemy(pygame.sprite.Sprite):
         # --- VARIÁVEIS DE PERSONALIDADE ---
         # Gula (Spawn Timer)
         self.spawn_cooldown = 5000 # Gospe a cada 5s
-        self.last_spawn_action = pygame.time.get_ticks()
+        self.last_spawn_action = self.clock.get_ticks()
         
         # Preguiça (Rage Mode)
         self.is_enraged = False
         self.rage_end_time = 0
         
         # Inveja (Roubo de Pontos)
-        self.steal_timer = pygame.time.get_ticks()
+        self.steal_timer = self.clock.get_ticks()
 
     def take_damage(self, amount):
         self.health -= amount
         self.is_hit = True
-        self.hit_time = pygame.time.get_ticks()
+        self.hit_time = self.clock.get_ticks()
         
         # --- PREGUIÇA: Fica furiosa ao levar dano ---
         if self.enemy_name == 'sloth':
             self.is_enraged = True
-            self.rage_end_time = pygame.time.get_ticks() + 5000 # Dura 5 segundos
+            self.rage_end_time = self.clock.get_ticks() + 5000 # Dura 5 segundos
             
             # Efeito visual de "acordar"
             visual_groups = [g for g in self.groups() if hasattr(g, 'custom_draw')]
             if visual_groups:
-                Particle(self.rect.center, visual_groups, self.obstacle_sprites, 
-                         size_range=(5,10), color_base=(255, 0, 0), speed_range=(2,4))
+                Particle(self.rect.center, visual_groups, self.collision_grid, 
+                         size_range=(5,10), color_base=(255, 0, 0), speed_range=(2,4),
+                         priority=PARTICLE_PRIORITY_GAMEPLAY)
 
         # Knockback
         player_pos_vec = pygame.math.Vector2(self.player.rect.center)
@@ -98,7 +107,7 @@ class Enemy(pygame.sprite.Sprite):
         return pygame.math.Vector2(0, 0)
 
     def specific_behavior(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         
         # --- GULA: GOSPE INIMIGOS (MINIONS) ---
         if self.enemy_name == 'gluttony' and self.player.alive:
@@ -142,7 +151,7 @@ class Enemy(pygame.sprite.Sprite):
         if self.enemy_name == 'lust':
             if self.player.alive:
                 base_dir = self.get_pursuit_vector()
-                current_time = pygame.time.get_ticks()
+                current_time = self.clock.get_ticks()
                 sway_amount = math.sin(current_time * 0.008) * 0.6 
                 self.direction.x = base_dir.x + (base_dir.y * sway_amount)
                 self.direction.y = base_dir.y - (base_dir.x * sway_amount)
@@ -155,7 +164,7 @@ class Enemy(pygame.sprite.Sprite):
         # Pride: Para para se exibir
         if self.enemy_name == 'pride':
             if self.player.alive:
-                current_time = pygame.time.get_ticks()
+                current_time = self.clock.get_ticks()
                 if (current_time // 1000) % 4 == 0: 
                     self.direction = pygame.math.Vector2(0,0)
                 else:
@@ -182,7 +191,7 @@ class Enemy(pygame.sprite.Sprite):
             self.wander_logic()
 
     def wander_logic(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         if current_time - self.wander_timer > self.wander_interval:
             self.wander_timer = current_time
             self.wander_interval = random.randint(1000, 3000)
@@ -195,28 +204,26 @@ class Enemy(pygame.sprite.Sprite):
     def collision(self, direction):
         blocked = False 
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
-                if sprite.rect.colliderect(self.hitbox):
-                    blocked = True
-                    if abs(self.direction.x) > 0.1: 
-                        self.stuck_timer = 30 
-                        self.stuck_direction.x = 0 
-                        self.stuck_direction.y = random.choice([-1, 1]) 
-                    if self.direction.x > 0: self.hitbox.right = sprite.rect.left
-                    if self.direction.x < 0: self.hitbox.left = sprite.rect.right
-                    self.pos.x = self.hitbox.centerx 
+            for tile_rect in self.collision_grid.query(self.hitbox):
+                blocked = True
+                if abs(self.direction.x) > 0.1: 
+                    self.stuck_timer = 30 
+                    self.stuck_direction.x = 0 
+                    self.stuck_direction.y = random.choice([-1, 1]) 
+                if self.direction.x > 0: self.hitbox.right = tile_rect.left
+                if self.direction.x < 0: self.hitbox.left = tile_rect.right
+                self.pos.x = self.hitbox.centerx 
             return blocked
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
-                if sprite.rect.colliderect(self.hitbox):
-                    blocked = True
-                    if abs(self.direction.y) > 0.1:
-                         self.stuck_timer = 30
-                         self.stuck_direction.y = 0 
-                         self.stuck_direction.x = random.choice([-1, 1])
-                    if self.direction.y > 0: self.hitbox.bottom = sprite.rect.top
-                    if self.direction.y < 0: self.hitbox.top = sprite.rect.bottom
-                    self.pos.y = self.hitbox.centery
+            for tile_rect in self.collision_grid.query(self.hitbox):
+                blocked = True
+                if abs(self.direction.y) > 0.1:
+                     self.stuck_timer = 30
+                     self.stuck_direction.y = 0 
+                     self.stuck_direction.x = random.choice([-1, 1])
+                if self.direction.y > 0: self.hitbox.bottom = tile_rect.top
+                if self.direction.y < 0: self.hitbox.top = tile_rect.bottom
+                self.pos.y = self.hitbox.centery
             return blocked
 
     def move(self):
@@ -246,7 +253,10 @@ class Enemy(pygame.sprite.Sprite):
         self.pos.x, self.pos.y = self.hitbox.center
 
     def check_separation(self):
-        for enemy in self.all_enemies:
+        # Só compara com quem está nos baldes vizinhos do hash espacial
+        area = self.hitbox.inflate(SEPARATION_QUERY_MARGIN * 2, SEPARATION_QUERY_MARGIN * 2)
+        neighbours = 0
+        for enemy in self.all_enemies.spatial_hash.query(area):
             if enemy != self:
                 if self.hitbox.colliderect(enemy.hitbox):
                     push_direction = pygame.math.Vector2(self.hitbox.center) - pygame.math.Vector2(enemy.hitbox.center)
@@ -255,175 +265,250 @@ class Enemy(pygame.sprite.Sprite):
                         self.pos += push_direction * 0.5 
                         self.hitbox.center = round(self.pos.x), round(self.pos.y)
                         self.rect.center = self.hitbox.center
-
-    def draw_visuals(self):
-        self.image.fill((0,0,0,0)) 
-        
-        draw_color = self.color
+                    neighbours += 1
+                    if neighbours >= SEPARATION_MAX_NEIGHBOURS: break
+
+    # --- ATLAS DE ANIMAÇÃO ---
+    # Cada tipo tem um ciclo de quadros pré-desenhados por estado (normal, hit,
+    # e para a preguiça também enfurecida). O inimigo só escolhe o quadro.
+    _frame_atlas = None
+
+    @classmethod
+    def build_atlas(cls):
+        cls._frame_atlas = {}
+        for enemy_name in ENEMIES_DATA:
+            if enemy_name == 'lucifer': continue # O Boss desenha o próprio visual
+            states = [(False, False), (True, False)]
+            if enemy_name == 'sloth': states += [(False, True), (True, True)]
+            frames = {state: [cls.draw_frame(enemy_name, index, *state) for index in range(cls.frame_count(enemy_name))]
+                      for state in states}
+
+            # Recorta todos os quadros do tipo no mesmo quadrado centrado (o centro
+            # do quadro continua sendo o centro do inimigo)
+            image_size = ENEMIES_DATA[enemy_name]['size'] + 50
+            center = image_size // 2
+            half = 1
+            for state_frames in frames.values():
+                for frame in state_frames:
+                    used = frame.get_bounding_rect()
+                    half = max(half, center - used.left, used.right - center, center - used.top, used.bottom - center)
+            crop = pygame.Rect(center - half, center - half, half * 2, half * 2).clip(pygame.Rect(0, 0, image_size, image_size))
+            if crop.center == (center, center):
+                for state, state_frames in frames.items():
+                    frames[state] = [frame.subsurface(crop).copy() for frame in state_frames]
+            for (is_hit, is_enraged), state_frames in frames.items():
+                cls._frame_atlas[(enemy_name, is_hit, is_enraged)] = state_frames
+
+    @staticmethod
+    def frame_count(enemy_name):
+        if enemy_name == 'wrath': return 9 # Deslocamentos do tremor (-1..1 em x e y)
+        if enemy_name == 'greed': return 45 # Losango gira 2 graus por frame e se repete a cada 90
+        if enemy_name == 'pride': return 30 # Estrela de 6 pontas se repete a cada 60 graus (passo de 2)
+        if enemy_name == 'sloth': return SLOTH_ANIMATION_FRAMES
+        if enemy_name in ('gluttony', 'lust'): return ENEMY_ANIMATION_FRAMES
+        return 1
+
+    def frame_index(self):
+        """Quadro do ciclo para o estado atual de animação."""
+        count = self.frame_count(self.enemy_name)
+        if self.enemy_name == 'wrath':
+            shake_x = random.randint(-1, 1); shake_y = random.randint(-1, 1)
+            return (shake_y + 1) * 3 + (shake_x + 1)
+        if self.enemy_name == 'gluttony':
+            return round(self.animation_timer * 0.05 / math.tau * count) % count
+        if self.enemy_name == 'greed':
+            return int(self.rotation_angle % 90) // 2
+        if self.enemy_name == 'lust':
+            return round(self.animation_timer * 0.08 / math.tau * count) % count
+        if self.enemy_name == 'sloth':
+            # As duas deformações (0.02 e 0.015) fecham um ciclo comum a cada 2pi/0.005
+            return round(self.animation_timer * 0.005 / math.tau * count) % count
+        if self.enemy_name == 'pride':
+            # A estrela gira com o timer e a superfície gira ao contrário com rotation_angle
+            return round((self.animation_timer * 0.5 - self.rotation_angle) / 2) % count
+        return 0
+
+    def current_frame(self, index=None):
+        if Enemy._frame_atlas is None: Enemy.build_atlas()
+        if index is not None: return Enemy._frame_atlas[(self.enemy_name, False, False)][index]
+        is_enraged = self.is_enraged and self.enemy_name == 'sloth'
+        return Enemy._frame_atlas[(self.enemy_name, self.is_hit, is_enraged)][self.frame_index()]
+
+    def animate(self):
+        """Estado da animação. Escolher o quadro fica aqui mesmo sem desenhar:
+        é só uma consulta ao atlas, e o tremor da ira sorteia no random global."""
         if self.is_hit:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.hit_time < 100: 
-                draw_color = (255, 255, 255) 
-            else:
+            current_time = self.clock.get_ticks()
+            if current_time - self.hit_time >= 100: 
                 self.is_hit = False
-        
+
+        self.animation_timer += 1
+        if self.enemy_name == 'greed': self.rotation_angle += 2
+        elif self.enemy_name == 'pride': self.rotation_angle += 1.5 
+        self.image = self.current_frame()
+
+    def draw_visuals(self):
+        pass # O quadro já saiu do atlas em animate
+
+    @staticmethod
+    def draw_frame(enemy_name, index, is_hit, is_enraged):
+        stats = ENEMIES_DATA[enemy_name]
+        size = stats['size']
+        image_size = size + 50
+        image = pygame.Surface((image_size, image_size), pygame.SRCALPHA)
+        count = Enemy.frame_count(enemy_name)
+        phase = math.tau * index / count
+
+        draw_color = (255, 255, 255) if is_hit else stats['color']
         # Sloth Furiosa fica vermelha
-        if self.enemy_name == 'sloth' and self.is_enraged:
+        if is_enraged:
              draw_color = (255, 50, 50)
 
-        self.animation_timer += 1
-        cx, cy = self.image_size // 2, self.image_size // 2
-        center = (cx, cy)
+        cx, cy = image_size // 2, image_size // 2
         
         def draw_glow(radius, color, alpha):
-            s = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*color, alpha), (radius, radius), radius)
-            self.image.blit(s, (cx - radius, cy - radius), special_flags=pygame.BLEND_RGBA_ADD)
+            image.blit(glow_surface(radius, color, alpha), (cx - radius, cy - radius), special_flags=pygame.BLEND_RGBA_ADD)
 
         # 1. IRA (WRATH)
-        if self.enemy_name == 'wrath':
-            shake_x = random.randint(-1, 1); shake_y = random.randint(-1, 1)
+        if enemy_name == 'wrath':
+            shake_x = index % 3 - 1; shake_y = index // 3 - 1
             cx += shake_x; cy += shake_y
-            base_size = self.size // 2
+            base_size = size // 2
             draw_glow(base_size + 15, (255, 0, 0), 50)
             points = [(cx, cy - base_size - 5), (cx + base_size, cy), (cx, cy + base_size + 5), (cx - base_size, cy)]
-            pygame.draw.polygon(self.image, draw_color, points)
-            if not self.is_hit:
-                pygame.draw.polygon(self.image, (50, 0, 0), points, 0) 
-                pygame.draw.polygon(self.image, (255, 50, 50), points, 2) 
-                pygame.draw.line(self.image, (255, 255, 255), (cx - 8, cy - 2), (cx - 2, cy + 4), 2)
-                pygame.draw.line(self.image, (255, 255, 255), (cx + 8, cy - 2), (cx + 2, cy + 4), 2)
+            pygame.draw.polygon(image, draw_color, points)
+            if not is_hit:
+                pygame.draw.polygon(image, (50, 0, 0), points, 0) 
+                pygame.draw.polygon(image, (255, 50, 50), points, 2) 
+                pygame.draw.line(image, (255, 255, 255), (cx - 8, cy - 2), (cx - 2, cy + 4), 2)
+                pygame.draw.line(image, (255, 255, 255), (cx + 8, cy - 2), (cx + 2, cy + 4), 2)
 
         # 2. GULA (GLUTTONY)
-        elif self.enemy_name == 'gluttony':
-            pulse = math.sin(self.animation_timer * 0.05) * 4
-            radius = (self.size // 2) + pulse
+        elif enemy_name == 'gluttony':
+            pulse = math.sin(phase) * 4
+            radius = (size // 2) + pulse
             draw_glow(int(radius + 10), (150, 80, 0), 40)
             rect_blob = pygame.Rect(0, 0, radius*2, radius*1.8)
             rect_blob.center = (cx, cy)
-            pygame.draw.ellipse(self.image, draw_color, rect_blob)
-            if not self.is_hit:
-                pygame.draw.ellipse(self.image, (100, 50, 20), rect_blob, 4)
+            pygame.draw.ellipse(image, draw_color, rect_blob)
+            if not is_hit:
+                pygame.draw.ellipse(image, (100, 50, 20), rect_blob, 4)
                 mouth_rect = pygame.Rect(0, 0, radius * 1.2, radius * 0.8)
                 mouth_rect.center = (cx, cy + 5)
-                pygame.draw.ellipse(self.image, (20, 0, 0), mouth_rect) 
-                pygame.draw.polygon(self.image, (200, 200, 180), [(cx-10, cy-10), (cx-5, cy+5), (cx, cy-10)])
-                pygame.draw.polygon(self.image, (200, 200, 180), [(cx+10, cy-10), (cx+5, cy+5), (cx, cy-10)])
+                pygame.draw.ellipse(image, (20, 0, 0), mouth_rect) 
+                pygame.draw.polygon(image, (200, 200, 180), [(cx-10, cy-10), (cx-5, cy+5), (cx, cy-10)])
+                pygame.draw.polygon(image, (200, 200, 180), [(cx+10, cy-10), (cx+5, cy+5), (cx, cy-10)])
 
         # 3. AVAREZA (GREED)
-        elif self.enemy_name == 'greed':
-            self.rotation_angle += 2
-            diamond_size = self.size
+        elif enemy_name == 'greed':
+            diamond_size = size
             surf_d = pygame.Surface((diamond_size, diamond_size), pygame.SRCALPHA)
             rect_d = pygame.Rect(0, 0, diamond_size, diamond_size)
             mid = diamond_size // 2
             pts = [(mid, 0), (diamond_size, mid), (mid, diamond_size), (0, mid)]
             pygame.draw.polygon(surf_d, draw_color, pts) 
-            if not self.is_hit:
+            if not is_hit:
                 pygame.draw.polygon(surf_d, (255, 255, 200), pts, 4) 
                 pygame.draw.circle(surf_d, (180, 150, 0), (mid, mid), 6)
-            rotated_d = pygame.transform.rotate(surf_d, self.rotation_angle)
+            rotated_d = pygame.transform.rotate(surf_d, index * 2)
             r_rect = rotated_d.get_rect(center=(cx, cy))
-            draw_glow(int(self.size * 0.7), (255, 215, 0), 60)
-            self.image.blit(rotated_d, r_rect)
+            draw_glow(int(size * 0.7), (255, 215, 0), 60)
+            image.blit(rotated_d, r_rect)
 
         # 4. LUXÚRIA (LUST)
-        elif self.enemy_name == 'lust':
-            pulse_amp = math.sin(self.animation_timer * 0.08) * 3
-            base_size = self.size // 2
+        elif enemy_name == 'lust':
+            pulse_amp = math.sin(phase) * 3
+            base_size = size // 2
             draw_glow(base_size + 15, (255, 50, 200), 60)
             heart_points = [(cx, cy - base_size - pulse_amp), (cx + base_size + pulse_amp, cy - base_size // 2),
                             (cx + base_size, cy + base_size), (cx, cy + base_size + pulse_amp + 10),
                             (cx - base_size, cy + base_size), (cx - base_size - pulse_amp, cy - base_size // 2)]
-            pygame.draw.polygon(self.image, draw_color, heart_points)
-            if not self.is_hit:
-                pygame.draw.polygon(self.image, (150, 0, 100), heart_points, 0)
-                pygame.draw.polygon(self.image, (255, 150, 255), heart_points, 2) 
+            pygame.draw.polygon(image, draw_color, heart_points)
+            if not is_hit:
+                pygame.draw.polygon(image, (150, 0, 100), heart_points, 0)
+                pygame.draw.polygon(image, (255, 150, 255), heart_points, 2) 
 
         # 5. PREGUIÇA (SLOTH)
-        elif self.enemy_name == 'sloth':
-            deform_x = math.sin(self.animation_timer * 0.02) * 5
-            deform_y = math.cos(self.animation_timer * 0.015) * 5
-            base_size = self.size // 2
+        elif enemy_name == 'sloth':
+            deform_x = math.sin(phase * 4) * 5
+            deform_y = math.cos(phase * 3) * 5
+            base_size = size // 2
             draw_glow(base_size + 20, (50, 100, 200), 70)
             blob_points = [(cx, cy - base_size - 10), (cx + base_size + deform_x, cy - base_size // 2),
                            (cx + base_size + deform_x, cy + base_size + deform_y), (cx, cy + base_size + 15),
                            (cx - base_size - deform_x, cy + base_size + deform_y), (cx - base_size - deform_x, cy - base_size // 2)]
-            pygame.draw.polygon(self.image, draw_color, blob_points)
-            if not self.is_hit:
-                pygame.draw.polygon(self.image, (0, 50, 100), blob_points, 0) 
-                pygame.draw.polygon(self.image, (150, 200, 255), blob_points, 3) 
+            pygame.draw.polygon(image, draw_color, blob_points)
+            if not is_hit:
+                pygame.draw.polygon(image, (0, 50, 100), blob_points, 0) 
+                pygame.draw.polygon(image, (150, 200, 255), blob_points, 3) 
                 # Olhos
-                eye_color = (255, 50, 50) if self.is_enraged else (200, 200, 255)
-                pygame.draw.line(self.image, eye_color, (cx - 10, cy - 5 + deform_y), (cx - 2, cy - 5 + deform_y), 2)
-                pygame.draw.line(self.image, eye_color, (cx + 10, cy - 5 + deform_y), (cx + 2, cy - 5 + deform_y), 2)
+                eye_color = (255, 50, 50) if is_enraged else (200, 200, 255)
+                pygame.draw.line(image, eye_color, (cx - 10, cy - 5 + deform_y), (cx - 2, cy - 5 + deform_y), 2)
+                pygame.draw.line(image, eye_color, (cx + 10, cy - 5 + deform_y), (cx + 2, cy - 5 + deform_y), 2)
 
         # 6. INVEJA (ENVY)
-        elif self.enemy_name == 'envy':
-            base_size = self.size // 2
+        elif enemy_name == 'envy':
+            base_size = size // 2
             draw_glow(base_size + 15, (0, 150, 0), 60)
             eye_radius_x = base_size + 5; eye_radius_y = base_size - 5
-            pygame.draw.ellipse(self.image, draw_color, (cx - eye_radius_x, cy - eye_radius_y, eye_radius_x*2, eye_radius_y*2))
-            if not self.is_hit:
-                pygame.draw.ellipse(self.image, (0, 80, 0), (cx - eye_radius_x, cy - eye_radius_y, eye_radius_x*2, eye_radius_y*2), 0)
-                pygame.draw.ellipse(self.image, (100, 255, 100), (cx - eye_radius_x, cy - eye_radius_y, eye_radius_x*2, eye_radius_y*2), 2)
+            pygame.draw.ellipse(image, draw_color, (cx - eye_radius_x, cy - eye_radius_y, eye_radius_x*2, eye_radius_y*2))
+            if not is_hit:
+                pygame.draw.ellipse(image, (0, 80, 0), (cx - eye_radius_x, cy - eye_radius_y, eye_radius_x*2, eye_radius_y*2), 0)
+                pygame.draw.ellipse(image, (100, 255, 100), (cx - eye_radius_x, cy - eye_radius_y, eye_radius_x*2, eye_radius_y*2), 2)
                 pupil_radius = int(base_size * 0.4)
-                pygame.draw.circle(self.image, (0, 0, 0), (cx, cy), pupil_radius)
+                pygame.draw.circle(image, (0, 0, 0), (cx, cy), pupil_radius)
 
         # 7. SOBERBA (PRIDE)
-        elif self.enemy_name == 'pride':
-            self.rotation_angle += 1.5 
-            base_size = self.size // 2
-            pride_surf_size = base_size * 2 + 20
-            pride_surf = pygame.Surface((pride_surf_size, pride_surf_size), pygame.SRCALPHA)
-            pride_center = pride_surf_size // 2
+        elif enemy_name == 'pride':
+            base_size = size // 2
+            draw_glow(base_size + 20, (180, 0, 255), 70)
             num_points = 6; outer_radius = base_size + 5; inner_radius = base_size - 10
             points = []
             for i in range(num_points):
-                angle_outer = math.radians(i * (360 / num_points) + self.animation_timer * 0.5)
-                angle_inner = math.radians(i * (360 / num_points) + (360 / (num_points * 2)) + self.animation_timer * 0.5)
-                points.append((pride_center + outer_radius * math.cos(angle_outer), pride_center + outer_radius * math.sin(angle_outer)))
-                points.append((pride_center + inner_radius * math.cos(angle_inner), pride_center + inner_radius * math.sin(angle_inner)))
-            pygame.draw.polygon(pride_surf, draw_color, points) 
-            if not self.is_hit:
-                pygame.draw.polygon(pride_surf, (255, 255, 0), points, 2) 
-            rotated_pride = pygame.transform.rotate(pride_surf, self.rotation_angle)
-            r_rect = rotated_pride.get_rect(center=(cx, cy))
-            draw_glow(base_size + 20, (180, 0, 255), 70)
-            self.image.blit(rotated_pride, r_rect)
+                angle_outer = math.radians(i * (360 / num_points) + index * 2)
+                angle_inner = math.radians(i * (360 / num_points) + (360 / (num_points * 2)) + index * 2)
+                points.append((cx + outer_radius * math.cos(angle_outer), cy + outer_radius * math.sin(angle_outer)))
+                points.append((cx + inner_radius * math.cos(angle_inner), cy + inner_radius * math.sin(angle_inner)))
+            pygame.draw.polygon(image, draw_color, points) 
+            if not is_hit:
+                pygame.draw.polygon(image, (255, 255, 0), points, 2) 
 
         # 8. MINION (Spawnado pela Gula)
-        elif self.enemy_name == 'minion':
-            radius = self.size // 2
-            pygame.draw.circle(self.image, draw_color, (cx, cy), radius)
+        elif enemy_name == 'minion':
+            radius = size // 2
+            pygame.draw.circle(image, draw_color, (cx, cy), radius)
             draw_glow(radius + 5, (150, 150, 150), 50)
+        return image
 
     def emit_particles(self):
         visual_groups = [g for g in self.groups() if hasattr(g, 'custom_draw')]
         if not visual_groups: return
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
 
         if self.enemy_name == 'greed':
             if current_time - self.particle_timer > 200: 
                 self.particle_timer = current_time
-                Particle(self.rect.center, visual_groups, self.obstacle_sprites, size_range=(2, 4), color_base=(255, 215, 0), speed_range=(0.5, 1.5))
+                Particle(self.rect.center, visual_groups, self.collision_grid, size_range=(2, 4), color_base=(255, 215, 0), speed_range=(0.5, 1.5))
         elif self.enemy_name == 'lust':
             if random.randint(0, 100) < 5: 
-                Particle(self.rect.center, visual_groups, self.obstacle_sprites, size_range=(3, 6), color_base=(255, 100, 200), speed_range=(0.8, 1.8))
+                Particle(self.rect.center, visual_groups, self.collision_grid, size_range=(3, 6), color_base=(255, 100, 200), speed_range=(0.8, 1.8))
         elif self.enemy_name == 'sloth' and self.is_enraged: # Fumaça de raiva
             if random.randint(0, 100) < 10: 
-                Particle(self.rect.center, visual_groups, self.obstacle_sprites, size_range=(4, 8), color_base=(100, 0, 0), speed_range=(1.0, 2.0))
+                Particle(self.rect.center, visual_groups, self.collision_grid, size_range=(4, 8), color_base=(100, 0, 0), speed_range=(1.0, 2.0),
+                         priority=PARTICLE_PRIORITY_EFFECT)
 
     def update(self):
         self.hunt_player()
         self.check_separation()
         self.move()
-        self.draw_visuals()
+        self.animate()
+        if self.render: self.draw_visuals()
         self.emit_particles()
 
     class EnemyBullet(pygame.sprite.Sprite):
-        def __init__(self, pos, angle, groups, obstacle_sprites, speed=6, damage=1):
+        def __init__(self, pos, angle, groups, obstacle_sprites, speed=6, damage=1, clock=game_clock):
             super().__init__(groups)
+            self.clock = clock
             self.image = pygame.Surface((12, 12))
             self.image.fill(ENEMY_BULLET_COLOR) # Cor definida no settings
             self.rect = self.image.get_rect(center=pos)
@@ -436,7 +521,7 @@ class Enemy(pygame.sprite.Sprite):
             rad_angle = math.radians(angle)
             self.direction = pygame.math.Vector2(math.cos(rad_angle), -math.sin(rad_angle))
             self.pos = pygame.math.Vector2(self.rect.center)
-            self.spawn_time = pygame.time.get_ticks()
+            self.spawn_time = self.clock.get_ticks()
             self.lifetime = 3000 # 3 segundos
 
         def update(self):
@@ -448,14 +533,14 @@ class Enemy(pygame.sprite.Sprite):
             if pygame.sprite.spritecollideany(self, self.obstacle_sprites):
                 self.kill()
                 
-            if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+            if self.clock.get_ticks() - self.spawn_time > self.lifetime:
                 self.kill()
 
 # No arquivo enemy.py, substitua a classe Boss por esta versão:
 
 class Boss(Enemy):
-    def __init__(self, pos, groups, player, all_enemies, obstacle_sprites, spawn_callback, hud, create_bullet_callback):
-        super().__init__(pos, groups, player, all_enemies, obstacle_sprites, 'lucifer', spawn_callback, hud)
+    def __init__(self, pos, groups, player, all_enemies, spawn_callback, hud, create_bullet_callback, collision_grid, clock=game_clock):
+        super().__init__(pos, groups, player, all_enemies, 'lucifer', spawn_callback, hud, collision_grid, clock)
         
         self.max_health = self.stats['health']
         self.create_bullet_callback = create_bullet_callback
@@ -481,7 +566,7 @@ class Boss(Enemy):
         self.dash_direction = pygame.math.Vector2()
 
     def specific_behavior(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         
         # --- CHECAGEM DE FASE ---
         if self.health < self.stats['phase_2_threshold'] and self.phase == 1:
@@ -490,7 +575,8 @@ class Boss(Enemy):
             # Explosão visual de troca de fase
             visual_groups = [g for g in self.groups() if hasattr(g, 'custom_draw')]
             for _ in range(50):
-                Particle(self.rect.center, visual_groups, self.obstacle_sprites, size_range=(10,25), color_base=(255, 50, 0), speed_range=(4,8))
+                Particle(self.rect.center, visual_groups, self.collision_grid, size_range=(10,25), color_base=(255, 50, 0), speed_range=(4,8),
+                         priority=PARTICLE_PRIORITY_GAMEPLAY)
 
         # --- MÁQUINA DE ESTADOS (Mantida a lógica original) ---
         if current_time - self.attack_timer > self.stats['attack_cooldown']:
@@ -550,162 +636,194 @@ class Boss(Enemy):
             minion_type = random.choice([e for e in ENEMIES_DATA.keys() if e != 'lucifer' and e != 'minion'])
             self.spawn_callback(spawn_pos, minion_type)
 
-    def draw_visuals(self):
-        self.image.fill((0,0,0,0)) # Limpa o frame
-        cx, cy = self.image_size // 2, self.image_size // 2
-        
+    def current_frame(self, index=None):
+        # O Boss não usa o atlas: monta o próprio visual em draw_visuals
+        return pygame.Surface((self.image_size, self.image_size), pygame.SRCALPHA)
+
+    # --- CAMADAS PRÉ-DESENHADAS ---
+    # Cada parte do Lúcifer é desenhada uma vez por pose (e por paleta de fase),
+    # já recortada e com a silhueta branca do flash. Por frame só se compõe.
+    _layers = None
+
+    @staticmethod
+    def palette(phase):
+        return {
+            'skin': (220, 220, 255),  # Pálido quase branco (angelical corrompido)
+            'armor': (20, 20, 25),    # Obsidiana
+            'gold': (180, 140, 50),   # Ouro velho
+            'cloth': (40, 0, 10) if phase == 1 else (20, 0, 0), # Vermelho sangue escuro
+            'wing_bone': (10, 10, 10),
+            'wing_feather': (30, 5, 5),
+            'eye': (255, 200, 0) if phase == 1 else (255, 0, 0),
+        }
+
+    @staticmethod
+    def bake_layer(draw, size=300):
+        """Desenha uma camada centrada no meio de um quadro `size` x `size` e
+        recorta o que foi usado. Retorna (superfície, silhueta branca,
+        deslocamento do recorte até o centro)."""
+        canvas = pygame.Surface((size, size), pygame.SRCALPHA)
+        center = size // 2
+        draw(canvas, center, center)
+        # Mesmo recorte do get_bounding_rect, mas pelo array de alfa (bem mais rápido)
+        alpha = pygame.surfarray.pixels_alpha(canvas)
+        cols = np.flatnonzero(alpha.any(axis=1))
+        rows = np.flatnonzero(alpha.any(axis=0))
+        del alpha # Libera o lock da superfície
+        if len(cols) == 0: used = pygame.Rect(center, center, 1, 1)
+        else: used = pygame.Rect(cols[0], rows[0], cols[-1] - cols[0] + 1, rows[-1] - rows[0] + 1)
+        surface = canvas.subsurface(used).copy()
+        mask = pygame.mask.from_surface(surface)
+        silhouette = mask.to_surface(setcolor=(255, 255, 255, 255), unsetcolor=(0, 0, 0, 0))
+        return surface, silhouette, (used.x - center, used.y - center)
+
+    @classmethod
+    def build_layers(cls):
+        layers = {}
+
+        # 1. Auréola: 8 espinhos, se repete a cada 45 graus
+        def draw_halo(rotation):
+            def draw(canvas, cx, cy):
+                palette = cls.palette(1)
+                halo_radius = 40
+                hx, hy = cx, cy - 40 # Centro da auréola (era o meio de uma superfície 100x100)
+                for i in range(0, 360, 45):
+                    rad = math.radians(i + rotation)
+                    start = (hx + math.cos(rad) * (halo_radius - 5), hy + math.sin(rad) * (halo_radius - 5))
+                    end = (hx + math.cos(rad) * (halo_radius + 10), hy + math.sin(rad) * (halo_radius + 10))
+                    pygame.draw.line(canvas, palette['gold'], start, end, 3)
+                pygame.draw.circle(canvas, palette['gold'], (hx, hy), halo_radius, 2)
+            return draw
+        layers['halo'] = [cls.bake_layer(draw_halo(rotation)) for rotation in range(45)]
+
+        # 2. Asas: uma pose por pixel de inclinação (-10..10)
+        def draw_wings(wing_angle):
+            def draw(canvas, cx, cy):
+                palette = cls.palette(1)
+                for direction in (-1, 1):
+                    base_x = cx + (10 * direction)
+                    base_y = cy - 20
+                    # Estrutura óssea da asa
+                    bone_end_x = base_x + (120 * direction)
+                    bone_end_y = base_y - 60 + wing_angle
+                    mid_bone_x = base_x + (60 * direction)
+                    mid_bone_y = base_y - 80 + (wing_angle * 0.5)
+                    points = [(base_x, base_y), (mid_bone_x, mid_bone_y), (bone_end_x, bone_end_y)]
+                    pygame.draw.lines(canvas, palette['wing_bone'], False, points, 4)
+                    # Penas (Várias camadas de polígonos)
+                    num_feathers = 8
+                    for i in range(num_feathers):
+                        t = i / num_feathers
+                        fx = mid_bone_x + (bone_end_x - mid_bone_x) * t
+                        fy = mid_bone_y + (bone_end_y - mid_bone_y) * t
+                        flen = 60 + math.sin(i) * 20
+                        feather_points = [(fx, fy), (fx + (10 * direction), fy + flen), (fx - (5 * direction), fy + flen - 10)]
+                        pygame.draw.polygon(canvas, palette['wing_feather'], feather_points)
+            return draw
+        layers['wings'] = {wing_angle: cls.bake_layer(draw_wings(wing_angle)) for wing_angle in range(-10, 11)}
+
+        # 3. Capa: borda inferior ondulada, uma volta da onda por paleta
+        def draw_cape(wave, phase):
+            def draw(canvas, cx, cy):
+                segments = 10; cape_width = 60; cape_height = 90
+                cape_points = [(cx - 20, cy - 10), (cx + 20, cy - 10)]
+                start_x = cx + (cape_width // 2)
+                for i in range(segments + 1):
+                    px = start_x - (i * (cape_width / segments))
+                    py = cy + cape_height + math.sin(wave + i * 0.5) * 5
+                    cape_points.append((px, py))
+                pygame.draw.polygon(canvas, cls.palette(phase)['cloth'], cape_points)
+                pygame.draw.lines(canvas, (0,0,0), True, cape_points, 2)
+            return draw
+        for phase in (1, 2):
+            layers[('cape', phase)] = [cls.bake_layer(draw_cape(math.tau * i / BOSS_ANIMATION_FRAMES, phase))
+                                       for i in range(BOSS_ANIMATION_FRAMES)]
+
+        # 4. Corpo/armadura
+        def draw_body(canvas, cx, cy):
+            palette = cls.palette(1)
+            body_rect = pygame.Rect(0, 0, 30, 50)
+            body_rect.center = (cx, cy + 10)
+            pygame.draw.rect(canvas, palette['armor'], body_rect)
+            pygame.draw.line(canvas, palette['gold'], (cx - 15, cy - 15), (cx + 15, cy - 15), 2)
+            pygame.draw.line(canvas, palette['gold'], (cx, cy - 15), (cx, cy + 30), 2)
+        layers['body'] = cls.bake_layer(draw_body)
+
+        # 5. Espada flamejante (Lightbringer): brilho aditivo + lâmina girada grau a grau
+        glow_circle = pygame.Surface((60, 60), pygame.SRCALPHA)
+        pygame.draw.circle(glow_circle, (100, 50, 0, 100), (30,30), 25)
+        layers['sword_glow'] = glow_circle
+        sword_surf = pygame.Surface((20, 100), pygame.SRCALPHA)
+        pygame.draw.rect(sword_surf, (255, 100, 0), (5, 0, 10, 80))   # Borda laranja
+        pygame.draw.rect(sword_surf, (255, 255, 200), (8, 0, 4, 75))  # Núcleo branco quente
+        pygame.draw.line(sword_surf, cls.palette(1)['gold'], (0, 80), (20, 80), 4) # Guarda
+        pygame.draw.line(sword_surf, (50, 50, 50), (10, 80), (10, 100), 3) # Cabo
+        layers['sword'] = {}
+        for sword_angle in range(-5, 6):
+            rotated_sword = pygame.transform.rotate(sword_surf, -45 + sword_angle)
+            layers['sword'][sword_angle] = cls.bake_layer(lambda canvas, cx, cy: canvas.blit(rotated_sword, (cx + 35, cy - 40)))
+
+        # 6. Cabeça, chifres e olhos (cor dos olhos muda com a fase)
+        def draw_head(phase):
+            def draw(canvas, cx, cy):
+                palette = cls.palette(phase)
+                pygame.draw.circle(canvas, palette['skin'], (cx, cy - 25), 12) # Rosto pálido
+                pygame.draw.arc(canvas, (10, 10, 10), (cx - 14, cy - 40, 28, 30), math.pi, 0, 10) # Cabelo/Elmo
+                pygame.draw.polygon(canvas, (30, 30, 30), [(cx - 5, cy - 35), (cx - 20, cy - 55), (cx - 10, cy - 30)])
+                pygame.draw.polygon(canvas, (30, 30, 30), [(cx + 5, cy - 35), (cx + 20, cy - 55), (cx + 10, cy - 30)])
+                pygame.draw.circle(canvas, palette['eye'], (cx - 4, cy - 24), 2)
+                pygame.draw.circle(canvas, palette['eye'], (cx + 4, cy - 24), 2)
+            return draw
+        for phase in (1, 2):
+            layers[('head', phase)] = cls.bake_layer(draw_head(phase))
+            eye_glow = pygame.Surface((40, 20), pygame.SRCALPHA)
+            pygame.draw.circle(eye_glow, (*cls.palette(phase)['eye'], 50), (20, 10), 8)
+            layers[('eye_glow', phase)] = eye_glow
+
+        cls._layers = layers
+
+    def animate(self):
         # Atualiza timers de animação
         self.float_timer += 0.05
         self.wing_frame += 0.1
         self.cape_wave += 0.2
         self.halo_rotation += 2
-        
-        # Efeito de levitação (Senoide vertical)
-        float_offset = math.sin(self.float_timer) * 5
-        cy += float_offset
-
-        # --- PALETA DE CORES ---
-        COLOR_SKIN = (220, 220, 255) # Pálido quase branco (angelical corrompido)
-        COLOR_ARMOR = (20, 20, 25)   # Obsidiana
-        COLOR_GOLD = (180, 140, 50)  # Ouro velho
-        COLOR_CLOTH = (40, 0, 10) if self.phase == 1 else (20, 0, 0) # Vermelho sangue escuro
-        COLOR_WING_BONE = (10, 10, 10)
-        COLOR_WING_FEATHER = (30, 5, 5)
-        COLOR_GLOW = (255, 100, 0) if self.phase == 1 else (255, 0, 0) # Laranja -> Vermelho Puro
-
-        # --- 1. AURÉOLA CORROMPIDA (Trás) ---
-        halo_surf = pygame.Surface((100, 100), pygame.SRCALPHA)
-        halo_radius = 40
-        # Desenha espinhos rotacionando
-        for i in range(0, 360, 45):
-            rad = math.radians(i + self.halo_rotation)
-            start = (50 + math.cos(rad) * (halo_radius - 5), 50 + math.sin(rad) * (halo_radius - 5))
-            end = (50 + math.cos(rad) * (halo_radius + 10), 50 + math.sin(rad) * (halo_radius + 10))
-            pygame.draw.line(halo_surf, COLOR_GOLD, start, end, 3)
-        pygame.draw.circle(halo_surf, COLOR_GOLD, (50, 50), halo_radius, 2)
-        
-        self.image.blit(halo_surf, (cx - 50, cy - 90))
-
-        # --- 2. ASAS DETALHADAS (Procedural) ---
-        # Ângulo da asa oscila lentamente
-        wing_angle = math.sin(self.wing_frame) * 10
-        
-        def draw_wing(is_right):
-            direction = 1 if is_right else -1
-            base_x = cx + (10 * direction)
-            base_y = cy - 20
-            
-            # Estrutura óssea da asa
-            bone_end_x = base_x + (120 * direction)
-            bone_end_y = base_y - 60 + wing_angle
-            mid_bone_x = base_x + (60 * direction)
-            mid_bone_y = base_y - 80 + (wing_angle * 0.5)
-
-            points = [(base_x, base_y), (mid_bone_x, mid_bone_y), (bone_end_x, bone_end_y)]
-            pygame.draw.lines(self.image, COLOR_WING_BONE, False, points, 4)
-            
-            # Penas (Várias camadas de polígonos)
-            num_feathers = 8
-            for i in range(num_feathers):
-                t = i / num_feathers
-                # Interpolação ao longo do osso para a base das penas
-                fx = mid_bone_x + (bone_end_x - mid_bone_x) * t
-                fy = mid_bone_y + (bone_end_y - mid_bone_y) * t
-                
-                # Comprimento da pena
-                flen = 60 + math.sin(i) * 20
-                
-                # Desenha pena
-                feather_points = [
-                    (fx, fy),
-                    (fx + (10 * direction), fy + flen),
-                    (fx - (5 * direction), fy + flen - 10)
-                ]
-                pygame.draw.polygon(self.image, COLOR_WING_FEATHER, feather_points)
-                
-        draw_wing(False) # Esquerda
-        draw_wing(True)  # Direita
-
-        # --- 3. CAPA/MANTO (Ondulação Senoidal) ---
-        cape_points = []
-        # Topo da capa (ombros)
-        cape_points.append((cx - 20, cy - 10))
-        cape_points.append((cx + 20, cy - 10))
-        
-        # Base da capa (com ondas)
-        segments = 10
-        cape_width = 60
-        cape_height = 90
-        start_x = cx + (cape_width // 2)
-        
-        # Desenha a borda inferior ondulada
-        for i in range(segments + 1):
-            px = start_x - (i * (cape_width / segments))
-            # Onda senoidal baseada no tempo e posição X
-            py = cy + cape_height + math.sin(self.cape_wave + i * 0.5) * 5
-            cape_points.append((px, py))
-            
-        pygame.draw.polygon(self.image, COLOR_CLOTH, cape_points)
-        pygame.draw.lines(self.image, (0,0,0), True, cape_points, 2)
-
-        # --- 4. CORPO/ARMADURA ---
-        # Tronco
-        body_rect = pygame.Rect(0, 0, 30, 50)
-        body_rect.center = (cx, cy + 10)
-        pygame.draw.rect(self.image, COLOR_ARMOR, body_rect)
-        
-        # Detalhes Dourados na Armadura (Peitoral)
-        pygame.draw.line(self.image, COLOR_GOLD, (cx - 15, cy - 15), (cx + 15, cy - 15), 2)
-        pygame.draw.line(self.image, COLOR_GOLD, (cx, cy - 15), (cx, cy + 30), 2)
-
-        # --- 5. ESPADA FLAMEJANTE (Lightbringer) ---
-        # A espada flutua e gira levemente ao lado dele
-        sword_angle = math.sin(self.float_timer * 2) * 5
-        sword_surf = pygame.Surface((20, 100), pygame.SRCALPHA)
-        
-        # Lâmina Brilhante (Gradiente Simulado)
-        blade_color_core = (255, 255, 200) # Branco quente
-        blade_color_outer = (255, 100, 0)  # Laranja
-        
-        pygame.draw.rect(sword_surf, blade_color_outer, (5, 0, 10, 80)) # Borda
-        pygame.draw.rect(sword_surf, blade_color_core, (8, 0, 4, 75))   # Núcleo
-        
-        # Punho
-        pygame.draw.line(sword_surf, COLOR_GOLD, (0, 80), (20, 80), 4) # Guarda
-        pygame.draw.line(sword_surf, (50, 50, 50), (10, 80), (10, 100), 3) # Cabo
 
-        rotated_sword = pygame.transform.rotate(sword_surf, -45 + sword_angle)
-        
-        # Brilho da Espada (Blend Additive)
-        glow_circle = pygame.Surface((60, 60), pygame.SRCALPHA)
-        pygame.draw.circle(glow_circle, (100, 50, 0, 100), (30,30), 25)
-        self.image.blit(glow_circle, (cx + 30, cy - 20), special_flags=pygame.BLEND_RGBA_ADD)
-        self.image.blit(rotated_sword, (cx + 35, cy - 40))
+        # O flash do hit dura 50ms
+        if self.is_hit and self.clock.get_ticks() - self.hit_time >= 50:
+            self.is_hit = False
 
-        # --- 6. CABEÇA E ROSTO ---
-        head_pos = (cx, cy - 25)
-        pygame.draw.circle(self.image, COLOR_SKIN, head_pos, 12) # Rosto pálido
-        
-        # Cabelo/Elmo Escuro
-        pygame.draw.arc(self.image, (10, 10, 10), (cx - 14, cy - 40, 28, 30), math.pi, 0, 10)
-        
-        # Chifres Magníficos
-        horn_pts_l = [(cx - 5, cy - 35), (cx - 20, cy - 55), (cx - 10, cy - 30)]
-        horn_pts_r = [(cx + 5, cy - 35), (cx + 20, cy - 55), (cx + 10, cy - 30)]
-        pygame.draw.polygon(self.image, (30, 30, 30), horn_pts_l)
-        pygame.draw.polygon(self.image, (30, 30, 30), horn_pts_r)
-
-        # Olhos Brilhantes (Sem pupilas, apenas luz)
-        eye_color = (255, 200, 0) if self.phase == 1 else (255, 0, 0)
-        pygame.draw.circle(self.image, eye_color, (cx - 4, cy - 24), 2)
-        pygame.draw.circle(self.image, eye_color, (cx + 4, cy - 24), 2)
+    def draw_visuals(self):
+        if Boss._layers is None: Boss.build_layers()
+        layers = Boss._layers
+        self.image.fill((0,0,0,0)) # Limpa o frame
+        cx = self.image_size // 2
         
-        # Brilho dos olhos
-        eye_glow = pygame.Surface((40, 20), pygame.SRCALPHA)
-        pygame.draw.circle(eye_glow, (*eye_color, 50), (20, 10), 8)
-        self.image.blit(eye_glow, (cx - 20, cy - 34), special_flags=pygame.BLEND_RGBA_ADD)
-
-        # --- 7. BARRA DE VIDA ---
+        # Efeito de levitação (Senoide vertical)
+        cy = self.image_size // 2 + round(math.sin(self.float_timer) * 5)
+
+        flashing = self.is_hit
+
+        def cycle(timer):
+            return round(timer / math.tau * BOSS_ANIMATION_FRAMES) % BOSS_ANIMATION_FRAMES
+
+        wing_angle = round(math.sin(self.wing_frame) * 10)
+        sword_angle = round(math.sin(self.float_timer * 2) * 5)
+        parts = [
+            layers['halo'][int(self.halo_rotation) % 45],
+            layers['wings'][wing_angle],
+            layers[('cape', self.phase)][cycle(self.cape_wave)],
+            layers['body'],
+            layers['sword'][sword_angle],
+            layers[('head', self.phase)],
+        ]
+        for index, (surface, _, (dx, dy)) in enumerate(parts):
+            if index == 4: # Brilho da espada (aditivo) vai por baixo da lâmina
+                self.image.blit(layers['sword_glow'], (cx + 30, cy - 20), special_flags=pygame.BLEND_RGBA_ADD)
+            self.image.blit(surface, (cx + dx, cy + dy))
+        self.image.blit(layers[('eye_glow', self.phase)], (cx - 20, cy - 34), special_flags=pygame.BLEND_RGBA_ADD)
+
+        # --- BARRA DE VIDA ---
         hp_perc = self.health / self.max_health
         bar_w = 100
         bar_h = 6
@@ -715,11 +833,9 @@ class Boss(Enemy):
         pygame.draw.rect(self.image, (50, 0, 0), (bar_x, bar_y, bar_w, bar_h))
         pygame.draw.rect(self.image, (255, 0, 0), (bar_x, bar_y, bar_w * hp_perc, bar_h))
         
-        # --- 8. EFEITO DE HIT (Flash Branco) ---
-        if self.is_hit:
-             if pygame.time.get_ticks() - self.hit_time < 50:
-                 mask = pygame.mask.from_surface(self.image)
-                 white_surf = mask.to_surface(setcolor=(255,255,255,255), unsetcolor=(0,0,0,0))
-                 self.image.blit(white_surf, (0,0))
-             else:
-                 self.is_hit = False
\ No newline at end of file
+        # --- EFEITO DE HIT (Flash Branco) ---
+        # Silhuetas já prontas de cada camada, no lugar da máscara da imagem inteira
+        if flashing:
+            for _, silhouette, (dx, dy) in parts:
+                self.image.blit(silhouette, (cx + dx, cy + dy))
+            pygame.draw.rect(self.image, (255, 255, 255), (bar_x, bar_y, bar_w, bar_h))
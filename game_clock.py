@@ -0,0 +1,30 @@
+# game_clock.py
+from settings import *
+
+# -------------------------------------------------------------
+# RELÓGIO DA SIMULAÇÃO (PASSO FIXO)
+# -------------------------------------------------------------
+class GameClock:
+    """Tempo do jogo em milissegundos. Só anda quando a simulação dá um passo
+    (`advance`), sempre do mesmo tamanho: cooldowns, tempos de vida e fades
+    não dependem de quantos frames são desenhados por segundo."""
+
+    def __init__(self, step_ms=SIM_STEP_MS):
+        self.step_ms = step_ms
+        self.time = 0.0
+        self.steps = 0
+
+    def get_ticks(self):
+        # Mesmo formato de pygame.time.get_ticks() (ms inteiros)
+        return int(self.time)
+
+    def advance(self):
+        self.time += self.step_ms
+        self.steps += 1
+
+    def reset(self, time=0.0):
+        self.time = time
+        self.steps = 0
+
+# Relógio compartilhado por toda a lógica do jogo
+game_clock = GameClock()
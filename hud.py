@@ -1,10 +1,16 @@
 import pygame
 import math 
 from settings import *
+from surface_cache import rotate, StaticLayer
+from tracing import traced
+from game_clock import game_clock
 
 class HUD:
-    def __init__(self, screen):
+    def __init__(self, screen, clock=game_clock):
         self.screen = screen
+        # O HUD do jogo balança no tempo da simulação; a tela de vitória
+        # (com a simulação parada) segue no tempo real
+        self.clock = clock
         self.score = 0
         try:
             self.font = pygame.font.Font('8bit.ttf', 24)
@@ -24,14 +30,43 @@ class HUD:
         self.reload_angle = 0 
         self.reload_rotation_speed = -5 
 
+        # Textos já renderizados, por posição na tela (só mudam quando o valor muda)
+        self.text_cache = {}
+
+        # Tela de vitória: mundo + overlay + placar ficam parados numa camada;
+        # o título pulsante usa tamanhos já escalados
+        self.victory_layer = StaticLayer(screen)
+        self.victory_scaled = {}
+
+    def invalidate(self):
+        """Força redesenhar a tela de vitória inteira na próxima vez."""
+        self.victory_layer.invalidate()
+
     def add_score(self, amount):
         self.score += amount
 
-    def draw_text_wobble(self, text, color, anchor_point, anchor_type, y_offset, rotation_angle):
-        surf = self.font.render(text, True, color)
-        shadow = self.font.render(text, True, (0, 0, 0))
-        rotated_surf = pygame.transform.rotate(surf, rotation_angle)
-        rotated_shadow = pygame.transform.rotate(shadow, rotation_angle)
+    def get_text(self, slot, text, color):
+        """Texto e sombra do `slot`; só renderiza de novo se o texto ou a cor mudaram."""
+        entry = self.text_cache.get(slot)
+        if entry is None or entry['text'] != text or entry['color'] != color:
+            entry = {'text': text, 'color': color,
+                     'surf': self.font.render(text, True, color),
+                     'shadow': self.font.render(text, True, (0, 0, 0)),
+                     'rotations': {}}
+            self.text_cache[slot] = entry
+        return entry
+
+    def get_rotated_text(self, entry, rotation_angle):
+        # O balanço é de poucos graus: poucas versões giradas por texto
+        angle = round(rotation_angle / TEXT_ROTATION_STEP) * TEXT_ROTATION_STEP
+        rotated = entry['rotations'].get(angle)
+        if rotated is None:
+            rotated = (pygame.transform.rotate(entry['surf'], angle), pygame.transform.rotate(entry['shadow'], angle))
+            entry['rotations'][angle] = rotated
+        return rotated
+
+    def draw_text_wobble(self, slot, text, color, anchor_point, anchor_type, y_offset, rotation_angle):
+        rotated_surf, rotated_shadow = self.get_rotated_text(self.get_text(slot, text, color), rotation_angle)
         pos_x, pos_y = anchor_point
         rect_kwargs = {anchor_type: (pos_x, pos_y + y_offset)}
         rect = rotated_surf.get_rect(**rect_kwargs)
@@ -41,19 +76,20 @@ class HUD:
         self.screen.blit(rotated_shadow, shadow_rect)
         self.screen.blit(rotated_surf, rect)
 
+    @traced('hud')
     def draw(self, current_ammo, is_reloading, weapon_name, is_alive): 
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         y_offset = math.sin(current_time * self.wave_speed) * self.wave_height
         rotation = math.cos(current_time * self.wave_speed) * self.tilt_amount
 
         if not is_alive:
-            self.draw_text_wobble("YOU ARE DEAD", (200, 0, 0), (WIDTH // 2, HEIGHT - 150), "center", y_offset * 2, rotation)
-            self.draw_text_wobble("PRESS ENTER", (255, 255, 255), (WIDTH // 2, HEIGHT - 100), "center", y_offset, rotation)
+            self.draw_text_wobble('dead', "YOU ARE DEAD", (200, 0, 0), (WIDTH // 2, HEIGHT - 150), "center", y_offset * 2, rotation)
+            self.draw_text_wobble('press', "PRESS ENTER", (255, 255, 255), (WIDTH // 2, HEIGHT - 100), "center", y_offset, rotation)
             return 
 
-        self.draw_text_wobble(f"WEAPON: {weapon_name.upper()}", (255, 255, 255), (WIDTH // 2, 20), "midtop", y_offset, rotation)
-        self.draw_text_wobble(f"AMMO: {current_ammo}", PLAYER_COLOR, (30, HEIGHT - 30), "bottomleft", y_offset, rotation)
-        self.draw_text_wobble(f"SCORE: {self.score}", BULLET_COLOR, (WIDTH - 20, 20), "topright", y_offset, rotation)
+        self.draw_text_wobble('weapon', f"WEAPON: {weapon_name.upper()}", (255, 255, 255), (WIDTH // 2, 20), "midtop", y_offset, rotation)
+        self.draw_text_wobble('ammo', f"AMMO: {current_ammo}", PLAYER_COLOR, (30, HEIGHT - 30), "bottomleft", y_offset, rotation)
+        self.draw_text_wobble('score', f"SCORE: {self.score}", BULLET_COLOR, (WIDTH - 20, 20), "topright", y_offset, rotation)
 
         if is_reloading:
             center_x, center_y = RELOAD_ICON_POS
@@ -65,39 +101,61 @@ class HUD:
             pygame.draw.rect(self.screen, (255, 200, 50), (center_x + 6, center_y - 10, 6, 5))
             self.reload_angle += self.reload_rotation_speed
             if self.reload_angle >= 360: self.reload_angle -= 360
-            rotated_spinner = pygame.transform.rotate(self.spinner_surf, self.reload_angle)
+            rotated_spinner = rotate(self.spinner_surf, self.reload_angle, step=abs(self.reload_rotation_speed))
             spinner_rect = rotated_spinner.get_rect(center=(center_x, center_y))
             self.screen.blit(rotated_spinner, spinner_rect)
 
-    def draw_victory_screen(self):
+    @traced('hud')
+    def draw_boss_warning(self):
+        alpha = abs(math.sin(self.clock.get_ticks() * 0.01)) * 255
+        warn_surf = self.get_text('warning', "WARNING: LUCIFER HAS AWOKEN", (255, 0, 0))['surf']
+        warn_surf.set_alpha(alpha)
+        warn_rect = warn_surf.get_rect(center=(WIDTH//2, HEIGHT//2 - 200))
+        self.screen.blit(warn_surf, warn_rect)
+
+    def draw_victory_background(self, draw_world):
+        draw_world()
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 200))
         self.screen.blit(overlay, (0, 0))
         
+        score_text = f"FINAL SCORE: {self.score}"
+        score_surf = self.font.render(score_text, True, (255, 255, 255))
+        score_rect = score_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
+        self.screen.blit(score_surf, score_rect)
+
+    def get_victory_title(self, w, h):
+        scaled = self.victory_scaled.get((w, h))
+        if scaled is None:
+            title_text = "HELL CONQUERED"
+            title_surf = self.get_text('victory_title', title_text, (255, 215, 0))['surf']
+            shadow_surf = self.get_text('victory_shadow', title_text, (100, 50, 0))['surf']
+            scaled = (pygame.transform.scale(title_surf, (w, h)), pygame.transform.scale(shadow_surf, (w, h)))
+            self.victory_scaled[(w, h)] = scaled
+        return scaled
+
+    @traced('hud')
+    def draw_victory_screen(self, draw_world):
+        """`draw_world()` só é chamado quando o fundo precisa ser refeito.
+        Retorna os retângulos sujos da tela."""
+        layer = self.victory_layer
+        layer.begin(self.score, lambda: self.draw_victory_background(draw_world))
+        
         current_time = pygame.time.get_ticks()
         scale = 1.0 + math.sin(current_time * 0.005) * 0.1
         
-        title_text = "HELL CONQUERED"
-        title_surf = self.font.render(title_text, True, (255, 215, 0))
+        title_surf = self.get_text('victory_title', "HELL CONQUERED", (255, 215, 0))['surf']
         w = int(title_surf.get_width() * 2 * scale)
         h = int(title_surf.get_height() * 2 * scale)
-        scaled_surf = pygame.transform.scale(title_surf, (w, h))
+        scaled_surf, scaled_shadow = self.get_victory_title(w, h)
         title_rect = scaled_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))
-        
-        shadow_surf = self.font.render(title_text, True, (100, 50, 0))
-        scaled_shadow = pygame.transform.scale(shadow_surf, (w, h))
         shadow_rect = scaled_shadow.get_rect(center=(WIDTH // 2 + 4, HEIGHT // 2 - 46))
         
-        self.screen.blit(scaled_shadow, shadow_rect)
-        self.screen.blit(scaled_surf, title_rect)
-        
-        score_text = f"FINAL SCORE: {self.score}"
-        score_surf = self.font.render(score_text, True, (255, 255, 255))
-        score_rect = score_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
-        self.screen.blit(score_surf, score_rect)
+        layer.mark(self.screen.blit(scaled_shadow, shadow_rect))
+        layer.mark(self.screen.blit(scaled_surf, title_rect))
         
         if current_time % 1000 < 500: 
-            press_text = "PRESS ENTER TO RETURN"
-            press_surf = self.font.render(press_text, True, (150, 150, 150))
+            press_surf = self.get_text('victory_press', "PRESS ENTER TO RETURN", (150, 150, 150))['surf']
             press_rect = press_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 100))
-            self.screen.blit(press_surf, press_rect)
\ No newline at end of file
+            layer.mark(self.screen.blit(press_surf, press_rect))
+        return layer.end()
\ No newline at end of file
@@ -5,74 +5,269 @@ import random
 import math 
 import copy 
 import os
+import collections
+import bisect
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from settings import *
 from player import Player
 from projectile import Bullet, EnemyBullet
 from enemy import Enemy, Boss
-from tile import Tile, Lava
-from map_data import MapGenerator
+from tile import Lava
+from map_data import MapData, MapLibrary
+from world import World
+from particles import ParticleSystem
+from collision import CollisionGrid, SpatialHash, find_combat_contacts
+from surface_cache import rotate, surface_cache, rotation_cache
+from controls import KeyboardMouse, AutoPilot
+from game_clock import game_clock
+from perf_overlay import PerfOverlay
+from tracing import tracer, traced
+from replay import SessionRecorder, ReplayController, load_replay, decode_input, state_hash
 from hud import HUD
 from menu import Menu 
 
-# -------------------------------------------------------------
-# FUNÇÃO DE COLISÃO
-# -------------------------------------------------------------
-def collide_hitbox(sprite1, sprite2):
-    r1 = sprite1.hitbox if hasattr(sprite1, 'hitbox') else sprite1.rect
-    r2 = sprite2.hitbox if hasattr(sprite2, 'hitbox') else sprite2.rect
-    return r1.colliderect(r2)
-
 # -------------------------------------------------------------
 # CÂMERA
 # -------------------------------------------------------------
 class CameraGroup(pygame.sprite.Group):
-    def __init__(self):
+    def __init__(self, clock=game_clock):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
+        # Câmera da simulação (spawn fora da tela...) e a do último desenho,
+        # que pode estar interpolada entre dois passos
         self.offset = pygame.math.Vector2()
+        self.draw_offset = pygame.math.Vector2()
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_height = self.display_surface.get_size()[1] // 2
-        self.grid_map = {} 
-
-    def add_static(self, sprite, col, row):
-        self.grid_map[(col, row)] = sprite
-
-    def custom_draw(self, player):
+        self.world = None
+
+        # --- CAMADA ESTÁTICA EM CHUNKS ---
+        # Paredes e lava são "assadas" em superfícies de CHUNK_TILES x CHUNK_TILES.
+        # O corpo do chunk é opaco; a faixa de cima guarda o que os tiles da primeira
+        # linha desenham acima da própria célula (a frente das paredes).
+        self.chunk_size = CHUNK_TILES * TILE_SIZE
+        self.chunk_cache = collections.OrderedDict()
+        self.static_overflow = 0
+
+        # Partículas ficam fora do grupo de sprites, em arrays
+        self.particles = ParticleSystem(clock=clock)
+
+        # Posição de cada sprite no passo anterior (para interpolar o desenho)
+        self.previous_topleft = {}
+
+        # Blits do último desenho (para o medidor de desempenho)
+        self.blit_count = 0
+
+    def update(self, *args, **kwargs):
+        self.previous_topleft = {sprite: sprite.rect.topleft for sprite in self.sprites()}
+        # Partículas emitidas durante o update dos sprites só andam no próximo frame
+        existing = len(self.particles)
+        if tracer.enabled: self.traced_update(*args, **kwargs)
+        else: super().update(*args, **kwargs)
+        with tracer.span('ParticleSystem', 'update', {'count': existing}):
+            self.particles.update(existing)
+
+    def traced_update(self, *args, **kwargs):
+        """O mesmo update, somando o tempo gasto por tipo de sprite. Cada tipo
+        vira um trecho do rastro, um depois do outro (a ordem dos updates não
+        muda, então os trechos são a soma, não o intervalo real)."""
+        totals = {}
+        for sprite in self.sprites():
+            start = time.perf_counter()
+            sprite.update(*args, **kwargs)
+            name = type(sprite).__name__
+            if hasattr(sprite, 'enemy_name'): name = f"{name}:{sprite.enemy_name}"
+            elapsed, count = totals.get(name, (0.0, 0))
+            totals[name] = (elapsed + time.perf_counter() - start, count + 1)
+        start = time.perf_counter() - sum(elapsed for elapsed, _ in totals.values())
+        for name, (elapsed, count) in totals.items():
+            tracer.add(name, 'update', start, start + elapsed, {'count': count})
+            start += elapsed
+
+    def interpolation_shift(self, sprite, alpha):
+        """Quanto desenhar `sprite` deslocado da posição atual para ficar a
+        `alpha` do caminho entre o passo anterior e o atual."""
+        previous = self.previous_topleft.get(sprite)
+        if previous is None or alpha >= 1: return 0, 0
+        dx = previous[0] - sprite.rect.x
+        dy = previous[1] - sprite.rect.y
+        if abs(dx) > TILE_SIZE or abs(dy) > TILE_SIZE: return 0, 0 # Teleporte: não interpola
+        return round(dx * (1 - alpha)), round(dy * (1 - alpha))
+
+    def empty(self):
+        super().empty()
+        self.particles.clear()
+
+    def set_world(self, world):
+        """Paredes e lava passam a sair do `world` (criadas por chunk, sob demanda)."""
+        self.world = world
+        self.chunk_cache.clear()
+        self.static_overflow = world.overflow
+
+    def build_chunk(self, chunk_col, chunk_row):
+        first_col = chunk_col * CHUNK_TILES
+        first_row = chunk_row * CHUNK_TILES
+        tiles = [(sprite.rect.centery, row, col, sprite)
+                 for (col, row), sprite in self.world.chunk(chunk_col, chunk_row).tiles.items()]
+        if not tiles:
+            return None
+
+        origin_x = first_col * TILE_SIZE
+        origin_y = first_row * TILE_SIZE
+        body = pygame.Surface((self.chunk_size, self.chunk_size))
+        body.fill(FLOOR_BG_COLOR)
+        overflow = None
+        if self.static_overflow > 0:
+            overflow = pygame.Surface((self.chunk_size, self.static_overflow), pygame.SRCALPHA)
+        
+        # Mesma ordem do desenho antigo: Y do centro, depois linha/coluna
+        for _, row, col, sprite in sorted(tiles, key=lambda tile: tile[:3]):
+            body.blit(sprite.image, (sprite.rect.x - origin_x, sprite.rect.y - origin_y))
+            if overflow and sprite.rect.top < origin_y:
+                overflow.blit(sprite.image, (sprite.rect.x - origin_x, sprite.rect.y - origin_y + self.static_overflow))
+        return body, overflow
+
+    def get_chunk(self, chunk_col, chunk_row):
+        key = (chunk_col, chunk_row)
+        if key in self.chunk_cache:
+            self.chunk_cache.move_to_end(key)
+            return self.chunk_cache[key]
+        chunk = self.build_chunk(chunk_col, chunk_row)
+        self.chunk_cache[key] = chunk
+        if len(self.chunk_cache) > CHUNK_CACHE_SIZE:
+            self.chunk_cache.popitem(last=False)
+        return chunk
+
+    def draw_static_chunks(self):
+        first_col = int(self.draw_offset.x // self.chunk_size)
+        last_col = int((self.draw_offset.x + WIDTH) // self.chunk_size)
+        first_row = int(self.draw_offset.y // self.chunk_size)
+        last_row = int((self.draw_offset.y + HEIGHT + self.static_overflow) // self.chunk_size)
+
+        overflows = []
+        blits = 0
+        for chunk_row in range(first_row, last_row + 1):
+            for chunk_col in range(first_col, last_col + 1):
+                chunk = self.get_chunk(chunk_col, chunk_row)
+                if chunk is None: continue
+                body, overflow = chunk
+                x = chunk_col * self.chunk_size - self.draw_offset.x
+                y = chunk_row * self.chunk_size - self.draw_offset.y
+                self.display_surface.blit(body, (x, y))
+                blits += 1
+                if overflow:
+                    overflows.append((overflow, (x, y - self.static_overflow)))
+        # As faixas de cima vêm depois: a parede da linha de baixo cobre a de cima
+        for overflow, pos in overflows:
+            self.display_surface.blit(overflow, pos)
+        return blits + len(overflows)
+
+    def update_offset(self, player):
         self.offset.x = player.rect.centerx - self.half_width
         self.offset.y = player.rect.centery - self.half_height
+
+    @traced('draw')
+    def custom_draw(self, player, alpha=1.0):
+        """Desenha o mundo; com `alpha` < 1 os sprites (e a câmera) ficam
+        interpolados entre o passo anterior da simulação e o atual."""
+        shift_x, shift_y = self.interpolation_shift(player, alpha)
+        self.draw_offset.x = player.rect.centerx + shift_x - self.half_width
+        self.draw_offset.y = player.rect.centery + shift_y - self.half_height
         self.display_surface.fill(FLOOR_BG_COLOR)
+        self.blit_count = self.draw_static_chunks()
         
-        padding = 6
-        start_col = int(self.offset.x // TILE_SIZE) - padding
-        end_col = int((self.offset.x + WIDTH) // TILE_SIZE) + padding
-        start_row = int(self.offset.y // TILE_SIZE) - padding
-        end_row = int((self.offset.y + HEIGHT) // TILE_SIZE) + padding
-        
-        sprites_to_draw = []
+        draw_list = []
         margin = 1500 
         # Adiciona sprites dinâmicos (inimigos, player, balas)
-        for sprite in self.sprites():
+        for index, sprite in enumerate(self.sprites()):
             if -margin < sprite.rect.centerx - player.rect.centerx < WIDTH + margin and \
                -margin < sprite.rect.centery - player.rect.centery < HEIGHT + margin:
-                sprites_to_draw.append(sprite)
-
-        # Adiciona sprites estáticos (paredes, lava) baseados na grade visível
-        for row in range(start_row, end_row):
-            for col in range(start_col, end_col):
-                sprite = self.grid_map.get((col, row))
-                if sprite:
-                    sprites_to_draw.append(sprite)
+                # Área onde o sprite vai aparecer neste desenho
+                area = sprite.rect.move(self.interpolation_shift(sprite, alpha))
+                draw_list.append(((area.centery, 0, index), sprite, area))
+
+                # Tiles que encostam no sprite são redesenhados só na área dele,
+                # para manter a profundidade (parede na frente/atrás do sprite)
+                start_col = area.left // TILE_SIZE
+                end_col = (area.right - 1) // TILE_SIZE
+                start_row = area.top // TILE_SIZE
+                end_row = (area.bottom - 1 + self.static_overflow) // TILE_SIZE
+                for row in range(start_row, end_row + 1):
+                    for col in range(start_col, end_col + 1):
+                        tile = self.world.tile(col, row)
+                        if tile and tile.rect.colliderect(area):
+                            draw_list.append(((tile.rect.centery, 1, row, col, index), tile, area))
+
+        # Partículas entram em lote entre os sprites, também pelo Y
+        # (não são interpoladas: andam pouco e vivem pouco)
+        indices, centers_y = self.particles.visible(player.rect.center, WIDTH + margin, HEIGHT + margin)
+        particle_blits = self.particles.blit_sequence(indices, self.draw_offset)
+        centers_y = centers_y.tolist()
+        next_particle = 0
 
         # Desenha ordenado pelo Y (efeito de profundidade)
-        for sprite in sorted(sprites_to_draw, key=lambda s: s.rect.centery):
-            offset_pos = sprite.rect.topleft - self.offset
-            self.display_surface.blit(sprite.image, offset_pos)
+        for key, sprite, area in sorted(draw_list, key=lambda entry: entry[0]):
+            end = bisect.bisect_left(centers_y, key[0], next_particle)
+            if end > next_particle:
+                self.display_surface.blits(particle_blits[next_particle:end], doreturn=False)
+                next_particle = end
+            if key[1] == 0:
+                self.display_surface.blit(sprite.image, area.topleft - self.draw_offset)
+            else:
+                clip = sprite.rect.clip(area)
+                source = clip.move(-sprite.rect.x, -sprite.rect.y)
+                self.display_surface.blit(sprite.image, clip.topleft - self.draw_offset, source)
+        if next_particle < len(particle_blits):
+            self.display_surface.blits(particle_blits[next_particle:], doreturn=False)
+        self.blit_count += len(draw_list) + len(particle_blits)
+
+# -------------------------------------------------------------
+# GRUPO DE INIMIGOS (com hash espacial para a separação)
+# -------------------------------------------------------------
+class EnemyGroup(pygame.sprite.Group):
+    def __init__(self):
+        super().__init__()
+        self.spatial_hash = SpatialHash()
+
+    def rebuild_hash(self):
+        self.spatial_hash.rebuild(self.sprites())
 
 # -------------------------------------------------------------
 # CLASSE DO JOGO
 # -------------------------------------------------------------
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, autopilot_seed=0, record_path=None, map_seed=None, map_library=None,
+                 clock=game_clock):
+        # Sem janela: drivers falsos de vídeo/áudio, nada é desenhado e o
+        # player é controlado pelo piloto automático
+        self.headless = headless
+        self.autopilot_seed = autopilot_seed
+        self.difficulty = 'MEDIUM'
+
+        # Relógio da simulação: repassado a tudo que é criado pelo jogo
+        # (outro Game, um teste ou um benchmark podem ter o próprio)
+        self.game_clock = clock
+
+        # Gravação da sessão (entrada e sementes) e controle da reprodução
+        self.recorder = SessionRecorder(record_path, clock, map_library) if record_path else None
+        self.replay_controller = None
+
+        # Cada mapa sai de uma semente (sorteada aqui); o próximo mapa e a
+        # arena do boss são gerados numa thread enquanto o jogador joga
+        self.map_seeds = random.Random(map_seed)
+        self.map_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='map')
+        self.next_map = None # (semente, future)
+        self.next_arena = None
+        # Mapas pré-gerados em disco (opcional): começam na hora, sem gerar nada
+        self.map_library = MapLibrary(map_library) if map_library else None
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        # Sem janela ninguém vê o player e o boss: só o estado da animação avança
+        Player.render = Enemy.render = not headless
+
         pygame.init()
         pygame.mixer.init()
         
@@ -89,6 +284,9 @@ class Game:
         self.current_sfx_vol = SFX_VOLUME
         pygame.mixer.music.set_volume(self.current_music_vol)
         
+        # Gerador próprio para a música: sortear a faixa não pode mexer no
+        # random global, senão o jogo com som e sem som divergem
+        self.music_rng = random.Random()
         self.music_tracks = {
             'menu': 'audio/menu.mp3', 
             'game': ['audio/game2.mp3', 'audio/game1.mp3'],
@@ -97,27 +295,38 @@ class Game:
         
         self.play_music('menu', force_start=True)
 
+        # Texturas fixas montadas uma vez só
+        Lava.build_atlas()
+        Enemy.build_atlas()
+
         self.base_enemy_data = copy.deepcopy(ENEMIES_DATA)
         self.max_enemies = MAX_ENEMIES
         self.spawn_rate = ENEMY_SPAWN_RATE
 
-        self.visible_sprites = CameraGroup()        
-        self.obstacle_sprites = pygame.sprite.Group() 
-        self.lava_sprites = pygame.sprite.Group()
+        self.visible_sprites = CameraGroup(clock)        
         self.bullet_sprites = pygame.sprite.Group()   
-        self.enemy_sprites = pygame.sprite.Group()    
-        self.movement_obstacles = pygame.sprite.Group()
+        self.enemy_sprites = EnemyGroup()    
         self.enemy_bullet_sprites = pygame.sprite.Group() 
+        self.collision_grid = CollisionGrid()
 
-        self.hud = HUD(self.screen)
+        self.hud = HUD(self.screen, clock)
         self.last_spawn_time = 0
-        self.valid_tiles = [] 
+        self.world = None
         self.crosshair_angle = 0
+        self.crosshair_surf = self.build_crosshair()
         
         self.boss_fight_active = False
         self.warning_timer = 0
 
+        # Tempo real ainda não simulado (em ms); cada passo consome SIM_STEP_MS
+        self.sim_accumulator = 0
+
+        # Tempos por fase do frame (F3 mostra, F4 exporta CSV)
+        self.perf = PerfOverlay()
+
+    @traced('audio')
     def play_music(self, track_type, force_start=False):
+        if self.headless: return
         try:
             if track_type == 'menu':
                 if force_start or not pygame.mixer.music.get_busy():
@@ -126,7 +335,7 @@ class Game:
                     pygame.mixer.music.play(-1, fade_ms=1000)
             
             elif track_type == 'game':
-                chosen = random.choice(self.music_tracks['game'])
+                chosen = self.music_rng.choice(self.music_tracks['game'])
                 pygame.mixer.music.load(chosen)
                 pygame.mixer.music.set_volume(self.current_music_vol)
                 pygame.mixer.music.play(-1, fade_ms=500)
@@ -145,6 +354,7 @@ class Game:
 
     def apply_difficulty(self, difficulty):
         global ENEMIES_DATA
+        self.difficulty = difficulty
         ENEMIES_DATA = copy.deepcopy(self.base_enemy_data)
         
         if difficulty == 'EASY':
@@ -158,83 +368,122 @@ class Game:
                 ENEMIES_DATA[enemy]['health'] *= 1.8
                 ENEMIES_DATA[enemy]['speed'] *= 1.3
 
-    def setup_map(self):
+    def prefetch_map(self, seed=None, width=MAP_WIDTH, height=MAP_HEIGHT):
+        """Começa a gerar o próximo mapa (de `seed` ou da próxima semente) na thread."""
+        if self.next_map is None and self.map_library is None:
+            if seed is None: seed = self.map_seeds.getrandbits(32)
+            self.next_map = (seed, self.map_worker.submit(MapData.generate, seed, width, height))
+
+    def take_map(self, seed=None):
+        """MapData do mapa a montar: da biblioteca, se houver uma (sem `seed`,
+        sorteia um dos mapas dela); o pré-gerado, se for o pedido (esperando
+        a thread terminar, se preciso); senão gera agora."""
+        if self.map_library is not None:
+            if seed is None: seed = self.map_seeds.choice(self.map_library.seeds)
+            data = self.map_library.get(seed)
+            if data is not None: return data
+        if self.next_map is not None and seed in (None, self.next_map[0]):
+            _, future = self.next_map
+            self.next_map = None
+            return future.result()
+        if seed is None: seed = self.map_seeds.getrandbits(32)
+        return MapData.generate(seed)
+
+    def prefetch_arena(self):
+        if self.next_arena is None:
+            self.next_arena = self.map_worker.submit(MapData.arena)
+
+    def stop_map_worker(self):
+        """Encerra a thread dos mapas sem esperar: o que ainda não começou é
+        cancelado e os mapas pré-gerados são esquecidos."""
+        self.map_worker.shutdown(wait=False, cancel_futures=True)
+        self.next_map = None
+        self.next_arena = None
+
+    def quit(self):
+        self.stop_map_worker()
+        pygame.quit()
+        sys.exit()
+
+    def load_world(self, data):
+        """Troca o mapa: os tiles só são criados, por chunk, quando alguém
+        passa perto. Retorna a posição (pixels) do player."""
+        self.world = World(data)
+        self.visible_sprites.set_world(self.world)
+        self.collision_grid.set_world(self.world)
+        col, row = data.player
+        return col * TILE_SIZE, row * TILE_SIZE
+
+    def replay_map(self, segment, library):
+        """O MapData de um segmento gravado, conferido pelo tamanho e pelo crc
+        da grade. Se o mapa à mão (biblioteca/pré-gerado) não for o gravado,
+        gera de novo com o tamanho gravado; se ainda assim não bater, o mapa
+        veio de uma biblioteca que não está aberta: erro em vez de divergir."""
+        data = self.take_map(segment.seed)
+        if (data.width, data.height, data.crc()) == (segment.width, segment.height, segment.grid_crc):
+            return data
+        data = MapData.generate(segment.seed, segment.width, segment.height)
+        if data.crc() == segment.grid_crc:
+            return data
+        source = f"da biblioteca '{library}' (use --maps)" if library else "de outra versão do gerador"
+        raise ValueError(f"O mapa {segment.width}x{segment.height} da semente {segment.seed} não está disponível: "
+                         f"a gravação usou o mapa {source}")
+
+    @traced('map')
+    def setup_map(self, seed=None, data=None):
+        """Monta um mapa novo (o pré-gerado, com `seed` o dessa semente ou o `data` dado).
+        O random global também é semeado com ela: spawns e sorteios dos
+        inimigos do mapa ficam reproduzíveis (a gravação guarda a semente e o crc da grade)."""
         self.boss_fight_active = False
         self.visible_sprites.empty()
-        self.obstacle_sprites.empty()
-        self.lava_sprites.empty()
         self.bullet_sprites.empty()
         self.enemy_sprites.empty()
-        self.movement_obstacles.empty()
         self.enemy_bullet_sprites.empty()
-        self.visible_sprites.grid_map = {}
 
-        generator = MapGenerator()
-        generated_map, self.valid_tiles = generator.get_map() 
-
-        player_x, player_y = 0, 0
-        
-        for row_index, row_list in enumerate(generated_map): 
-            for col_index, tile_type in enumerate(row_list): 
-                x = col_index * TILE_SIZE
-                y = row_index * TILE_SIZE
-                
-                if tile_type == 'W':
-                    wall = Tile((x, y), [self.obstacle_sprites], generated_map, row_index, col_index)
-                    self.visible_sprites.add_static(wall, col_index, row_index)
-                elif tile_type == 'L':
-                    lava = Lava((x, y), [self.lava_sprites], generated_map, row_index, col_index)
-                    self.visible_sprites.add_static(lava, col_index, row_index)
-                elif tile_type == 'P':
-                    player_x, player_y = x, y
-        
-        self.movement_obstacles.add(self.obstacle_sprites)
-        self.movement_obstacles.add(self.lava_sprites)
+        if data is None: data = self.take_map(seed)
+        player_x, player_y = self.load_world(data)
+        if self.recorder is not None:
+            self.recorder.start_segment(data, self.difficulty, self.last_spawn_time)
+        random.seed(data.seed)
 
         self.player = Player(
             (player_x, player_y), 
             [self.visible_sprites], 
-            self.movement_obstacles, 
             self.create_bullet, 
-            self.visible_sprites
+            self.visible_sprites,
+            self.collision_grid,
+            self.make_controller(),
+            self.game_clock
         )
         
         self.spawn_horde(5)
         self.hud.score = 0
 
+    def make_controller(self):
+        if self.replay_controller is not None: return self.replay_controller
+        controller = AutoPilot(self.enemy_sprites, self.autopilot_seed) if self.headless else KeyboardMouse()
+        if self.recorder is not None: controller = self.recorder.wrap(controller)
+        return controller
+
+    @traced('map')
     def start_boss_fight(self):
         print("--- ATENÇÃO: LÚCIFER DESPERTOU ---")
         self.boss_fight_active = True
-        self.warning_timer = pygame.time.get_ticks()
+        self.warning_timer = self.game_clock.get_ticks()
         
         self.enemy_sprites.empty()
         self.bullet_sprites.empty()
         self.enemy_bullet_sprites.empty()
         
         self.visible_sprites.empty()
-        self.obstacle_sprites.empty()
-        self.lava_sprites.empty()
-        self.movement_obstacles.empty()
-        self.visible_sprites.grid_map = {}
         
-        generator = MapGenerator()
-        generated_map, self.valid_tiles, boss_pos_tile = generator.generate_arena()
+        self.prefetch_arena()
+        arena, boss_pos_tile = self.next_arena.result()
+        self.next_arena = None
         
-        player_pos_pixel = (0,0)
+        player_pos_pixel = self.load_world(arena)
         boss_pos_pixel = (boss_pos_tile[0] * TILE_SIZE, boss_pos_tile[1] * TILE_SIZE)
 
-        for row_index, row_list in enumerate(generated_map): 
-            for col_index, tile_type in enumerate(row_list): 
-                x = col_index * TILE_SIZE
-                y = row_index * TILE_SIZE
-                if tile_type == 'W':
-                    wall = Tile((x, y), [self.obstacle_sprites], generated_map, row_index, col_index)
-                    self.visible_sprites.add_static(wall, col_index, row_index)
-                elif tile_type == 'P':
-                    player_pos_pixel = (x, y)
-
-        self.movement_obstacles.add(self.obstacle_sprites)
-        
         self.player.rect.topleft = player_pos_pixel
         self.player.hitbox.center = self.player.rect.center
         self.player.pos = pygame.math.Vector2(self.player.rect.center)
@@ -244,23 +493,25 @@ class Game:
              [self.visible_sprites, self.enemy_sprites], 
              self.player, 
              self.enemy_sprites, 
-             self.movement_obstacles, 
              self.spawn_specific_enemy, 
              self.hud,
-             self.create_enemy_bullet)
+             self.create_enemy_bullet,
+             self.collision_grid,
+             self.game_clock)
 
     def create_bullet(self, pos, angle, speed, lifetime, color, damage):
-        Bullet(pos, angle, [self.visible_sprites, self.bullet_sprites], self.obstacle_sprites, speed, lifetime, color, damage) 
+        Bullet(pos, angle, [self.visible_sprites, self.bullet_sprites], speed, lifetime, color, damage, self.collision_grid, self.game_clock)
 
     def create_enemy_bullet(self, pos, angle, speed, damage):
-        EnemyBullet(pos, angle, [self.visible_sprites, self.enemy_bullet_sprites], self.obstacle_sprites, speed, damage)
+        EnemyBullet(pos, angle, [self.visible_sprites, self.enemy_bullet_sprites], self.collision_grid, speed, damage, self.game_clock)
 
     def spawn_specific_enemy(self, pos, enemy_name):
         if len(self.enemy_sprites) < self.max_enemies + 10: 
-            Enemy(pos, [self.visible_sprites, self.enemy_sprites], self.player, self.enemy_sprites, self.movement_obstacles, enemy_name, self.spawn_specific_enemy, self.hud)
+            Enemy(pos, [self.visible_sprites, self.enemy_sprites], self.player, self.enemy_sprites, enemy_name, self.spawn_specific_enemy, self.hud, self.collision_grid, self.game_clock)
 
+    @traced('update')
     def enemy_spawner(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.game_clock.get_ticks()
         if len(self.enemy_sprites) < self.max_enemies and current_time - self.last_spawn_time > self.spawn_rate:
             self.last_spawn_time = current_time
             self.spawn_horde(1)
@@ -275,11 +526,14 @@ class Game:
         
         enemy_types = [e for e in ENEMIES_DATA.keys() if e != 'minion' and e != 'lucifer']
         enemy_weights = [ENEMIES_DATA[e]['weight'] for e in enemy_types]
+        # Só os tiles dos chunks ao alcance: num mapa grande, sortear no mapa
+        # inteiro quase nunca cairia perto do player
+        candidates = self.world.spawn_candidates(self.player.rect.center, SPAWN_RADIUS_MAX)
         
         while spawned_count < amount and attempts < 100:
             attempts += 1
-            if not self.valid_tiles: break
-            tile_pos = random.choice(self.valid_tiles)
+            if not candidates: break
+            tile_pos = random.choice(candidates)
             pixel_x = tile_pos[0] * TILE_SIZE + TILE_SIZE // 2
             pixel_y = tile_pos[1] * TILE_SIZE + TILE_SIZE // 2
             pixel_pos = (pixel_x, pixel_y)
@@ -289,13 +543,10 @@ class Game:
             
             if dist_vec.magnitude() < SPAWN_RADIUS_MAX:
                 chosen_enemy = random.choices(enemy_types, weights=enemy_weights, k=1)[0]
-                Enemy(pixel_pos, [self.visible_sprites, self.enemy_sprites], self.player, self.enemy_sprites, self.movement_obstacles, chosen_enemy, self.spawn_specific_enemy, self.hud)
+                Enemy(pixel_pos, [self.visible_sprites, self.enemy_sprites], self.player, self.enemy_sprites, chosen_enemy, self.spawn_specific_enemy, self.hud, self.collision_grid, self.game_clock)
                 spawned_count += 1
 
-    def draw_crosshair(self):
-        mx, my = pygame.mouse.get_pos()
-        self.crosshair_angle += 2 
-        if self.crosshair_angle >= 360: self.crosshair_angle -= 360
+    def build_crosshair(self):
         size = 15
         color = (255, 50, 50)
         thickness = 3
@@ -304,11 +555,177 @@ class Game:
         pygame.draw.line(surf, color, (center[0], center[1] - size), (center[0], center[1] + size), thickness)
         pygame.draw.line(surf, color, (center[0] - size, center[1]), (center[0] + size, center[1]), thickness)
         pygame.draw.circle(surf, (255, 255, 255), center, 2)
-        rotated_surf = pygame.transform.rotate(surf, self.crosshair_angle)
+        return surf
+
+    def draw_crosshair(self):
+        mx, my = pygame.mouse.get_pos()
+        self.crosshair_angle += 2 
+        if self.crosshair_angle >= 360: self.crosshair_angle -= 360
+        rotated_surf = rotate(self.crosshair_surf, self.crosshair_angle)
         rect = rotated_surf.get_rect(center=(mx, my))
         self.screen.blit(rotated_surf, rect)
 
+    def update_playing(self):
+        """Um passo da simulação do estado 'playing' (sem desenhar nada)."""
+        # Deixa o próximo mapa (e, perto do boss, a arena) sendo gerado
+        self.prefetch_map()
+        if self.hud.score >= ARENA_PREFETCH_SCORE and not self.boss_fight_active:
+            self.prefetch_arena()
+
+        self.update_entities()
+
+        # TRIGGER DA BOSS FIGHT E MÚSICA
+        if self.hud.score >= BOSS_TRIGGER_SCORE and not self.boss_fight_active:
+            self.start_boss_fight()
+            self.play_music('boss') # <--- TOCA A MÚSICA AQUI
+
+        if self.player.alive:
+            if not self.boss_fight_active:
+                self.enemy_spawner()
+            self.perf.lap('update')
+            self.resolve_collisions()
+            self.perf.lap('collision')
+
+        self.visible_sprites.update_offset(self.player)
+        self.world.stream(self.player.rect.center)
+        self.game_clock.advance()
+        if self.recorder is not None: self.recorder.end_step(self)
+        self.perf.lap('update')
+
+    @traced('update')
+    def update_entities(self):
+        with tracer.span('rebuild_hash', 'update'):
+            self.enemy_sprites.rebuild_hash()
+        self.visible_sprites.update()
+        with tracer.span('enemy_bullets', 'update', {'count': len(self.enemy_bullet_sprites)}):
+            self.enemy_bullet_sprites.update()
+
+    @traced('collision')
+    def resolve_collisions(self):
+        # Broad phase única para os três tipos de contato
+        hits, enemy_contacts, bullet_contacts = find_combat_contacts(
+            self.player, self.bullet_sprites, self.enemy_sprites, self.enemy_bullet_sprites)
+
+        # Colisões de Tiros Player -> Inimigos
+        for bullet in hits: bullet.kill()
+        for bullet, hit_enemies in hits.items():
+            for enemy in hit_enemies:
+                enemy.take_damage(bullet.damage)
+                if enemy.health <= 0:
+                    enemy.kill()
+                    self.hud.add_score(enemy.stats['points'])
+
+                    # Lógica de Vitória
+                    if enemy.enemy_name == 'lucifer':
+                        print("LÚCIFER DERROTADO!")
+                        self.game_state = 'victory' 
+                        self.boss_fight_active = False
+
+        # Colisões de Contato (Inimigo -> Player)
+        # (quem morreu para as balas acima já saiu do grupo)
+        if any(enemy.alive() for enemy in enemy_contacts):
+            self.player.die()
+
+        # Colisões de Balas Inimigas -> Player
+        if bullet_contacts:
+            for enemy_bullet in bullet_contacts: enemy_bullet.kill()
+            self.player.die()
+
+    def step_playing(self):
+        """Simula quantos passos fixos couberem no tempo acumulado e retorna
+        a fração (0..1) de passo que sobrou, usada para interpolar o desenho."""
+        steps = 0
+        while self.sim_accumulator >= self.game_clock.step_ms:
+            if steps == MAX_SIM_STEPS_PER_FRAME:
+                # Sobrecarga: descarta o atraso (o jogo desacelera, mas não trava)
+                self.sim_accumulator = 0
+                break
+            self.update_playing()
+            self.sim_accumulator -= self.game_clock.step_ms
+            steps += 1
+            if self.game_state != 'playing': break
+        return min(1.0, self.sim_accumulator / self.game_clock.step_ms)
+
+    def draw_playing(self, alpha=1.0):
+        self.visible_sprites.custom_draw(self.player, alpha)
+        self.perf.lap('draw')
+
+        if self.boss_fight_active and self.game_clock.get_ticks() - self.warning_timer < 4000:
+            self.hud.draw_boss_warning()
+
+        self.hud.draw(self.player.current_ammo, self.player.is_reloading, self.player.weapon_index, self.player.alive) 
+        if self.player.alive: self.draw_crosshair()
+        self.perf.lap('hud')
+
+    def perf_counts(self):
+        return (len(self.enemy_sprites), len(self.bullet_sprites), len(self.enemy_bullet_sprites),
+                len(self.visible_sprites.particles), self.visible_sprites.blit_count)
+
+    def perf_details(self):
+        """Linhas extras do medidor: descartes de partículas e uso dos caches."""
+        lines = [f"partículas descartadas {self.visible_sprites.particles.dropped_total}"]
+        for name, stats in (('superfícies', surface_cache.stats()), ('rotações', rotation_cache.stats())):
+            lookups = stats['hits'] + stats['misses']
+            hit_rate = stats['hits'] / lookups if lookups else 0
+            lines.append(f"cache {name} {stats['size']} ({stats['bytes'] // 1024} KB, {hit_rate:.0%} acertos)")
+        if self.world is not None:
+            lines.append(f"chunks do mapa {len(self.world.chunks)} ({self.world.evicted} descartados)")
+        return lines
+
+    def run_headless(self, frames, difficulty='MEDIUM'):
+        """Roda `frames` passos do estado 'playing' sem janela e sem limite de
+        FPS (cada passo avança o relógio do jogo em SIM_STEP_MS); quando o
+        player morre ou vence, começa outro mapa. Retorna a quantidade de
+        passos por segundo."""
+        self.apply_difficulty(difficulty)
+        self.setup_map()
+        self.game_state = 'playing'
+        start = time.perf_counter()
+        for _ in range(frames):
+            pygame.event.pump()
+            self.update_playing()
+            if self.game_state == 'victory' or not self.player.alive:
+                self.setup_map()
+                self.game_state = 'playing'
+            self.perf.end_frame(self.perf_counts())
+        return frames / (time.perf_counter() - start)
+
+    def run_replay(self, path, draw=False):
+        """Refaz uma gravação passo a passo, sem limite de FPS (com `draw`,
+        desenhando cada passo), e confere o hash do estado a cada passo.
+        Retorna (passos por segundo, (segmento, passo) da primeira
+        divergência ou None)."""
+        step_ms, library, segments = load_replay(path)
+        self.game_clock.step_ms = step_ms
+        self.replay_controller = ReplayController()
+        mismatch = None
+        steps = 0
+        start = time.perf_counter()
+        for index, segment in enumerate(segments):
+            self.apply_difficulty(segment.difficulty)
+            self.game_clock.reset(segment.clock_time)
+            self.last_spawn_time = segment.last_spawn_time
+            self.setup_map(data=self.replay_map(segment, library))
+            if index + 1 < len(segments):
+                following = segments[index + 1]
+                self.prefetch_map(following.seed, following.width, following.height)
+            self.game_state = 'playing'
+            for step, record in enumerate(segment.steps.tolist()):
+                pygame.event.pump()
+                self.replay_controller.state = decode_input(*record[:4])
+                self.update_playing()
+                if draw:
+                    self.draw_playing()
+                    pygame.display.update()
+                self.perf.end_frame(self.perf_counts())
+                steps += 1
+                if mismatch is None and state_hash(self) != record[4]:
+                    mismatch = (index, step)
+                    print(f"Divergência no segmento {index}, passo {step}")
+        return steps / max(time.perf_counter() - start, 1e-9), mismatch
+
     def run(self):
+        drawn_state = None
         while True:
             import settings
             settings.MUSIC_VOLUME = self.current_music_vol
@@ -316,7 +733,22 @@ class Game:
             pygame.mixer.music.set_volume(self.current_music_vol)
 
             for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+                if event.type == pygame.QUIT: self.quit()
+                if event.type == pygame.WINDOWEXPOSED: drawn_state = None
+
+                # Medidor de desempenho (em qualquer tela)
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.perf.toggle()
+                    drawn_state = None # Menus: redesenha a tela inteira sem o painel
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    print(f"Desempenho exportado: {self.perf.export_csv()}")
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    if tracer.enabled:
+                        tracer.stop()
+                        print(f"Rastro salvo: {tracer.dump()}")
+                    else:
+                        tracer.start()
+                        print("Rastro ligado (F5 de novo para salvar)")
                 
                 if event.type == pygame.KEYDOWN:
                     # MENU
@@ -329,7 +761,7 @@ class Game:
                             choice = self.menu.main_options[self.menu.main_index]
                             if choice == 'PLAY': self.game_state = 'difficulty_select'
                             elif choice == 'SETTINGS': self.game_state = 'settings'
-                            elif choice == 'QUIT': pygame.quit(); sys.exit()
+                            elif choice == 'QUIT': self.quit()
 
                     # SETTINGS
                     elif self.game_state == 'settings':
@@ -380,69 +812,75 @@ class Game:
                             self.play_music('menu')
                             self.setup_map()
 
+            self.perf.lap('events')
+
+            # Telas com fundo em cache são refeitas por inteiro ao entrar nelas
+            if self.game_state != drawn_state:
+                self.menu.invalidate()
+                self.hud.invalidate()
+                drawn_state = self.game_state
+                # Entrando no jogo: o primeiro frame já simula um passo
+                self.sim_accumulator = self.game_clock.step_ms
+
             # DRAW & UPDATE
+            # (menus e vitória retornam só as áreas que mudaram; o jogo atualiza a tela toda)
+            dirty_rects = None
+            self.visible_sprites.blit_count = 0
             if self.game_state == 'menu':
-                self.menu.run('menu')
+                dirty_rects = self.menu.run('menu')
             elif self.game_state == 'settings':
-                self.menu.run('settings', self.current_music_vol, self.current_sfx_vol)
+                dirty_rects = self.menu.run('settings', self.current_music_vol, self.current_sfx_vol)
             elif self.game_state == 'difficulty_select':
-                self.menu.run('difficulty_select')
+                dirty_rects = self.menu.run('difficulty_select')
             elif self.game_state == 'playing':
-                self.visible_sprites.update()
-                self.enemy_bullet_sprites.update()
-
-                # TRIGGER DA BOSS FIGHT E MÚSICA
-                if self.hud.score >= BOSS_TRIGGER_SCORE and not self.boss_fight_active:
-                    self.start_boss_fight()
-                    self.play_music('boss') # <--- TOCA A MÚSICA AQUI
-
-                if self.player.alive:
-                    if not self.boss_fight_active:
-                        self.enemy_spawner()
-                    
-                    # Colisões de Tiros Player -> Inimigos
-                    hits = pygame.sprite.groupcollide(self.bullet_sprites, self.enemy_sprites, True, False, collided=collide_hitbox)
-                    for bullet, hit_enemies in hits.items():
-                        for enemy in hit_enemies:
-                            enemy.take_damage(bullet.damage)
-                            if enemy.health <= 0:
-                                enemy.kill()
-                                self.hud.add_score(enemy.stats['points'])
-                                
-                                # Lógica de Vitória
-                                if enemy.enemy_name == 'lucifer':
-                                    print("LÚCIFER DERROTADO!")
-                                    self.game_state = 'victory' 
-                                    self.boss_fight_active = False
-
-                    # Colisões de Contato (Inimigo -> Player)
-                    if pygame.sprite.spritecollide(self.player, self.enemy_sprites, False, collided=collide_hitbox):
-                        self.player.die()
-
-                    # Colisões de Balas Inimigas -> Player
-                    if pygame.sprite.spritecollide(self.player, self.enemy_bullet_sprites, True, collided=collide_hitbox):
-                        self.player.die()
-
-                self.visible_sprites.custom_draw(self.player)
-                
-                if self.boss_fight_active and pygame.time.get_ticks() - self.warning_timer < 4000:
-                    alpha = abs(math.sin(pygame.time.get_ticks() * 0.01)) * 255
-                    warn_surf = self.hud.font.render("WARNING: LUCIFER HAS AWOKEN", True, (255, 0, 0))
-                    warn_surf.set_alpha(alpha)
-                    warn_rect = warn_surf.get_rect(center=(WIDTH//2, HEIGHT//2 - 200))
-                    self.screen.blit(warn_surf, warn_rect)
-
-                self.hud.draw(self.player.current_ammo, self.player.is_reloading, self.player.weapon_index, self.player.alive) 
-                if self.player.alive: self.draw_crosshair()
+                alpha = self.step_playing()
+                self.draw_playing(alpha)
             
             # DRAW VICTORY
             elif self.game_state == 'victory':
-                self.visible_sprites.custom_draw(self.player)
-                self.hud.draw_victory_screen()
+                dirty_rects = self.hud.draw_victory_screen(lambda: self.visible_sprites.custom_draw(self.player))
+            self.perf.lap('draw')
+
+            if self.perf.visible:
+                panel_rect = self.perf.draw(self.screen, self.perf_details())
+                if dirty_rects is not None: dirty_rects.append(panel_rect)
+                self.perf.lap('overlay')
 
-            pygame.display.update()
-            self.clock.tick(FPS)
+            if dirty_rects is None: pygame.display.update()
+            else: pygame.display.update(dirty_rects)
+            self.perf.lap('display')
+            self.sim_accumulator += self.clock.tick(FPS)
+            self.perf.lap('tick')
+            self.perf.end_frame(self.perf_counts())
 
 if __name__ == '__main__':
-    game = Game()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Angel vs Sins')
+    parser.add_argument('--headless', action='store_true', help='simula sem janela, com o piloto automático')
+    parser.add_argument('--frames', type=int, default=3600, help='passos da simulação sem janela')
+    parser.add_argument('--difficulty', choices=['EASY', 'MEDIUM', 'HARD'], default='MEDIUM')
+    parser.add_argument('--seed', type=int, default=0, help='semente dos mapas e do piloto automático (sem janela)')
+    parser.add_argument('--trace', metavar='ARQUIVO', help='grava o rastro de execução (JSON do Chrome) desde o início')
+    parser.add_argument('--record', metavar='ARQUIVO', help='grava a entrada e as sementes da sessão')
+    parser.add_argument('--replay', metavar='ARQUIVO', help='refaz uma gravação (desenhando, a menos que --headless)')
+    parser.add_argument('--maps', metavar='ARQUIVO', help='biblioteca de mapas pré-gerados (python map_data.py ARQUIVO)')
+    args = parser.parse_args()
+
+    if args.trace: tracer.start()
+    game = None
+    try:
+        if args.replay:
+            game = Game(headless=args.headless, map_library=args.maps)
+            steps_per_second, mismatch = game.run_replay(args.replay, draw=not args.headless)
+            print(f"Reprodução: {steps_per_second:.1f} passos/s, {'divergiu' if mismatch else 'idêntica'}")
+        elif args.headless:
+            game = Game(headless=True, autopilot_seed=args.seed, record_path=args.record, map_seed=args.seed,
+                        map_library=args.maps)
+            steps_per_second = game.run_headless(args.frames, args.difficulty)
+            print(f"{args.frames} passos, {steps_per_second:.1f} passos/s, score {game.hud.score}")
+        else:
+            game = Game(record_path=args.record, map_library=args.maps)
+            game.run()
+    finally:
+        if game is not None: game.stop_map_worker()
+        if game is not None and game.recorder is not None: print(f"Sessão gravada: {game.recorder.save()}")
+        if args.trace: print(f"Rastro salvo: {tracer.dump(args.trace)}")
\ No newline at end of file
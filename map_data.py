@@ -1,135 +1,336 @@
 # map_data.py
+import mmap
+import zlib
+import struct
 import random
+import argparse
+import collections
+import collections.abc
+import numpy as np
 from settings import *
+from tracing import traced
+
+# Códigos dos tiles na grade: o próprio caractere em ASCII
+WALL, FLOOR, LAVA, PLAYER = (ord(char) for char in 'W LP')
+
+# -------------------------------------------------------------
+# SORTEIOS EM LOTE (mesma sequência das chamadas ao random)
+# -------------------------------------------------------------
+def walk_directions(steps, rng=random):
+    """As `steps` direções (0..3) que `rng.randint(0, 3)` daria em
+    sequência, geradas de uma vez a partir do estado de `rng` (o random
+    global ou um random.Random), que depois é avançado exatamente como as
+    chamadas o avançariam.
+
+    O random do Python é um MT19937: randint(0, 3) lê os 3 bits mais altos
+    de uma palavra de 32 bits e descarta (lendo outra) se der 4..7. O
+    MT19937 do NumPy, com o mesmo estado, gera as mesmas palavras."""
+    _, internal, gauss_next = rng.getstate()
+    def generator():
+        bit_generator = np.random.MT19937()
+        bit_generator.state = {'bit_generator': 'MT19937',
+                               'state': {'key': np.array(internal[:-1], dtype=np.uint32), 'pos': internal[-1]}}
+        return bit_generator
+
+    bit_generator = generator()
+    words = bit_generator.random_raw(2 * steps + 64) >> 29
+    while np.count_nonzero(words < 4) < steps:
+        words = np.concatenate((words, bit_generator.random_raw(steps + 64) >> 29))
+    accepted = np.flatnonzero(words < 4)[:steps]
+
+    # Avança o gerador só pelas palavras que as chamadas teriam lido
+    bit_generator = generator()
+    if steps: bit_generator.random_raw(int(accepted[-1]) + 1)
+    state = bit_generator.state['state']
+    rng.setstate((3, tuple(state['key'].tolist()) + (state['pos'],), gauss_next))
+    return words[accepted].astype(np.int64)
+
+def clamped_walk(start, deltas, low, high):
+    """Posições de uma caminhada em um eixo que, a cada passo, é presa em
+    [low, high]. Soma acumulada em janelas: a janela vale até a primeira
+    batida no limite, e cresce enquanto não bate (perto da parede as batidas
+    vêm seguidas)."""
+    moves = deltas[deltas != 0]
+    walked = np.empty(len(moves), dtype=np.int64)
+    position, index, window = start, 0, 64
+    while index < len(moves):
+        local = position + np.cumsum(moves[index:index + window])
+        outside = np.flatnonzero((local < low) | (local > high))
+        if not len(outside):
+            walked[index:index + len(local)] = local
+            position = int(local[-1])
+            index += len(local)
+            window = min(window * 2, 8192)
+            continue
+        hit = int(outside[0])
+        walked[index:index + hit] = local[:hit]
+        position = low if local[hit] < low else high
+        walked[index + hit] = position
+        index += hit + 1
+        window = 64
+    # Passos que não mexem neste eixo repetem a última posição
+    return np.concatenate(([start], walked))[np.cumsum(deltas != 0)]
 
 class MapGenerator:
-    def __init__(self):
-        self.map_array = [['W' for _ in range(MAP_WIDTH)] for _ in range(MAP_HEIGHT)]
-        self.valid_spawn_tiles = [] 
+    """Gera o mapa com `rng` (por padrão o random global). Com um
+    random.Random próprio, pode rodar em outra thread sem mexer no jogo."""
+    def __init__(self, width=MAP_WIDTH, height=MAP_HEIGHT, walk_steps=WALK_STEPS, rng=random):
+        self.rng = rng
+        self.width = width
+        self.height = height
+        self.walk_steps = walk_steps
+        self.grid = np.full((height, width), WALL, dtype=np.uint8)
+        self.map_array = []
+        self.valid_spawn_tiles = []
 
     def generate_random_walk(self):
-        x, y = MAP_WIDTH // 2, MAP_HEIGHT // 2
-        self.map_array[y][x] = 'P' 
+        self.carve()
+        rows, cols = np.nonzero(self.grid == FLOOR)
+        self.valid_spawn_tiles = list(zip(cols.tolist(), rows.tolist()))
+        self.map_array = self.grid_to_lists()
+        return self.map_array, self.valid_spawn_tiles
+
+    @traced('map')
+    def carve(self):
+        """Preenche `self.grid` (caminho, lava e o 'P' do spawn) e retorna a
+        posição (coluna, linha) do player."""
+        grid = self.grid
+        x, y = self.width // 2, self.height // 2
+        grid[y, x] = PLAYER
         player_spawn_index = (x, y)
 
         # 1. GERA O CAMINHO (Escavação)
-        for _ in range(WALK_STEPS):
-            direction = random.randint(0, 3)
-            if direction == 0: y -= 1
-            elif direction == 1: y += 1
-            elif direction == 2: x -= 1
-            elif direction == 3: x += 1
-            
-            x = max(1, min(x, MAP_WIDTH - 2))
-            y = max(1, min(y, MAP_HEIGHT - 2))
-            
-            if self.map_array[y][x] == 'W':
-                self.map_array[y][x] = ' '
-                # Nota: Não adicionamos a valid_spawn_tiles aqui ainda, faremos no final
-                # para garantir que não spawne inimigo na lava.
+        # Direções 0/1 mexem só no Y e 2/3 só no X: cada eixo é uma caminhada
+        # independente, presa dentro da borda
+        directions = walk_directions(self.walk_steps, self.rng)
+        xs = clamped_walk(x, (directions == 3).astype(np.int64) - (directions == 2), 1, self.width - 2)
+        ys = clamped_walk(y, (directions == 1).astype(np.int64) - (directions == 0), 1, self.height - 2)
+        dug = grid[ys, xs] == WALL
+        grid[ys[dug], xs[dug]] = FLOOR
+        # Nota: valid_spawn_tiles só é montado no final, para não spawnar inimigo na lava.
 
         # 2. GERA A LAVA (Poças Agrupadas Longe de Paredes)
-        
-        # A. Encontrar candidatos seguros (Chão que não toca em parede)
-        safe_spots = []
-        for row in range(1, MAP_HEIGHT - 1):
-            for col in range(1, MAP_WIDTH - 1):
-                if self.map_array[row][col] == ' ':
-                    # Verifica os 8 vizinhos
-                    is_safe = True
-                    for dy in [-1, 0, 1]:
-                        for dx in [-1, 0, 1]:
-                            if self.map_array[row+dy][col+dx] == 'W':
-                                is_safe = False
-                                break
-                        if not is_safe: break
-                    
-                    # Se for seguro e não for o spawn do player, adiciona
-                    if is_safe and (col, row) != player_spawn_index:
-                        safe_spots.append((col, row))
+
+        # A. Candidatos seguros: chão sem nenhuma parede entre os 8 vizinhos
+        # (o spawn do player é 'P', então já fica de fora)
+        padded = np.pad(grid == WALL, 1)
+        near_wall = np.zeros_like(padded[1:-1, 1:-1])
+        for dy in range(3):
+            for dx in range(3):
+                near_wall |= padded[dy:dy + self.height, dx:dx + self.width]
+        safe = (grid == FLOOR) & ~near_wall
+        safe_cells = np.flatnonzero(safe) # Mesma ordem (linha, coluna) da lista antiga
 
         # B. Criar Poças (Blobs)
-        num_lava_pools = random.randint(3, 6) # Quantidade de poças no mapa inteiro (Raro)
-        
-        if safe_spots:
+        num_lava_pools = self.rng.randint(3, 6) # Quantidade de poças no mapa inteiro (Raro)
+
+        if len(safe_cells):
             for _ in range(num_lava_pools):
-                if not safe_spots: break
-                
                 # Escolhe um centro aleatório
-                center = random.choice(safe_spots)
-                pool_size = random.randint(4, 10) # Tamanho da poça em tiles
-                
-                # Algoritmo de crescimento simples
-                tiles_to_turn = [center]
+                center = divmod(int(self.rng.choice(safe_cells)), self.width)[::-1]
+                pool_size = self.rng.randint(4, 10) # Tamanho da poça em tiles
+
+                # Algoritmo de crescimento simples (busca em largura)
+                tiles_to_turn = collections.deque([center])
                 current_pool_size = 0
-                
+
                 while tiles_to_turn and current_pool_size < pool_size:
-                    cx, cy = tiles_to_turn.pop(0)
-                    
+                    cx, cy = tiles_to_turn.popleft()
+
                     # Transforma em lava se ainda for chão
-                    if self.map_array[cy][cx] == ' ':
-                        self.map_array[cy][cx] = 'L'
+                    if grid[cy, cx] == FLOOR:
+                        grid[cy, cx] = LAVA
                         current_pool_size += 1
-                        
+
                         # Tenta expandir para os vizinhos (Cima, Baixo, Esq, Dir)
                         neighbors = [(cx+1, cy), (cx-1, cy), (cx, cy+1), (cx, cy-1)]
-                        random.shuffle(neighbors) # Embaralha para crescer organicamente
-                        
+                        self.rng.shuffle(neighbors) # Embaralha para crescer organicamente
+
                         for nx, ny in neighbors:
-                            # Só expande se o vizinho TAMBÉM for um "safe_spot" 
+                            # Só expande se o vizinho TAMBÉM for seguro
                             # (Isso garante que a poça não encoste na parede ao crescer)
-                            if (nx, ny) in safe_spots and self.map_array[ny][nx] == ' ':
+                            if safe[ny, nx] and grid[ny, nx] == FLOOR:
                                 tiles_to_turn.append((nx, ny))
 
-        # 3. FINALIZAÇÃO (Recalcula onde inimigos podem nascer)
-        # Agora que a lava está pronta, varremos o mapa para achar onde é chão ' '
-        self.valid_spawn_tiles = []
-        for row in range(MAP_HEIGHT):
-            for col in range(MAP_WIDTH):
-                if self.map_array[row][col] == ' ' and (col, row) != player_spawn_index:
-                    self.valid_spawn_tiles.append((col, row))
+        # 3. FINALIZAÇÃO: onde inimigos podem nascer é todo chão ' ' que
+        # sobrou (o spawn do player é 'P' e a lava é 'L', então ficam de fora)
+        return player_spawn_index
 
-        self.map_array[player_spawn_index[1]][player_spawn_index[0]] = 'P'
-        return self.map_array, self.valid_spawn_tiles
+    def grid_to_lists(self):
+        """A grade no formato antigo: lista de linhas com um caractere por tile."""
+        return [list(row.tobytes().decode('ascii')) for row in self.grid]
 
     def get_map(self):
         return self.generate_random_walk()
-    
+
+    @traced('map')
     def generate_arena(self):
-        # Reseta o mapa para vazio
-        self.map_array = [[' ' for _ in range(MAP_WIDTH)] for _ in range(MAP_HEIGHT)]
-        self.valid_spawn_tiles = []
-        
         # Define o tamanho da Arena
         arena_size = 30
-        offset_x = (MAP_WIDTH - arena_size) // 2
-        offset_y = (MAP_HEIGHT - arena_size) // 2
-
-        for row in range(MAP_HEIGHT):
-            for col in range(MAP_WIDTH):
-                # Cria paredes em tudo que for fora da arena
-                if row < offset_y or row >= offset_y + arena_size or \
-                   col < offset_x or col >= offset_x + arena_size:
-                    self.map_array[row][col] = 'W'
-                # Cria bordas da arena
-                elif row == offset_y or row == offset_y + arena_size - 1 or \
-                     col == offset_x or col == offset_x + arena_size - 1:
-                    self.map_array[row][col] = 'W'
-                else:
-                    self.map_array[row][col] = ' ' # Chão limpo
-                    self.valid_spawn_tiles.append((col, row))
+        offset_x = (self.width - arena_size) // 2
+        offset_y = (self.height - arena_size) // 2
+
+        # Paredes em tudo que for fora da arena e nas bordas dela; chão limpo dentro
+        grid = self.grid
+        grid[:] = WALL
+        grid[offset_y + 1:offset_y + arena_size - 1, offset_x + 1:offset_x + arena_size - 1] = FLOOR
+        rows, cols = np.nonzero(grid == FLOOR)
+        self.valid_spawn_tiles = list(zip(cols.tolist(), rows.tolist()))
 
         # --- MUDANÇAS AQUI ---
-        
+
         # Player spawna no CENTRO INFERIOR da arena
         # X = Offset + Metade da arena
         # Y = Offset + Arena inteira - margem pequena
         player_pos = (offset_x + arena_size // 2, offset_y + arena_size - 6)
-        self.map_array[player_pos[1]][player_pos[0]] = 'P'
-        
+        grid[player_pos[1], player_pos[0]] = PLAYER
+
         # Boss spawna no CENTRO SUPERIOR da arena
         # X = Offset + Metade da arena
         # Y = Offset + margem pequena (para não nascer na parede)
         boss_pos = (offset_x + arena_size // 2, offset_y + 6)
-        
-        return self.map_array, self.valid_spawn_tiles, boss_pos
\ No newline at end of file
+
+        self.map_array = self.grid_to_lists()
+        return self.map_array, self.valid_spawn_tiles, boss_pos
+
+# -------------------------------------------------------------
+# MAPA PRONTO (GERADO POR SEMENTE OU LIDO DO DISCO)
+# -------------------------------------------------------------
+class TileIndex(collections.abc.Sequence):
+    """Sequência de tiles (coluna, linha) guardada como índices planos
+    (linha * largura + coluna), na ordem das linhas. Funciona com
+    random.choice como a antiga lista de tuplas, sem precisar montá-la."""
+    def __init__(self, index, width):
+        self.index = index
+        self.width = width
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice): return list(TileIndex(self.index[position], self.width))
+        row, col = divmod(int(self.index[position]), self.width)
+        return col, row
+
+    def __iter__(self):
+        rows, cols = np.divmod(self.index, self.width)
+        return zip(cols.tolist(), rows.tolist())
+
+class MapData:
+    """Um mapa: grade de tiles (uint8, o caractere ASCII de cada tile),
+    índice dos tiles de spawn de inimigos e a posição do player. A mesma
+    `seed` gera sempre o mesmo mapa."""
+    def __init__(self, seed, grid, spawn_index, player):
+        self.seed = seed
+        self.grid = grid
+        self.spawn_index = spawn_index
+        self.player = player
+
+    @property
+    def width(self):
+        return self.grid.shape[1]
+
+    @property
+    def height(self):
+        return self.grid.shape[0]
+
+    @classmethod
+    def generate(cls, seed, width=MAP_WIDTH, height=MAP_HEIGHT, walk_steps=WALK_STEPS):
+        generator = MapGenerator(width, height, walk_steps, random.Random(seed))
+        player = generator.carve()
+        spawn_index = np.flatnonzero(generator.grid == FLOOR).astype(np.uint32)
+        return cls(seed, generator.grid, spawn_index, player)
+
+    @classmethod
+    def arena(cls, width=MAP_WIDTH, height=MAP_HEIGHT):
+        """(MapData da arena do boss, (coluna, linha) onde o boss nasce)."""
+        generator = MapGenerator(width, height)
+        _, valid_spawn_tiles, boss_pos = generator.generate_arena()
+        cols, rows = np.array(valid_spawn_tiles, dtype=np.uint32).reshape(-1, 2).T
+        player = tuple(int(value) for value in np.argwhere(generator.grid == PLAYER)[0][::-1])
+        return cls(0, generator.grid, rows * width + cols, player), boss_pos
+
+    def spawn_tiles(self):
+        return TileIndex(self.spawn_index, self.width)
+
+    def crc(self):
+        """crc32 da grade: identifica o mapa (a semente sozinha não basta
+        quando ele veio de uma biblioteca de outro tamanho)."""
+        return zlib.crc32(np.ascontiguousarray(self.grid))
+
+# -------------------------------------------------------------
+# BIBLIOTECA DE MAPAS EM DISCO
+# -------------------------------------------------------------
+# Cabeçalho, uma entrada de índice por mapa e os blocos de dados, cada um
+# alinhado em 8 bytes: a grade (largura x altura bytes) e os índices de
+# spawn (uint32). Tudo little-endian, lido direto do mmap.
+LIBRARY_MAGIC = b'AVSM'
+LIBRARY_VERSION = 1
+LIBRARY_HEADER = struct.Struct('<4sHHI')    # magic, versão, reservado, mapas
+LIBRARY_ENTRY = struct.Struct('<IHHHHIQQ')  # semente, largura, altura, player (col, lin), spawns, offsets
+
+def aligned(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+def save_maps(path, maps):
+    """Grava a lista de MapData em `path`."""
+    offset = LIBRARY_HEADER.size + LIBRARY_ENTRY.size * len(maps)
+    entries, blocks = [], []
+    for data in maps:
+        grid_offset = aligned(offset)
+        spawn_offset = aligned(grid_offset + data.grid.size)
+        offset = spawn_offset + data.spawn_index.size * 4
+        entries.append(LIBRARY_ENTRY.pack(data.seed, data.width, data.height, *data.player,
+                                          len(data.spawn_index), grid_offset, spawn_offset))
+        blocks.append((grid_offset, np.ascontiguousarray(data.grid, dtype=np.uint8).tobytes()))
+        blocks.append((spawn_offset, data.spawn_index.astype('<u4').tobytes()))
+    with open(path, 'wb') as file:
+        file.write(LIBRARY_HEADER.pack(LIBRARY_MAGIC, LIBRARY_VERSION, 0, len(maps)))
+        file.write(b''.join(entries))
+        for block_offset, block in blocks:
+            file.write(bytes(block_offset - file.tell()))
+            file.write(block)
+
+class MapLibrary:
+    """Mapas pré-gerados, abertos com mmap: pegar um mapa só cria views
+    NumPy (somente leitura) sobre o arquivo, sem ler nem converter nada."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = LIBRARY_HEADER.unpack_from(self.buffer)
+        if magic != LIBRARY_MAGIC or version != LIBRARY_VERSION:
+            raise ValueError(f"{path} não é uma biblioteca de mapas compatível")
+        self.entries = [LIBRARY_ENTRY.unpack_from(self.buffer, LIBRARY_HEADER.size + index * LIBRARY_ENTRY.size)
+                        for index in range(count)]
+        self.seeds = [entry[0] for entry in self.entries]
+        self.index_of = {seed: index for index, seed in enumerate(self.seeds)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        seed, width, height, player_col, player_row, spawns, grid_offset, spawn_offset = self.entries[index]
+        grid = np.frombuffer(self.buffer, np.uint8, width * height, grid_offset).reshape(height, width)
+        spawn_index = np.frombuffer(self.buffer, '<u4', spawns, spawn_offset)
+        return MapData(seed, grid, spawn_index, (player_col, player_row))
+
+    def get(self, seed):
+        """O mapa de `seed`, ou None se a biblioteca não o tiver."""
+        index = self.index_of.get(seed)
+        return None if index is None else self[index]
+
+if __name__ == '__main__':
+    # python map_data.py mapas.avsm --count 100 [--first-seed 0] [--width 80 --height 80]
+    parser = argparse.ArgumentParser(description='Gera uma biblioteca de mapas')
+    parser.add_argument('path')
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--width', type=int, default=MAP_WIDTH)
+    parser.add_argument('--height', type=int, default=MAP_HEIGHT)
+    parser.add_argument('--walk-steps', type=int, default=WALK_STEPS)
+    args = parser.parse_args()
+    maps = [MapData.generate(seed, args.width, args.height, args.walk_steps)
+            for seed in range(args.first_seed, args.first_seed + args.count)]
+    save_maps(args.path, maps)
+    print(f"{len(maps)} mapas gravados em {args.path}")
@@ -2,6 +2,8 @@
 import pygame
 import math
 from settings import *
+from surface_cache import SurfaceCache, RotationCache, StaticLayer
+from tracing import traced
 
 class Menu:
     def __init__(self, screen):
@@ -31,58 +33,96 @@ class Menu:
         self.difficulties = ['EASY', 'MEDIUM', 'HARD']
         self.diff_index = 1
 
-    def draw_text_wobble(self, text, font, color, center_pos, wobble_intensity=0, rotate_speed=0):
+        # Textos renderizados e suas rotações ficam em caches próprios do menu,
+        # fora do cache global de rotações usado pelo jogo
+        self.text_cache = SurfaceCache()
+        self.rotation_cache = RotationCache(TEXT_ROTATION_STEP, max_bytes=MENU_ROTATION_CACHE_BYTES)
+
+        self.tint_surf = pygame.Surface((self.width, self.height))
+
+        # Fundo parado (opções não selecionadas, rodapé...); só o que anima é redesenhado
+        self.layer = StaticLayer(screen)
+
+    def invalidate(self):
+        """Força redesenhar a tela inteira (ex.: voltando do jogo para o menu)."""
+        self.layer.invalidate()
+
+    def render_text(self, text, font, color):
+        return self.text_cache.get((font, text, color), lambda: font.render(text, True, color))
+
+    def draw_text_wobble(self, text, font, color, center_pos, wobble_intensity=0, rotate_speed=0, tint=None):
+        """Desenha o texto com sombra e retorna a área ocupada. Com `tint`, o
+        texto (renderizado em branco) é multiplicado por essa cor depois de girado."""
         current_time = pygame.time.get_ticks()
         y_offset = math.sin(current_time * 0.005) * wobble_intensity
         rotation = math.cos(current_time * 0.003) * rotate_speed
         
-        shadow = font.render(text, True, (0, 0, 0))
-        text_surf = font.render(text, True, color)
+        shadow = self.render_text(text, font, (0, 0, 0))
+        text_surf = self.render_text(text, font, color)
         
-        shadow_rot = pygame.transform.rotate(shadow, rotation)
-        text_rot = pygame.transform.rotate(text_surf, rotation)
+        shadow_rot = self.rotation_cache.rotate(shadow, rotation, (font, text, (0, 0, 0)))
+        text_rot = self.rotation_cache.rotate(text_surf, rotation, (font, text, color))
+        if tint is not None:
+            # Blit com blend é bem mais rápido que fill com blend
+            text_rot = text_rot.copy()
+            self.tint_surf.fill(tint, text_rot.get_rect())
+            text_rot.blit(self.tint_surf, (0, 0), text_rot.get_rect(), pygame.BLEND_RGB_MULT)
         
         shadow_rect = shadow_rot.get_rect(center=(center_pos[0] + 4, center_pos[1] + y_offset + 4))
         text_rect = text_rot.get_rect(center=(center_pos[0], center_pos[1] + y_offset))
         
-        self.screen.blit(shadow_rot, shadow_rect)
-        self.screen.blit(text_rot, text_rect)
+        shadow_rect = self.screen.blit(shadow_rot, shadow_rect)
+        text_rect = self.screen.blit(text_rot, text_rect)
+        return shadow_rect.union(text_rect)
 
-    def draw_list(self, options, selected_index, title_text, is_main_menu=False):
-        self.screen.fill(FLOOR_BG_COLOR)
+    def draw_list(self, options, selected_index, title_text, is_main_menu=False, animated=False):
+        """Com `animated` False desenha o fundo parado da lista; com True, só o
+        que se mexe (título e opção selecionada), marcando as áreas sujas."""
         current_time = pygame.time.get_ticks()
+        if animated:
+            mark = self.layer.mark
+        else:
+            self.screen.fill(FLOOR_BG_COLOR)
+            mark = lambda rect: None
         
         # --- LÓGICA DA LOGO (RESTAURADA) ---
         if is_main_menu:
-            # Cor pulsante entre Vermelho e Laranja
-            r = int(200 + math.sin(current_time * 0.005) * 55)
-            color_title = (r, 50, 0)
-            # Desenha título grande e trêmulo
-            self.draw_text_wobble(title_text, self.title_font, color_title, (self.width // 2, 150), 10, 2)
-            # Subtítulo
-            self.draw_text_wobble("ANGEL VS SINS", self.sub_font, (150, 150, 150), (self.width // 2, 220), 2)
+            if animated:
+                # Cor pulsante entre Vermelho e Laranja
+                r = int(200 + math.sin(current_time * 0.005) * 55)
+                color_title = (r, 50, 0)
+                # Desenha título grande e trêmulo
+                mark(self.draw_text_wobble(title_text, self.title_font, (255, 255, 255), (self.width // 2, 150), 10, 2, tint=color_title))
+                # Subtítulo
+                mark(self.draw_text_wobble("ANGEL VS SINS", self.sub_font, (150, 150, 150), (self.width // 2, 220), 2))
             start_y = 350 # Empurra as opções mais para baixo
         else:
             # Título padrão (branco) para outros menus
-            self.draw_text_wobble(title_text, self.title_font, (255, 255, 255), (self.width // 2, 150), 5)
+            if animated:
+                mark(self.draw_text_wobble(title_text, self.title_font, (255, 255, 255), (self.width // 2, 150), 5))
             start_y = self.height // 2
         
         # Opções
         for index, option in enumerate(options):
             base_y = start_y + (index * 60)
             if index == selected_index:
+                if not animated: continue
                 color = (255, 50, 50)
                 text = f"> {option} <"
                 wobble = 3
             else:
+                if animated: continue
                 color = (100, 100, 100)
                 text = option
                 wobble = 0
-            self.draw_text_wobble(text, self.option_font, color, (self.width // 2, base_y), wobble)
+            mark(self.draw_text_wobble(text, self.option_font, color, (self.width // 2, base_y), wobble))
 
-    def draw_settings(self, music_vol, sfx_vol):
+    def draw_settings(self, music_vol, sfx_vol, animated=False):
+        if animated:
+            # Só o título se mexe; a opção selecionada tem balanço zero
+            self.layer.mark(self.draw_text_wobble("SETTINGS", self.title_font, (255, 255, 255), (self.width // 2, 150), 5))
+            return
         self.screen.fill(FLOOR_BG_COLOR)
-        self.draw_text_wobble("SETTINGS", self.title_font, (255, 255, 255), (self.width // 2, 150), 5)
         
         for index, option in enumerate(self.settings_options):
             base_y = self.height // 2 + (index * 70)
@@ -106,22 +146,32 @@ class Menu:
             
         self.draw_text_wobble("ARROWS TO CHANGE / ENTER TO BACK", self.sub_font, (100, 100, 100), (self.width // 2, self.height - 50), 0)
 
+    @traced('menu')
     def run(self, state, music_vol=0, sfx_vol=0):
+        """Desenha o menu de `state` e retorna os retângulos sujos da tela."""
         if state == 'menu':
             # Passamos True para ativar a logo estilosa
-            self.draw_list(self.main_options, self.main_index, "HELL ROGUELIKE", is_main_menu=True)
+            draw = lambda animated: self.draw_list(self.main_options, self.main_index, "HELL ROGUELIKE", True, animated)
+            key = (state, self.main_index)
             
         elif state == 'difficulty_select':
-            self.draw_list(self.difficulties, self.diff_index, "SELECT DIFFICULTY")
+            draw = lambda animated: self.draw_list(self.difficulties, self.diff_index, "SELECT DIFFICULTY", False, animated)
+            key = (state, self.diff_index)
             
         elif state == 'settings':
-            self.draw_settings(music_vol, sfx_vol)
+            draw = lambda animated: self.draw_settings(music_vol, sfx_vol, animated)
+            key = (state, self.settings_index, music_vol, sfx_vol)
+
+        self.layer.begin(key, lambda: draw(False))
+        draw(True)
 
         mx, my = pygame.mouse.get_pos()
-        self.draw_cursor(mx, my)
+        self.layer.mark(self.draw_cursor(mx, my))
+        return self.layer.end()
 
     def draw_cursor(self, x, y):
         s = 20
         # Desenha a mira do menu
-        pygame.draw.line(self.screen, (255,0,0), (x, y-s), (x, y+s), 3)
-        pygame.draw.line(self.screen, (255,0,0), (x-s, y), (x+s, y), 3)
\ No newline at end of file
+        vertical = pygame.draw.line(self.screen, (255,0,0), (x, y-s), (x, y+s), 3)
+        horizontal = pygame.draw.line(self.screen, (255,0,0), (x-s, y), (x+s, y), 3)
+        return vertical.union(horizontal)
\ No newline at end of file
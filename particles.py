@@ -1,48 +1,199 @@
 import pygame
 import random
+import numpy as np
+from settings import *
+from game_clock import game_clock
+from collision import WALL_LAYER, LAVA_LAYER, MOVEMENT_LAYERS
+from surface_cache import SurfaceCache
 
-class Particle(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, obstacle_sprites, size_range=(4, 8), color_base=(0, 255, 255), lifetime_range=(200, 400), speed_range=(0.5, 1.5)):
-        super().__init__(groups)
-        
-        self.obstacle_sprites = obstacle_sprites
-        
+# Passo de quantização do alfa nas superfícies de partícula em cache
+PARTICLE_ALPHA_STEP = 8
+
+# -------------------------------------------------------------
+# SISTEMA DE PARTÍCULAS (estrutura de arrays em NumPy)
+# -------------------------------------------------------------
+class ParticleSystem:
+    """Guarda todas as partículas vivas em arrays paralelos. Movimento, tempo de
+    vida, fade e colisão com os tiles são feitos em lote, uma vez por frame.
+
+    Existe um orçamento global (`budget`): perto dele as emissões de prioridade
+    baixa vão rareando, e no limite a partícula mais velha da menor prioridade
+    é despejada para dar lugar a uma mais importante."""
+
+    FIELDS = {
+        'x': np.float64, 'y': np.float64, 'dx': np.float64, 'dy': np.float64, 'speed': np.float64,
+        'size': np.int32, 'r': np.int32, 'g': np.int32, 'b': np.int32,
+        'alpha0': np.int32, 'alpha': np.int32, 'spawn': np.int64, 'lifetime': np.int64,
+        'layers': np.int32, 'priority': np.int8, 'evicted': np.bool_,
+    }
+    LAYER_BITS = {WALL_LAYER: 1, LAVA_LAYER: 2}
+
+    def __init__(self, capacity=256, budget=PARTICLE_BUDGET, clock=game_clock):
+        self.clock = clock
+        self.count = 0
+        self.budget = budget
+        self.pending_evictions = 0
+        # Contadores: recusadas na emissão e despejadas depois de vivas, por prioridade
+        self.dropped = {priority: 0 for priority in PARTICLE_PRIORITIES}
+        self.evicted = {priority: 0 for priority in PARTICLE_PRIORITIES}
+        self.backoff_ticks = {priority: 0 for priority in PARTICLE_PRIORITIES}
+        self.collision_grid = None
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+        self.surface_cache = SurfaceCache(PARTICLE_SURFACE_CACHE_SIZE)
+
+    def __len__(self):
+        return self.count - self.pending_evictions
+
+    @property
+    def dropped_total(self):
+        # Recusadas + despejadas
+        return sum(self.dropped.values()) + sum(self.evicted.values())
+
+    def clear(self):
+        self.count = 0
+        self.pending_evictions = 0
+
+    def grow(self):
+        for name, array in self.arrays.items():
+            bigger = np.zeros(len(array) * 2, dtype=array.dtype)
+            bigger[:self.count] = array[:self.count]
+            self.arrays[name] = bigger
+
+    def admit(self, priority):
+        """Decide se uma emissão de `priority` entra, despejando outra se preciso."""
+        live = len(self)
+        soft_limit = int(self.budget * PARTICLE_BACKOFF_START)
+        if live >= soft_limit and priority < PARTICLE_PRIORITY_GAMEPLAY:
+            # Recuo: quanto mais perto do limite, maior o intervalo entre emissões aceitas
+            pressure = (live - soft_limit) / max(1, self.budget - soft_limit)
+            stride = 1 + int(min(1.0, pressure) * (PARTICLE_BACKOFF_MAX_STRIDE - 1))
+            self.backoff_ticks[priority] += 1
+            if self.backoff_ticks[priority] % stride:
+                self.dropped[priority] += 1
+                return False
+        if live >= self.budget:
+            a, n = self.arrays, self.count
+            priorities = np.where(a['evicted'][:n], 127, a['priority'][:n])
+            lowest = int(priorities.min())
+            if lowest > priority:
+                self.dropped[priority] += 1
+                return False
+            candidates = np.flatnonzero(priorities == lowest)
+            victim = candidates[np.argmin(a['spawn'][candidates])]
+            a['evicted'][victim] = True
+            self.pending_evictions += 1
+            self.evicted[lowest] += 1
+        return True
+
+    def emit(self, pos, collision_grid, size_range, color_base, lifetime_range, speed_range, layers, priority=PARTICLE_PRIORITY_AMBIENT):
+        if not self.admit(priority): return False
+
+        # Mesma sequência de sorteios da antiga Particle (sprite)
         size = random.randint(size_range[0], size_range[1])
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
-        
-        r = color_base[0]
-        g = color_base[1]
-        b = color_base[2]
-        
-        initial_alpha = random.randint(200, 255)
-        self.color = pygame.Color(r, g, b, initial_alpha)
-        
-        self.image.fill(self.color)
-        self.rect = self.image.get_rect(center=pos)
-        
-        self.pos = pygame.math.Vector2(self.rect.center)
-        self.direction = pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
-        self.speed = random.uniform(speed_range[0], speed_range[1])
-        
-        self.spawn_time = pygame.time.get_ticks()
-        self.lifetime = random.randint(lifetime_range[0], lifetime_range[1])
-        
-    def update(self):
-        self.pos += self.direction * self.speed
-        self.rect.center = round(self.pos.x), round(self.pos.y)
-        
-        # Colisão com paredes (Partícula morre se bater)
-        if pygame.sprite.spritecollide(self, self.obstacle_sprites, False):
-            self.kill()
-            return
-        
-        current_time = pygame.time.get_ticks()
-        time_elapsed = current_time - self.spawn_time
-        
-        if time_elapsed > self.lifetime:
-            self.kill()
-        else:
-            alpha = max(0, self.color.a - (time_elapsed * self.color.a // self.lifetime))
-            new_image = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-            new_image.fill((self.color.r, self.color.g, self.color.b, alpha))
-            self.image = new_image
\ No newline at end of file
+        alpha = random.randint(200, 255)
+        rect = pygame.Rect(0, 0, size, size)
+        rect.center = pos
+        direction = pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
+        speed = random.uniform(speed_range[0], speed_range[1])
+        spawn_time = self.clock.get_ticks()
+        lifetime = random.randint(lifetime_range[0], lifetime_range[1])
+
+        if self.count == len(self.arrays['x']): self.grow()
+        self.collision_grid = collision_grid
+        a, i = self.arrays, self.count
+        a['x'][i], a['y'][i] = rect.center
+        a['dx'][i], a['dy'][i] = direction
+        a['speed'][i] = speed
+        a['size'][i] = size
+        a['r'][i], a['g'][i], a['b'][i] = color_base[:3]
+        a['alpha0'][i] = a['alpha'][i] = alpha
+        a['spawn'][i] = spawn_time
+        a['lifetime'][i] = lifetime
+        a['layers'][i] = sum(self.LAYER_BITS[name] for name in layers)
+        a['priority'][i] = priority
+        a['evicted'][i] = False
+        self.count += 1
+        return True
+
+    def update(self, limit=None):
+        """Avança as `limit` primeiras partículas (as que já existiam antes do
+        frame; as emitidas durante o update dos sprites só andam no próximo)."""
+        n = self.count if limit is None else min(limit, self.count)
+        if self.count == 0: return
+        a = self.arrays
+        x, y = a['x'][:n], a['y'][:n]
+        x += a['dx'][:n] * a['speed'][:n]
+        y += a['dy'][:n] * a['speed'][:n]
+
+        size = a['size'][:n]
+        half = size // 2
+        lefts = np.rint(x).astype(np.int64) - half
+        tops = np.rint(y).astype(np.int64) - half
+
+        # Colisão com paredes/lava (partícula morre se bater)
+        dead = a['evicted'][:n].copy()
+        if self.collision_grid is not None:
+            rights, bottoms = lefts + size, tops + size
+            for name, bit in self.LAYER_BITS.items():
+                uses = (a['layers'][:n] & bit) != 0
+                if not uses.any(): continue
+                hit = self.collision_grid.collides_many(lefts[uses], tops[uses], rights[uses], bottoms[uses], (name,))
+                dead[np.flatnonzero(uses)[hit]] = True
+
+        elapsed = self.clock.get_ticks() - a['spawn'][:n]
+        lifetime = a['lifetime'][:n]
+        dead |= elapsed > lifetime
+        alpha0 = a['alpha0'][:n]
+        a['alpha'][:n] = np.maximum(0, alpha0 - (elapsed * alpha0 // lifetime))
+
+        if dead.any() or self.pending_evictions:
+            newer = n + np.flatnonzero(~a['evicted'][n:self.count])
+            keep = np.concatenate((np.flatnonzero(~dead), newer))
+            for name, array in a.items():
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
+            self.pending_evictions = 0
+
+    def visible(self, center, margin_x, margin_y):
+        """Índices das partículas perto de `center`, ordenados pelo Y."""
+        n = self.count
+        if n == 0: return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        a = self.arrays
+        centers_x = np.rint(a['x'][:n]).astype(np.int64)
+        centers_y = np.rint(a['y'][:n]).astype(np.int64)
+        near = np.flatnonzero((np.abs(centers_x - center[0]) < margin_x) & (np.abs(centers_y - center[1]) < margin_y) & ~a['evicted'][:n])
+        order = near[np.argsort(centers_y[near], kind='stable')]
+        return order, centers_y[order]
+
+    def blit_sequence(self, indices, offset):
+        """Pares (superfície, posição na tela) prontos para um `blits`."""
+        a = self.arrays
+        half = a['size'][indices] // 2
+        lefts = np.rint(a['x'][indices]).astype(np.int64) - half - int(offset[0])
+        tops = np.rint(a['y'][indices]).astype(np.int64) - half - int(offset[1])
+        alphas = a['alpha'][indices] // PARTICLE_ALPHA_STEP * PARTICLE_ALPHA_STEP
+        keys = zip(a['size'][indices].tolist(), a['r'][indices].tolist(), a['g'][indices].tolist(),
+                   a['b'][indices].tolist(), alphas.tolist())
+        return [(self.get_surface(key), (left, top)) for key, left, top in zip(keys, lefts.tolist(), tops.tolist())]
+
+    def get_surface(self, key):
+        def build():
+            size, r, g, b, alpha = key
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            surface.fill((r, g, b, alpha))
+            return surface
+        return self.surface_cache.get(key, build)
+
+# -------------------------------------------------------------
+# EMISSOR (mantém a assinatura da antiga Particle)
+# -------------------------------------------------------------
+class Particle:
+    """Emite uma partícula no ParticleSystem do primeiro grupo que tiver um.
+    `emitted` fica False quando o orçamento recusou a emissão."""
+    def __init__(self, pos, groups, collision_grid, size_range=(4, 8), color_base=(0, 255, 255), lifetime_range=(200, 400), speed_range=(0.5, 1.5), layers=MOVEMENT_LAYERS, priority=PARTICLE_PRIORITY_AMBIENT):
+        self.emitted = False
+        for group in groups:
+            system = getattr(group, 'particles', None)
+            if system is not None:
+                self.emitted = system.emit(pos, collision_grid, size_range, color_base, lifetime_range, speed_range, layers, priority)
+                return
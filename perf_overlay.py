@@ -0,0 +1,124 @@
+# perf_overlay.py
+import csv
+import time
+import numpy as np
+import pygame
+from settings import *
+from tracing import tracer
+
+# -------------------------------------------------------------
+# MEDIDOR DE DESEMPENHO (F3 mostra, F4 exporta CSV)
+# -------------------------------------------------------------
+class PerfOverlay:
+    """Guarda, num buffer circular dos últimos segundos, quanto cada fase do
+    frame levou e quantos objetos havia. A medição é por "voltas": `lap(fase)`
+    soma à fase o tempo desde a volta anterior, então o frame inteiro fica
+    dividido entre as fases sem nenhum tempo de fora. Com o rastro ligado,
+    cada volta e cada frame também viram trechos no rastro."""
+
+    PHASES = ('events', 'update', 'collision', 'draw', 'hud', 'overlay', 'display', 'tick')
+    COUNTS = ('enemies', 'bullets', 'enemy_bullets', 'particles', 'blits')
+
+    def __init__(self, history_seconds=PERF_HISTORY_SECONDS):
+        self.capacity = int(history_seconds * FPS)
+        # Colunas: uma por fase, o total do frame e uma por contagem
+        self.samples = np.zeros((self.capacity, len(self.PHASES) + 1 + len(self.COUNTS)))
+        self.index = 0
+        self.filled = 0
+        self.frames = 0
+        self.current = dict.fromkeys(self.PHASES, 0.0)
+        self.last = time.perf_counter()
+        self.frame_start = self.last
+
+        self.visible = False
+        self.font = None
+        self.panel = None
+        self.panel_time = 0
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        if tracer.enabled: tracer.add(phase, 'frame', self.last, now)
+        self.last = now
+
+    def end_frame(self, counts):
+        row = self.samples[self.index]
+        for column, phase in enumerate(self.PHASES):
+            row[column] = self.current[phase] * 1000
+            self.current[phase] = 0.0
+        row[len(self.PHASES)] = row[:len(self.PHASES)].sum()
+        row[len(self.PHASES) + 1:] = counts
+        self.index = (self.index + 1) % self.capacity
+        self.filled = min(self.filled + 1, self.capacity)
+        self.frames += 1
+        if tracer.enabled:
+            tracer.add('frame', 'frame', self.frame_start, self.last, {'frame': self.frames})
+            tracer.counter('objects', dict(zip(self.COUNTS, map(int, counts))))
+        self.frame_start = self.last
+
+    def history(self):
+        """Amostras em ordem cronológica (a mais antiga primeiro)."""
+        if self.filled < self.capacity: return self.samples[:self.filled]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def lows(self, frame_times, fraction):
+        # Média dos piores `fraction` dos frames (pelo menos um)
+        worst = np.sort(frame_times)[::-1][:max(1, int(len(frame_times) * fraction))]
+        return float(worst.mean())
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.panel = None
+
+    # --- EXPORTAÇÃO ---
+    def export_csv(self, path=None):
+        path = path or time.strftime('perf_%Y%m%d_%H%M%S.csv')
+        first_frame = self.frames - self.filled
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame'] + [f'{phase}_ms' for phase in self.PHASES] + ['frame_ms'] + list(self.COUNTS))
+            for offset, row in enumerate(self.history()):
+                phases = [round(value, 4) for value in row[:len(self.PHASES) + 1]]
+                counts = [int(value) for value in row[len(self.PHASES) + 1:]]
+                writer.writerow([first_frame + offset] + phases + counts)
+        return path
+
+    # --- DESENHO ---
+    def build_panel(self, extra_lines):
+        samples = self.history()
+        frame_times = samples[:, len(self.PHASES)]
+        average = float(frame_times.mean())
+        low_1 = self.lows(frame_times, 0.01)
+        low_01 = self.lows(frame_times, 0.001)
+        lines = [f"FRAME {average:6.2f} ms ({1000 / max(average, 0.001):5.0f} fps)",
+                 f"1% {low_1:6.2f} ms ({1000 / max(low_1, 0.001):4.0f})  0.1% {low_01:6.2f} ms ({1000 / max(low_01, 0.001):4.0f})",
+                 f"{'fase':<10}{'média':>8}{'máx':>8}"]
+        for column, phase in enumerate(self.PHASES):
+            lines.append(f"{phase:<10}{samples[:, column].mean():8.2f}{samples[:, column].max():8.2f}")
+        latest = samples[-1, len(self.PHASES) + 1:]
+        lines.append("  ".join(f"{name} {int(value)}" for name, value in zip(self.COUNTS[:2], latest[:2])))
+        lines.append("  ".join(f"{name} {int(value)}" for name, value in zip(self.COUNTS[2:], latest[2:])))
+        lines.extend(extra_lines)
+
+        rendered = [self.font.render(line, True, (230, 230, 230)) for line in lines]
+        line_height = self.font.get_linesize()
+        # O painel só cresce: nos menus a tela não é redesenhada inteira e
+        # um painel menor deixaria restos do anterior
+        width = max(self.panel.get_width() if self.panel else 0, max(surf.get_width() for surf in rendered) + 16)
+        height = max(self.panel.get_height() if self.panel else 0, line_height * len(rendered) + 12)
+        panel = pygame.Surface((width, height))
+        panel.fill((10, 10, 10))
+        for row, surf in enumerate(rendered):
+            panel.blit(surf, (8, 6 + row * line_height))
+        return panel
+
+    def draw(self, screen, extra_lines=()):
+        """Desenha o painel (refeito só a cada PERF_REFRESH_MS) e retorna a área ocupada."""
+        if self.font is None:
+            self.font = pygame.font.SysFont('dejavusansmono,consolas,monospace', 15)
+        now = pygame.time.get_ticks()
+        if self.filled and (self.panel is None or now - self.panel_time >= PERF_REFRESH_MS):
+            self.panel = self.build_panel(extra_lines)
+            self.panel_time = now
+        if self.panel is None: return pygame.Rect(0, 0, 0, 0)
+        return screen.blit(self.panel, (10, 60))
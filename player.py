@@ -4,17 +4,27 @@ import math
 import random
 import os # Necessário para verificar se o arquivo existe
 from settings import *
+from game_clock import game_clock
 from particles import Particle
+from surface_cache import surface_cache, circle_surface, rotate
+from controls import KeyboardMouse
+from tracing import traced
+
+# Distância da arma holográfica até o centro da alma
+WEAPON_OFFSETS = {'pistol': 35, 'machinegun': 40, 'shotgun': 35}
 
 def draw_pixel_circle(surface, color, center, radius, alpha=255):
     if radius <= 0: return 
-    temp_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-    pygame.draw.circle(temp_surf, color, (radius, radius), radius)
-    temp_surf.set_alpha(alpha)
-    surface.blit(temp_surf, (center[0] - radius, center[1] - radius))
+    surface.blit(circle_surface(radius, color, alpha), (center[0] - radius, center[1] - radius))
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, obstacle_sprites, create_bullet_callback, camera_group):
+    # Sons das armas, lidos do disco uma vez só (todo mapa novo cria outro Player)
+    _sound_cache = None
+
+    # Desligado no modo sem janela: a imagem não é montada (o estado anima igual)
+    render = True
+
+    def __init__(self, pos, groups, create_bullet_callback, camera_group, collision_grid, controller=None, clock=game_clock):
         super().__init__(groups)
         
         self.surface_size = 96 
@@ -26,7 +36,8 @@ class Player(pygame.sprite.Sprite):
         
         self.direction = pygame.math.Vector2()
         self.speed = PLAYER_SPEED
-        self.obstacle_sprites = obstacle_sprites
+        self.collision_grid = collision_grid
+        self.clock = clock
         
         self.create_bullet = create_bullet_callback
         self.last_shot_time = 0
@@ -44,6 +55,10 @@ class Player(pygame.sprite.Sprite):
         self.camera_group = camera_group
         self.alive = True
 
+        # De onde vem a entrada (teclado/mouse ou piloto automático) e a leitura do frame
+        self.controller = controller or KeyboardMouse()
+        self.controls = None
+
         # Partículas
         self.particle_emit_interval = 5 
         self.particle_emit_timer = 0
@@ -55,13 +70,20 @@ class Player(pygame.sprite.Sprite):
         self.pulse_value = 0
         self.visual_offset = pygame.math.Vector2(0, 0)
         self.weapon_pulse_value = 0
+        # A rotação cacheada é compartilhada: o alpha do pulso vai numa cópia
+        # própria (48px cobre a diagonal da maior arma)
+        self.weapon_scratch = pygame.Surface((48, 48), pygame.SRCALPHA)
 
         # --- CARREGAMENTO DE ÁUDIOS (NOVO) ---
         # Estrutura: self.sounds['pistol']['shoot'] -> Sound Object
         self.sounds = {}
         self.load_weapon_sounds()
 
+    @traced('audio')
     def load_weapon_sounds(self):
+        if Player._sound_cache is not None:
+            self.sounds = Player._sound_cache
+            return
         print("--- Carregando SFX das Armas ---")
         for weapon_name, data in WEAPONS_DATA.items():
             self.sounds[weapon_name] = {}
@@ -84,7 +106,9 @@ class Player(pygame.sprite.Sprite):
                         print(f"Arquivo de som não encontrado: {filename}")
                 
                 self.sounds[weapon_name][action] = sound_obj
+        Player._sound_cache = self.sounds
 
+    @traced('audio')
     def play_weapon_sound(self, action):
         """Toca o som da arma atual com o volume global atualizado"""
         sfx = self.sounds[self.weapon_index].get(action)
@@ -105,8 +129,9 @@ class Player(pygame.sprite.Sprite):
             self.direction = pygame.math.Vector2(0,0)
             return
 
-        keys = pygame.key.get_pressed()
-        mouse_buttons = pygame.mouse.get_pressed()
+        self.controls = self.controller.read(self)
+        keys = self.controls.keys
+        mouse_buttons = self.controls.mouse_buttons
         left_click_holding = mouse_buttons[0] 
         just_clicked = left_click_holding and not self.mouse_prev
 
@@ -141,18 +166,18 @@ class Player(pygame.sprite.Sprite):
 
     def start_reload(self):
         self.is_reloading = True
-        self.reload_start_time = pygame.time.get_ticks()
+        self.reload_start_time = self.clock.get_ticks()
         self.play_weapon_sound('reload') # <--- SOM DE RECARREGAR
 
     def update_reload(self):
         if self.is_reloading:
-            current_time = pygame.time.get_ticks()
+            current_time = self.clock.get_ticks()
             if current_time - self.reload_start_time >= self.stats['reload_time']:
                 self.current_ammo = self.stats['ammo'] 
                 self.is_reloading = False
 
     def shoot(self, cooldown_override):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         if current_time - self.last_shot_time >= cooldown_override:
             self.last_shot_time = current_time
             
@@ -166,9 +191,10 @@ class Player(pygame.sprite.Sprite):
             muzzle_y = self.hitbox.centery - math.sin(rad_angle) * barrel_offset
             
             for _ in range(random.randint(3, 5)):
-                Particle((muzzle_x, muzzle_y), self.groups, self.obstacle_sprites,
+                Particle((muzzle_x, muzzle_y), self.groups, self.collision_grid,
                          size_range=(3, 6), color_base=self.stats['color'], 
-                         lifetime_range=(100, 200), speed_range=(1.0, 3.0))
+                         lifetime_range=(100, 200), speed_range=(1.0, 3.0),
+                         priority=PARTICLE_PRIORITY_EFFECT)
 
             for _ in range(self.stats['bullet_count']):
                 spread_val = self.stats['spread']
@@ -187,30 +213,34 @@ class Player(pygame.sprite.Sprite):
 
     def rotate(self):
         if not self.alive: return
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        world_mouse_x = mouse_x + self.camera_group.offset.x
-        world_mouse_y = mouse_y + self.camera_group.offset.y
-        rel_x = world_mouse_x - self.rect.centerx
-        rel_y = world_mouse_y - self.rect.centery
+        aim_x, aim_y = self.controls.aim
+        rel_x = aim_x - self.rect.centerx
+        rel_y = aim_y - self.rect.centery
         self.angle = math.degrees(math.atan2(-rel_y, rel_x))
 
-    def draw_visuals(self):
-        self.image.fill((0,0,0,0)) 
-
+    def animate(self):
+        """Estado da animação: roda mesmo sem desenhar (a flutuação posiciona
+        as partículas e a fumaça da morte sorteia no random global)."""
         if not self.alive:
             if random.randint(0, 3) == 0:
-                Particle(self.hitbox.center, self.groups, self.obstacle_sprites, size_range=(3,7), 
+                Particle(self.hitbox.center, self.groups, self.collision_grid, size_range=(3,7), 
                          color_base=(100,100,100), lifetime_range=(300, 600), speed_range=(0.5, 1.0))
             return 
 
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         float_x = math.cos(current_time * 0.003) * 3 
         float_y = math.sin(current_time * 0.005) * 4 
         self.visual_offset = pygame.math.Vector2(float_x, float_y)
-        center_offset = ((self.surface_size // 2) + float_x, (self.surface_size // 2) + float_y)
+        self.pulse_value += 0.05
+        self.weapon_pulse_value += 0.1 
+
+    def draw_visuals(self):
+        self.image.fill((0,0,0,0)) 
+        if not self.alive: return
+
+        center_offset = ((self.surface_size // 2) + self.visual_offset.x, (self.surface_size // 2) + self.visual_offset.y)
         
         # Alma Pulsante
-        self.pulse_value += 0.05
         base_r = int(8 + math.sin(self.pulse_value) * 1.5)
 
         draw_pixel_circle(self.image, (0, 200, 255), center_offset, base_r + 6, alpha=50)
@@ -219,48 +249,54 @@ class Player(pygame.sprite.Sprite):
         draw_pixel_circle(self.image, (255, 255, 255), center_offset, base_r, alpha=255)
 
         # Arma Holográfica
-        self.weapon_pulse_value += 0.1 
         dynamic_alpha = int(185 + math.sin(self.weapon_pulse_value) * 35)
         dynamic_alpha = max(150, min(220, dynamic_alpha)) 
+        # A forma da arma é cacheada opaca; o pulso de transparência entra como
+        # alpha da superfície (dá o mesmo resultado que desenhar com a cor translúcida)
+        weapon_surf = surface_cache.get(('weapon', self.weapon_index, self.stats['color']), self.build_weapon_surface)
+        offset_dist = WEAPON_OFFSETS[self.weapon_index]
+
+        rotated_weapon = rotate(weapon_surf, self.angle)
+        area = rotated_weapon.get_rect()
+        self.weapon_scratch.fill((0, 0, 0, 0), area)
+        self.weapon_scratch.blit(rotated_weapon, (0, 0))
+        self.weapon_scratch.set_alpha(dynamic_alpha)
+        rad_angle = math.radians(self.angle)
+        w_x = center_offset[0] + math.cos(rad_angle) * offset_dist - area.width // 2
+        w_y = center_offset[1] - math.sin(rad_angle) * offset_dist - area.height // 2 
+        self.image.blit(self.weapon_scratch, (w_x, w_y), area)
+
+    def build_weapon_surface(self):
         c = self.stats['color']
-        weapon_color = (c[0], c[1], c[2], dynamic_alpha) 
+        weapon_color = (c[0], c[1], c[2], 255) 
         
         if self.weapon_index == 'pistol':
             surf_w, surf_h = 20, 6
-            offset_dist = 35
             weapon_surf = pygame.Surface((surf_w, surf_h), pygame.SRCALPHA)
             pygame.draw.rect(weapon_surf, weapon_color, (0, 0, surf_w, surf_h), border_radius=2)
         elif self.weapon_index == 'machinegun':
             surf_w, surf_h = 32, 8
-            offset_dist = 40 
             weapon_surf = pygame.Surface((surf_w, surf_h), pygame.SRCALPHA)
             pygame.draw.rect(weapon_surf, weapon_color, (8, 2, 24, 4)) 
             pygame.draw.rect(weapon_surf, weapon_color, (0, 0, 10, 8), border_radius=1) 
         elif self.weapon_index == 'shotgun':
             surf_w, surf_h = 24, 12
-            offset_dist = 35
             weapon_surf = pygame.Surface((surf_w, surf_h), pygame.SRCALPHA)
             pygame.draw.rect(weapon_surf, weapon_color, (0, 0, 24, 4), border_radius=1) 
             pygame.draw.rect(weapon_surf, weapon_color, (0, 8, 24, 4), border_radius=1) 
             pygame.draw.rect(weapon_surf, weapon_color, (0, 2, 8, 8)) 
-
-        rotated_weapon = pygame.transform.rotate(weapon_surf, self.angle)
-        rad_angle = math.radians(self.angle)
-        w_x = center_offset[0] + math.cos(rad_angle) * offset_dist - rotated_weapon.get_width() // 2
-        w_y = center_offset[1] - math.sin(rad_angle) * offset_dist - rotated_weapon.get_height() // 2 
-        self.image.blit(rotated_weapon, (w_x, w_y))
+        return weapon_surf
 
     def collision(self, direction):
+        # Só testa os tiles que a hitbox encosta (índice em grade)
         if direction == 'horizontal':
-            for sprite in self.obstacle_sprites:
-                if sprite.rect.colliderect(self.hitbox):
-                    if self.direction.x > 0: self.hitbox.right = sprite.rect.left
-                    if self.direction.x < 0: self.hitbox.left = sprite.rect.right
+            for tile_rect in self.collision_grid.query(self.hitbox):
+                if self.direction.x > 0: self.hitbox.right = tile_rect.left
+                if self.direction.x < 0: self.hitbox.left = tile_rect.right
         if direction == 'vertical':
-            for sprite in self.obstacle_sprites:
-                if sprite.rect.colliderect(self.hitbox):
-                    if self.direction.y > 0: self.hitbox.bottom = sprite.rect.top
-                    if self.direction.y < 0: self.hitbox.top = sprite.rect.bottom
+            for tile_rect in self.collision_grid.query(self.hitbox):
+                if self.direction.y > 0: self.hitbox.bottom = tile_rect.top
+                if self.direction.y < 0: self.hitbox.top = tile_rect.bottom
 
     def move(self, speed):
         self.hitbox.x += self.direction.x * speed
@@ -273,7 +309,7 @@ class Player(pygame.sprite.Sprite):
         self.alive = False
 
     def emit_particles(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self.clock.get_ticks()
         if self.alive:
             if current_time - self.particle_emit_timer > self.particle_emit_interval:
                 self.particle_emit_timer = current_time
@@ -281,14 +317,14 @@ class Player(pygame.sprite.Sprite):
                 offset_y = random.uniform(-12, 12)
                 spawn_x = self.hitbox.centerx + self.visual_offset.x + offset_x
                 spawn_y = self.hitbox.centery + self.visual_offset.y + offset_y
-                Particle((spawn_x, spawn_y), self.groups, self.obstacle_sprites, 
+                Particle((spawn_x, spawn_y), self.groups, self.collision_grid, 
                          size_range=(4, 9), color_base=self.core_color, lifetime_range=(200, 400), speed_range=(0.3, 1.2))
             
             if self.direction.magnitude() > 0 and current_time - self.trail_emit_timer > self.trail_emit_interval:
                 self.trail_emit_timer = current_time
                 spawn_x = self.hitbox.centerx + self.visual_offset.x
                 spawn_y = self.hitbox.centery + self.visual_offset.y
-                Particle((spawn_x, spawn_y), self.groups, self.obstacle_sprites,
+                Particle((spawn_x, spawn_y), self.groups, self.collision_grid,
                          size_range=(3, 8), color_base=self.trail_color, lifetime_range=(300, 500), speed_range=(1.0, 2.5))
 
     def update(self):
@@ -296,5 +332,6 @@ class Player(pygame.sprite.Sprite):
         self.update_reload()
         self.rotate()
         self.move(self.speed)
-        self.draw_visuals() 
+        self.animate()
+        if self.render: self.draw_visuals()
         self.emit_particles()
\ No newline at end of file
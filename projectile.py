@@ -2,22 +2,32 @@ import pygame
 import math
 import random
 from settings import *
+from game_clock import game_clock
 from particles import Particle
+from collision import WALL_LAYER
+from surface_cache import surface_cache, rotate
+
+def build_bullet_surface(color):
+    surface = pygame.Surface((10, 5))
+    surface.fill(color)
+    return surface
 
 class Bullet(pygame.sprite.Sprite):
-    def __init__(self, pos, angle, groups, obstacle_sprites, speed, lifetime, color, damage): 
+    def __init__(self, pos, angle, groups, speed, lifetime, color, damage, collision_grid, clock=game_clock): 
         super().__init__(groups)
+        self.clock = clock
         
-        self.original_image = pygame.Surface((10, 5))
-        self.original_image.fill(color)
+        self.original_image = surface_cache.get(('bullet', tuple(color)), lambda: build_bullet_surface(color))
         self.color = color
         
-        self.image = pygame.transform.rotate(self.original_image, angle)
-        self.rect = self.image.get_rect(center=pos)
+        # A imagem sai do cache (ângulo arredondado); a caixa de colisão, que a
+        # simulação usa, vem do ângulo exato, calculada uma vez no disparo
+        self.image = rotate(self.original_image, angle)
+        self.rect = pygame.transform.rotate(self.original_image, angle).get_rect(center=pos)
         
         self.hitbox = self.rect.copy() 
         
-        self.obstacle_sprites = obstacle_sprites 
+        self.collision_grid = collision_grid
         self.damage = damage
         
         rad_angle = math.radians(angle)
@@ -26,9 +36,10 @@ class Bullet(pygame.sprite.Sprite):
         self.speed = speed
         self.lifetime = lifetime
         self.pos = pygame.math.Vector2(self.rect.center)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.clock.get_ticks()
 
     def update(self):
+        last_pos = self.pos.copy()
         self.pos += self.direction * self.speed
         self.rect.center = round(self.pos.x), round(self.pos.y)
         self.hitbox.center = self.rect.center 
@@ -37,15 +48,16 @@ class Bullet(pygame.sprite.Sprite):
         if random.randint(0, 2) == 0:
             visual_groups = [g for g in self.groups() if hasattr(g, 'custom_draw')]
             if visual_groups:
-                Particle(self.rect.center, visual_groups, self.obstacle_sprites,
+                Particle(self.rect.center, visual_groups, self.collision_grid,
                          size_range=(2, 4), color_base=self.color, 
-                         lifetime_range=(100, 250), speed_range=(0, 0.5))
+                         lifetime_range=(100, 250), speed_range=(0, 0.5), layers=(WALL_LAYER,))
 
-        # Colisão com paredes
-        if pygame.sprite.spritecollideany(self, self.obstacle_sprites):
+        # Colisão com paredes (raio do ponto anterior até o atual, não pula quinas)
+        half_size = (self.rect.width / 2, self.rect.height / 2)
+        if self.collision_grid.raycast(last_pos, self.pos, half_size):
             self.kill() 
         
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if self.clock.get_ticks() - self.spawn_time > self.lifetime:
             self.kill() 
         
         if self.rect.centerx < 0 or self.rect.centerx > MAP_WIDTH * TILE_SIZE or \
@@ -54,31 +66,34 @@ class Bullet(pygame.sprite.Sprite):
 
 # --- NOVA CLASSE QUE ESTAVA FALTANDO ---
 class EnemyBullet(pygame.sprite.Sprite):
-    def __init__(self, pos, angle, groups, obstacle_sprites, speed=6, damage=1):
+    def __init__(self, pos, angle, groups, collision_grid, speed=6, damage=1, clock=game_clock):
         super().__init__(groups)
+        self.clock = clock
         self.image = pygame.Surface((12, 12))
         self.image.fill(ENEMY_BULLET_COLOR) # Pega a cor do settings
         self.rect = self.image.get_rect(center=pos)
         self.hitbox = self.rect.inflate(-2, -2)
         
-        self.obstacle_sprites = obstacle_sprites
+        self.collision_grid = collision_grid
         self.speed = speed
         self.damage = damage
         
         rad_angle = math.radians(angle)
         self.direction = pygame.math.Vector2(math.cos(rad_angle), -math.sin(rad_angle))
         self.pos = pygame.math.Vector2(self.rect.center)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = self.clock.get_ticks()
         self.lifetime = 3000 # 3 segundos
 
     def update(self):
+        last_pos = self.pos.copy()
         self.pos += self.direction * self.speed
         self.rect.center = round(self.pos.x), round(self.pos.y)
         self.hitbox.center = self.rect.center
 
         # Colisão com paredes
-        if pygame.sprite.spritecollideany(self, self.obstacle_sprites):
+        half_size = (self.rect.width / 2, self.rect.height / 2)
+        if self.collision_grid.raycast(last_pos, self.pos, half_size):
             self.kill()
             
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if self.clock.get_ticks() - self.spawn_time > self.lifetime:
             self.kill()
\ No newline at end of file
@@ -0,0 +1,149 @@
+# replay.py
+import os
+import zlib
+import struct
+from array import array
+import numpy as np
+import pygame
+from settings import *
+from controls import InputState, PressedKeys
+from game_clock import game_clock
+
+# -------------------------------------------------------------
+# FORMATO DO ARQUIVO
+# -------------------------------------------------------------
+# Cabeçalho (com o nome da biblioteca de mapas usada, se houve uma), depois
+# um bloco por mapa jogado (segmento): semente do mapa (que também semeia o
+# random global), tamanho e crc da grade, dificuldade, relógio do jogo no início e os passos da simulação
+# (entrada + hash do estado depois do passo), comprimidos com zlib.
+REPLAY_MAGIC = b'AVSR'
+REPLAY_VERSION = 4
+HEADER = struct.Struct('<4sHdI64s')          # magic, versão, SIM_STEP_MS, segmentos, biblioteca de mapas
+SEGMENT = struct.Struct('<IHHI8sdqII')       # semente, largura, altura, crc da grade, dificuldade, relógio, último spawn, passos, bytes
+STEP = np.dtype([('keys', '<u2'), ('buttons', 'u1'), ('aim_x', '<i4'), ('aim_y', '<i4'), ('hash', '<u4')])
+
+# Teclas lidas por Player.input, na ordem dos bits da máscara
+RECORDED_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_r, pygame.K_1, pygame.K_2, pygame.K_3)
+
+def encode_input(state):
+    keys = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if state.keys[key]: keys |= 1 << bit
+    buttons = 0
+    for bit, pressed in enumerate(state.mouse_buttons[:3]):
+        if pressed: buttons |= 1 << bit
+    return keys, buttons, round(state.aim[0]), round(state.aim[1])
+
+def decode_input(keys, buttons, aim_x, aim_y):
+    pressed = PressedKeys(key for bit, key in enumerate(RECORDED_KEYS) if keys >> bit & 1)
+    return InputState(pressed, tuple(bool(buttons >> bit & 1) for bit in range(3)), (aim_x, aim_y))
+
+NO_INPUT = (0, 0, 0, 0)
+
+def state_hash(game):
+    """crc32 do que a simulação decide: relógio, placar, player, inimigos,
+    balas e partículas. Dois jogos com o mesmo hash estão no mesmo passo."""
+    player = game.player
+    values = array('d', (game.game_clock.time, game.hud.score, *player.hitbox.topleft, player.alive,
+                         player.current_ammo, len(game.visible_sprites.particles)))
+    for enemy in game.enemy_sprites:
+        values.extend((enemy.hitbox.x, enemy.hitbox.y, enemy.health))
+    for group in (game.bullet_sprites, game.enemy_bullet_sprites):
+        for bullet in group:
+            values.extend(bullet.rect.topleft)
+    return zlib.crc32(values.tobytes())
+
+# -------------------------------------------------------------
+# GRAVAÇÃO
+# -------------------------------------------------------------
+class ReplaySegment:
+    """Um mapa jogado: tudo o que é preciso para refazê-lo passo a passo."""
+    def __init__(self, seed, width, height, grid_crc, difficulty, clock_time, last_spawn_time, steps=None):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.grid_crc = grid_crc
+        self.difficulty = difficulty
+        self.clock_time = clock_time
+        self.last_spawn_time = last_spawn_time
+        self.steps = steps if steps is not None else []
+
+class RecordingController:
+    """Repassa a entrada de outro controle, guardando-a já arredondada como
+    vai para o arquivo (o jogo ao vivo usa exatamente o que será refeito)."""
+    def __init__(self, controller, recorder):
+        self.controller = controller
+        self.recorder = recorder
+
+    def read(self, player):
+        encoded = encode_input(self.controller.read(player))
+        self.recorder.pending = encoded
+        return decode_input(*encoded)
+
+class SessionRecorder:
+    """Grava a sessão: a cada `setup_map` abre um segmento com a semente do
+    mapa; a cada passo guarda a entrada e o hash."""
+
+    def __init__(self, path=None, clock=game_clock, library=None):
+        self.path = path or 'replay.avsr'
+        self.clock = clock
+        self.library = os.path.basename(library) if library else '' # Só para a mensagem de erro na reprodução
+        self.segments = []
+        self.pending = NO_INPUT
+
+    def wrap(self, controller):
+        return RecordingController(controller, self)
+
+    def start_segment(self, data, difficulty, last_spawn_time):
+        self.segments.append(ReplaySegment(data.seed, data.width, data.height, data.crc(), difficulty,
+                                           self.clock.time, last_spawn_time))
+        self.pending = NO_INPUT
+
+    def end_step(self, game):
+        self.segments[-1].steps.append((*self.pending, state_hash(game)))
+        self.pending = NO_INPUT
+
+    def save(self, path=None):
+        """Escreve o arquivo (segmentos sem nenhum passo ficam de fora) e retorna o caminho."""
+        path = path or self.path
+        segments = [segment for segment in self.segments if segment.steps]
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.clock.step_ms, len(segments),
+                                   self.library.encode())) # 64s: nomes maiores são cortados
+            for segment in segments:
+                data = zlib.compress(np.array(segment.steps, dtype=STEP).tobytes(), 9)
+                file.write(SEGMENT.pack(segment.seed, segment.width, segment.height, segment.grid_crc,
+                                        segment.difficulty.encode(), segment.clock_time,
+                                        segment.last_spawn_time, len(segment.steps), len(data)))
+                file.write(data)
+        return path
+
+# -------------------------------------------------------------
+# REPRODUÇÃO
+# -------------------------------------------------------------
+class ReplayController:
+    """Controle do player na reprodução: devolve a entrada do passo atual."""
+    def __init__(self):
+        self.state = decode_input(*NO_INPUT)
+
+    def read(self, player):
+        return self.state
+
+def load_replay(path):
+    """(SIM_STEP_MS da gravação, nome da biblioteca de mapas usada ('' se
+    nenhuma), lista de ReplaySegment com os passos em array)."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, step_ms, count, library = HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path} não é uma gravação compatível")
+    offset = HEADER.size
+    segments = []
+    for _ in range(count):
+        seed, width, height, grid_crc, difficulty, clock_time, last_spawn_time, steps, size = SEGMENT.unpack_from(data, offset)
+        offset += SEGMENT.size
+        records = np.frombuffer(zlib.decompress(data[offset:offset + size]), dtype=STEP, count=steps)
+        offset += size
+        segments.append(ReplaySegment(seed, width, height, grid_crc, difficulty.rstrip(b'\0').decode(),
+                                      clock_time, last_spawn_time, records))
+    return step_ms, library.rstrip(b'\0').decode(errors='replace'), segments
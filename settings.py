@@ -4,6 +4,11 @@ import pygame
 WIDTH = 1280
 HEIGHT = 720
 FPS = 60
+
+# Simulação em passo fixo (independente do FPS de desenho)
+SIMULATION_RATE = 60
+SIM_STEP_MS = 1000 / SIMULATION_RATE
+MAX_SIM_STEPS_PER_FRAME = 5 # Acima disso o jogo desacelera em vez de acumular atraso
 TILE_SIZE = 64
 
 # --- PALETA DE CORES ---
@@ -35,18 +40,66 @@ MAP_WIDTH = 80
 MAP_HEIGHT = 80
 WALK_STEPS = 15000
 
+# Camada estática (paredes/lava pré-desenhadas em chunks)
+CHUNK_TILES = 8         # Chunk de 8x8 tiles
+CHUNK_CACHE_SIZE = 32   # Quantos chunks ficam guardados (LRU)
+WORLD_CHUNK_CAPACITY = 256 # Chunks com tiles criados; passando disso, os mais longe do player são descartados
+
+# Atlas de lava (16 combinações de vizinhos x variações)
+LAVA_VARIANTS = 4
+LAVA_ATLAS_SEED = 666
+
+# Atlas de animação dos inimigos (quadros por ciclo)
+ENEMY_ANIMATION_FRAMES = 48   # Pulsação da gula e da luxúria
+SLOTH_ANIMATION_FRAMES = 64   # Deformação da preguiça (ciclo longo, dois senos)
+
+# Caches LRU de superfícies pequenas (brilhos/círculos e quadradinhos de partícula)
+SURFACE_CACHE_SIZE = 256
+PARTICLE_SURFACE_CACHE_SIZE = 512
+
+# Cache de rotações: ângulos arredondados para múltiplos do passo
+ROTATION_STEP = 2                         # Graus
+TEXT_ROTATION_STEP = 0.5                  # Texto balança pouco (±3 graus), passo mais fino
+ROTATION_CACHE_SIZE = 1024                # Entradas
+ROTATION_CACHE_BYTES = 16 * 1024 * 1024   # Teto de memória das imagens giradas
+MENU_ROTATION_CACHE_BYTES = 4 * 1024 * 1024
+
 # --- HORDA (OTIMIZADO) ---
 MAX_ENEMIES = 15        
 ENEMY_SPAWN_RATE = 1000 
 SPAWN_RADIUS_MIN = 1000 
 SPAWN_RADIUS_MAX = 2500
 
+# Separação entre inimigos (hash espacial)
+SPATIAL_HASH_CELL_SIZE = 128   # Maior que a maior hitbox comum (Pride = 100)
+SEPARATION_MAX_NEIGHBOURS = 8  # Máximo de vizinhos empurrando um inimigo por frame
+SEPARATION_QUERY_MARGIN = 16   # Folga para o que andou desde a reconstrução do hash
+
+# --- PARTÍCULAS ---
+PARTICLE_BUDGET = 1500          # Máximo de partículas vivas no mundo
+PARTICLE_BACKOFF_START = 0.75   # A partir de 75% do orçamento, emissões menos importantes rareiam
+PARTICLE_BACKOFF_MAX_STRIDE = 8 # No limite, só 1 de cada 8 emissões de baixa prioridade passa
+# Prioridades (maior vence na hora de despejar)
+PARTICLE_PRIORITY_AMBIENT = 0   # Aura, rastros, enfeites
+PARTICLE_PRIORITY_EFFECT = 1    # Tiro, fumaça de raiva
+PARTICLE_PRIORITY_GAMEPLAY = 2  # Avisos de estado (preguiça acordando, fase do boss)
+PARTICLE_PRIORITIES = (PARTICLE_PRIORITY_AMBIENT, PARTICLE_PRIORITY_EFFECT, PARTICLE_PRIORITY_GAMEPLAY)
+
+# Medidor de desempenho (F3)
+PERF_HISTORY_SECONDS = 10 # Tamanho do buffer circular
+PERF_REFRESH_MS = 250 # Intervalo entre atualizações do painel
+
+# Rastro de execução (F5 liga/desliga e salva o JSON)
+TRACE_BUFFER_EVENTS = 500000 # Passando disso, os eventos mais antigos são descartados
+
 # HUD
 RELOAD_ICON_SIZE = 64
 RELOAD_ICON_POS = (WIDTH // 2, HEIGHT - 100)
 
 # --- BOSS SETTINGS ---
 BOSS_TRIGGER_SCORE = 10
+ARENA_PREFETCH_SCORE = 7 # A partir deste placar a arena já é gerada em segundo plano
+BOSS_ANIMATION_FRAMES = 48 # Quadros pré-desenhados por ciclo da onda da capa
 
 # --- ARSENAL ---
 WEAPONS_DATA = {
@@ -0,0 +1,147 @@
+# surface_cache.py
+import collections
+import pygame
+from settings import *
+
+# -------------------------------------------------------------
+# CACHE LRU DE SUPERFÍCIES GERADAS
+# -------------------------------------------------------------
+class SurfaceCache:
+    """Guarda superfícies pequenas geradas por código (brilhos, círculos...)
+    pela chave que as descreve. Passando de `max_size` entradas (ou de
+    `max_bytes` de pixels, se definido), sai a menos usada."""
+
+    def __init__(self, max_size=SURFACE_CACHE_SIZE, max_bytes=None):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.surfaces = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def get(self, key, build):
+        """Superfície de `key`; na falta, chama `build()` e guarda o resultado."""
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = build()
+        self.surfaces[key] = surface
+        self.bytes += surface_bytes(surface)
+        while len(self.surfaces) > 1 and (len(self.surfaces) > self.max_size or
+                                          (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, evicted = self.surfaces.popitem(last=False)
+            self.bytes -= surface_bytes(evicted)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {'size': len(self.surfaces), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+# Cache compartilhado pelo processo inteiro
+surface_cache = SurfaceCache()
+
+def glow_surface(radius, color, alpha):
+    """Círculo de cor (r, g, b, alpha) num quadrado transparente de 2r x 2r."""
+    def build():
+        surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, (*color, alpha), (radius, radius), radius)
+        return surface
+    return surface_cache.get(('glow', radius, tuple(color), alpha), build)
+
+def circle_surface(radius, color, alpha=255):
+    """Círculo sólido num quadrado de 2r x 2r, com transparência da superfície inteira."""
+    def build():
+        surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        surface.set_alpha(alpha)
+        return surface
+    return surface_cache.get(('circle', radius, tuple(color), alpha), build)
+
+# -------------------------------------------------------------
+# CACHE DE ROTAÇÕES (ÂNGULOS ARREDONDADOS)
+# -------------------------------------------------------------
+class RotationCache:
+    """Guarda `pygame.transform.rotate` por imagem de origem e ângulo,
+    arredondando o ângulo para múltiplos de `step` graus."""
+
+    def __init__(self, step=ROTATION_STEP, max_size=ROTATION_CACHE_SIZE, max_bytes=ROTATION_CACHE_BYTES):
+        self.step = step
+        self.cache = SurfaceCache(max_size, max_bytes)
+
+    def snap(self, angle, step=None):
+        step = step or self.step
+        return round(angle / step) * step % 360
+
+    def rotate(self, surface, angle, key=None, step=None):
+        """Versão girada de `surface`. Quem gera a imagem de origem a cada
+        frame (texto, por exemplo) passa uma `key` que a descreve; senão a
+        própria superfície é a chave."""
+        snapped = self.snap(angle, step)
+        source_key = surface if key is None else key
+        return self.cache.get((source_key, snapped), lambda: pygame.transform.rotate(surface, snapped))
+
+    def stats(self):
+        return self.cache.stats()
+
+# Cache compartilhado pelo processo inteiro
+rotation_cache = RotationCache()
+
+def rotate(surface, angle, key=None, step=None):
+    return rotation_cache.rotate(surface, angle, key, step)
+
+# -------------------------------------------------------------
+# CAMADA ESTÁTICA DE TELA (DIRTY RECTS)
+# -------------------------------------------------------------
+class StaticLayer:
+    """Cópia da parte parada de uma tela, refeita só quando `key` muda.
+    A cada frame as áreas sujas do frame anterior são restauradas a partir
+    dela, os elementos animados são desenhados por cima e só essas áreas
+    precisam ir para o display."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.surface = pygame.Surface(screen.get_size())
+        self.key = None
+        self.full = True
+        self.previous = []
+        self.current = []
+
+    def invalidate(self):
+        self.key = None
+
+    def begin(self, key, draw_static):
+        """Prepara o frame; `draw_static()` desenha o fundo direto na tela."""
+        if key != self.key:
+            self.key = key
+            draw_static()
+            self.surface.blit(self.screen, (0, 0))
+            self.full = True
+        else:
+            for rect in self.previous:
+                self.screen.blit(self.surface, rect, rect)
+            self.full = False
+        self.current = []
+
+    def mark(self, rect):
+        if rect.width and rect.height: self.current.append(rect)
+
+    def end(self):
+        """Retângulos a passar para `pygame.display.update`."""
+        dirty = [self.screen.get_rect()] if self.full else self.previous + self.current
+        self.previous = self.current
+        return dirty
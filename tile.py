@@ -2,100 +2,125 @@
 import pygame
 import random 
 from settings import *
+from map_data import LAVA
 
-# --- CLASSE DA PAREDE (MANTENHA IGUAL) ---
-class Tile(pygame.sprite.Sprite):
+# --- CLASSE DA PAREDE (FLYWEIGHT) ---
+# Todas as paredes são iguais: a imagem é desenhada uma vez só e compartilhada.
+# Cada parede guarda apenas os dois rects (sem Sprite, sem Surface própria).
+class Tile:
+    __slots__ = ('rect', 'hitbox')
+    depth = 20
     _wall_base_image = None
-    
-    def __init__(self, pos, groups, map_data, row, col): 
-        super().__init__(groups)
-        
-        # (Mantenha todo o código da classe Tile exatamente como estava no passo anterior...)
-        # ...
-        # Se você não mudou nada na parede, basta manter o código dela aqui.
-        # Vou focar na classe LAVA abaixo.
-        
-        # ... (CÓDIGO DA CLASSE TILE OMITIDO PARA ECONOMIZAR ESPAÇO, MANTENHA O SEU) ...
-        # Se precisar do Tile completo de novo, me avise, mas o foco é a Lava.
-        
-        # --- REPETINDO O INICIO DO TILE SÓ PRA CONTEXTO ---
-        self.depth = 20 
-        self.image = pygame.Surface((TILE_SIZE, TILE_SIZE + self.depth), pygame.SRCALPHA)
-        front_rect = pygame.Rect(0, self.depth, TILE_SIZE, TILE_SIZE)
-        pygame.draw.rect(self.image, WALL_FRONT_COLOR, front_rect)
-        top_rect = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)
-        pygame.draw.rect(self.image, WALL_TOP_COLOR, top_rect)
-        pygame.draw.rect(self.image, (130, 40, 40), top_rect, 2) 
-        pygame.draw.rect(self.image, WALL_OUTLINE_COLOR, top_rect, 1)
-        pygame.draw.line(self.image, (30, 5, 5), (0, TILE_SIZE), (TILE_SIZE, TILE_SIZE), 4)
-        self.rect = self.image.get_rect(topleft=(pos[0], pos[1] - self.depth))
+
+    def __init__(self, pos):
+        if Tile._wall_base_image is None:
+            Tile._wall_base_image = Tile.build_wall_image()
+        self.rect = pygame.Rect(pos[0], pos[1] - self.depth, TILE_SIZE, TILE_SIZE + self.depth)
         self.hitbox = pygame.Rect(pos[0], pos[1], TILE_SIZE, TILE_SIZE)
 
+    @property
+    def image(self):
+        return Tile._wall_base_image
 
-# --- CLASSE DA LAVA (ATUALIZADA COM FUSÃO) ---
-class Lava(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, map_data, row, col): # <--- NOVOS ARGUMENTOS
-        super().__init__(groups)
-        
-        self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
+    @staticmethod
+    def build_wall_image():
+        depth = Tile.depth
+        image = pygame.Surface((TILE_SIZE, TILE_SIZE + depth), pygame.SRCALPHA)
+        front_rect = pygame.Rect(0, depth, TILE_SIZE, TILE_SIZE)
+        pygame.draw.rect(image, WALL_FRONT_COLOR, front_rect)
+        top_rect = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)
+        pygame.draw.rect(image, WALL_TOP_COLOR, top_rect)
+        pygame.draw.rect(image, (130, 40, 40), top_rect, 2) 
+        pygame.draw.rect(image, WALL_OUTLINE_COLOR, top_rect, 1)
+        pygame.draw.line(image, (30, 5, 5), (0, TILE_SIZE), (TILE_SIZE, TILE_SIZE), 4)
+        return image
+
+
+# --- CLASSE DA LAVA (ATLAS PRÉ-DESENHADO) ---
+# A textura de cada tile sai de um atlas montado uma vez só: LAVA_VARIANTS
+# variações para cada uma das 16 combinações de vizinhos N/S/L/O.
+# O tile só escolhe a entrada (máscara dos vizinhos + hash da posição).
+LAVA_N, LAVA_S, LAVA_E, LAVA_W = 1, 2, 4, 8
+
+class Lava:
+    __slots__ = ('rect', 'image')
+    _atlas = None
+
+    def __init__(self, pos, map_data, row, col):
+        if Lava._atlas is None:
+            Lava.build_atlas()
+
+        # Profundidade Inteligente (Fusão): máscara dos vizinhos que TAMBÉM são lava
+        # (map_data é a grade uint8 do MapData)
+        MAP_MAX_ROW = map_data.shape[0] - 1
+        MAP_MAX_COL = map_data.shape[1] - 1
+        mask = 0
+        if row > 0 and map_data[row - 1, col] == LAVA: mask |= LAVA_N
+        if row < MAP_MAX_ROW and map_data[row + 1, col] == LAVA: mask |= LAVA_S
+        if col < MAP_MAX_COL and map_data[row, col + 1] == LAVA: mask |= LAVA_E
+        if col > 0 and map_data[row, col - 1] == LAVA: mask |= LAVA_W
+
+        variant = ((col * 73856093) ^ (row * 19349663)) % LAVA_VARIANTS
+        self.image = Lava._atlas[mask][variant]
+        self.rect = self.image.get_rect(topleft=pos)
+
+    @classmethod
+    def build_atlas(cls):
+        # Gerador próprio: não mexe na semente do random global
+        rng = random.Random(LAVA_ATLAS_SEED)
+        cls._atlas = []
+        for mask in range(16):
+            variants = []
+            for _ in range(LAVA_VARIANTS):
+                texture = cls.draw_texture(rng)
+                cls.draw_edges(texture, mask)
+                variants.append(texture)
+            cls._atlas.append(variants)
+
+    @staticmethod
+    def draw_texture(rng):
+        image = pygame.Surface((TILE_SIZE, TILE_SIZE))
         
         # 1. Base: Magma Líquido
         BASE_MAGMA = (255, 80, 0)
-        self.image.fill(BASE_MAGMA)
-        
-        # Seed fixa para textura
-        random.seed(pos[0] * 342 + pos[1] * 523)
+        image.fill(BASE_MAGMA)
         
         # 2. Textura: "Crosta" (Magma esfriando)
         CRUST_COLOR = (180, 40, 0) 
         for _ in range(6):
-            w = random.randint(15, 40)
-            h = random.randint(8, 20)
-            x = random.randint(-10, TILE_SIZE)
-            y = random.randint(-10, TILE_SIZE)
-            pygame.draw.ellipse(self.image, CRUST_COLOR, (x, y, w, h))
+            w = rng.randint(15, 40)
+            h = rng.randint(8, 20)
+            x = rng.randint(-10, TILE_SIZE)
+            y = rng.randint(-10, TILE_SIZE)
+            pygame.draw.ellipse(image, CRUST_COLOR, (x, y, w, h))
             
         # 3. Detalhes: Bolhas de Calor
         BUBBLE_COLOR = (255, 220, 100) 
         for _ in range(4):
-            bx = random.randint(4, TILE_SIZE - 4)
-            by = random.randint(4, TILE_SIZE - 4)
-            radius = random.randint(1, 3)
-            pygame.draw.circle(self.image, BUBBLE_COLOR, (bx, by), radius)
+            bx = rng.randint(4, TILE_SIZE - 4)
+            by = rng.randint(4, TILE_SIZE - 4)
+            radius = rng.randint(1, 3)
+            pygame.draw.circle(image, BUBBLE_COLOR, (bx, by), radius)
+        return image
 
-        # 4. Profundidade Inteligente (Fusão)
+    @staticmethod
+    def draw_edges(image, mask):
         # Só desenha a borda se o vizinho NÃO for lava
-        
-        MAP_MAX_ROW = len(map_data) - 1
-        MAP_MAX_COL = len(map_data[0]) - 1
-        
-        neighbors = {
-            "N": row > 0 and map_data[row - 1][col] == 'L',
-            "S": row < MAP_MAX_ROW and map_data[row + 1][col] == 'L',
-            "E": col < MAP_MAX_COL and map_data[row][col + 1] == 'L',
-            "W": col > 0 and map_data[row][col - 1] == 'L',
-        }
-
         SHADOW_COLOR = (40, 0, 0) 
         BORDER_WIDTH = 3 # Largura da borda
         
         # Borda Norte (Topo)
-        if not neighbors['N']:
-            pygame.draw.rect(self.image, SHADOW_COLOR, (0, 0, TILE_SIZE, BORDER_WIDTH))
+        if not mask & LAVA_N:
+            pygame.draw.rect(image, SHADOW_COLOR, (0, 0, TILE_SIZE, BORDER_WIDTH))
             
         # Borda Sul (Baixo)
-        if not neighbors['S']:
-            pygame.draw.rect(self.image, SHADOW_COLOR, (0, TILE_SIZE - BORDER_WIDTH, TILE_SIZE, BORDER_WIDTH))
+        if not mask & LAVA_S:
+            pygame.draw.rect(image, SHADOW_COLOR, (0, TILE_SIZE - BORDER_WIDTH, TILE_SIZE, BORDER_WIDTH))
             
         # Borda Oeste (Esquerda)
-        if not neighbors['W']:
-            pygame.draw.rect(self.image, SHADOW_COLOR, (0, 0, BORDER_WIDTH, TILE_SIZE))
+        if not mask & LAVA_W:
+            pygame.draw.rect(image, SHADOW_COLOR, (0, 0, BORDER_WIDTH, TILE_SIZE))
             
         # Borda Leste (Direita)
-        if not neighbors['E']:
-            pygame.draw.rect(self.image, SHADOW_COLOR, (TILE_SIZE - BORDER_WIDTH, 0, BORDER_WIDTH, TILE_SIZE))
-        
-        random.seed()
-        
-        self.rect = self.image.get_rect(topleft=pos)
-        self.hitbox = self.rect.inflate(-20, -20)
\ No newline at end of file
+        if not mask & LAVA_E:
+            pygame.draw.rect(image, SHADOW_COLOR, (TILE_SIZE - BORDER_WIDTH, 0, BORDER_WIDTH, TILE_SIZE))
@@ -0,0 +1,121 @@
+# tracing.py
+import json
+import time
+import functools
+import threading
+import collections
+from settings import *
+
+# -------------------------------------------------------------
+# RASTRO DE EXECUÇÃO (formato Chrome Trace Event)
+# -------------------------------------------------------------
+class Span:
+    """Trecho medido com `with`: grava o evento ao sair do bloco."""
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.add(self.name, self.category, self.start, time.perf_counter(), self.args)
+        return False
+
+class NoSpan:
+    """O que `span()` devolve com o rastro desligado: não faz nada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NO_SPAN = NoSpan()
+
+class Tracer:
+    """Guarda trechos (início + duração) num buffer em memória, que pode ser
+    salvo como JSON do Chrome e aberto no Perfetto ou em chrome://tracing.
+    Desligado, cada ponto de medição custa só a leitura de `enabled`.
+    O buffer tem tamanho fixo: passando dele, somem os eventos mais antigos."""
+
+    def __init__(self, capacity=TRACE_BUFFER_EVENTS):
+        self.enabled = False
+        self.events = collections.deque(maxlen=capacity)
+        self.recorded = 0
+        self.thread_names = {}
+        self.origin = time.perf_counter()
+
+    def start(self):
+        self.events.clear()
+        self.recorded = 0
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def span(self, name, category='game', args=None):
+        if not self.enabled: return NO_SPAN
+        return Span(self, name, category, args)
+
+    def add(self, name, category, start, end, args=None):
+        """Trecho já medido (`start`/`end` em segundos do perf_counter)."""
+        self.events.append(('X', name, category, start, end - start, self.thread_id(), args))
+        self.recorded += 1
+
+    def counter(self, name, values):
+        """Valores numéricos (viram um gráfico no visualizador)."""
+        self.events.append(('C', name, 'counters', time.perf_counter(), 0.0, self.thread_id(), values))
+        self.recorded += 1
+
+    def thread_id(self):
+        # deque.append é seguro entre threads; o nome é guardado para o JSON
+        ident = threading.get_ident()
+        if ident not in self.thread_names:
+            self.thread_names[ident] = threading.current_thread().name
+        return ident
+
+    # --- EXPORTAÇÃO ---
+    def trace_events(self):
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': ident, 'args': {'name': name}}
+                  for ident, name in self.thread_names.items()]
+        for phase, name, category, start, duration, ident, args in list(self.events):
+            event = {'name': name, 'cat': category, 'ph': phase, 'pid': 1, 'tid': ident,
+                     'ts': round((start - self.origin) * 1e6, 3)}
+            if phase == 'X': event['dur'] = round(duration * 1e6, 3)
+            if args: event['args'] = args
+            events.append(event)
+        return events
+
+    def dump(self, path=None):
+        """Salva o buffer e retorna o caminho do arquivo."""
+        path = path or time.strftime('trace_%Y%m%d_%H%M%S.json')
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms',
+                       'otherData': {'recorded': self.recorded, 'kept': len(self.events)}}, file)
+        return path
+
+# Rastro compartilhado pelo processo inteiro
+tracer = Tracer()
+
+def traced(category, name=None):
+    """Decorador: mede cada chamada da função como um trecho de `category`."""
+    def decorate(function):
+        label = name or function.__qualname__
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled: return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.add(label, category, start, time.perf_counter())
+        return wrapper
+    return decorate
@@ -0,0 +1,136 @@
+# world.py
+import numpy as np
+from settings import *
+from tile import Tile, Lava
+from map_data import WALL, LAVA, TileIndex
+from collision import WALL_LAYER, LAVA_LAYER
+
+# -------------------------------------------------------------
+# MUNDO EM CHUNKS (CRIADOS PERTO DE QUEM PRECISA, DESCARTADOS LONGE)
+# -------------------------------------------------------------
+class WorldChunk:
+    """Os tiles de CHUNK_TILES x CHUNK_TILES células: o objeto (Tile/Lava)
+    e o rect de colisão de cada camada, indexados por (coluna, linha)."""
+    __slots__ = ('tiles', 'rects')
+
+    def __init__(self):
+        self.tiles = {}
+        self.rects = {WALL_LAYER: {}, LAVA_LAYER: {}}
+
+class World:
+    """O mapa inteiro fica só na grade do MapData (1 byte por tile). Os tiles
+    de um chunk são criados na primeira vez que alguém precisa dele (a
+    câmera desenhando, uma colisão perto de um inimigo...) e, passando de
+    `capacity` chunks, os mais longe do player são descartados: recriá-los
+    da grade dá exatamente os mesmos rects. Os tiles de spawn ficam
+    agrupados por chunk, para sortear só entre os que estão perto."""
+
+    LAYER_CODES = {WALL_LAYER: WALL, LAVA_LAYER: LAVA}
+
+    def __init__(self, data, capacity=WORLD_CHUNK_CAPACITY):
+        self.data = data
+        self.grid = data.grid
+        self.capacity = capacity
+        self.chunk_cols = -(-data.width // CHUNK_TILES)
+        self.chunk_rows = -(-data.height // CHUNK_TILES)
+        self.chunks = {}
+        self.evicted = 0
+        self.on_evict = [] # Chamados com a chave (coluna, linha) de cada chunk descartado
+
+        # Retângulo de cada camada relativo à sua célula (a parede vaza para cima)
+        self.shapes = {WALL_LAYER: (0, -Tile.depth, TILE_SIZE, TILE_SIZE + Tile.depth),
+                       LAVA_LAYER: (0, 0, TILE_SIZE, TILE_SIZE)}
+        self.present, self.margins = {}, {}
+        for layer, code in self.LAYER_CODES.items():
+            dx, dy, w, h = self.shapes[layer]
+            self.present[layer] = bool((self.grid == code).any())
+            self.margins[layer] = max(-dx, -dy, dx + w - TILE_SIZE, dy + h - TILE_SIZE) if self.present[layer] else 0
+        self.overflow = self.margins[WALL_LAYER]
+
+        # Spawns ordenados por chunk (estável: dentro do chunk, na ordem das linhas)
+        rows, cols = np.divmod(data.spawn_index, data.width)
+        chunk_ids = (rows // CHUNK_TILES) * self.chunk_cols + cols // CHUNK_TILES
+        order = np.argsort(chunk_ids, kind='stable')
+        self.spawn_index = data.spawn_index[order]
+        self.spawn_starts = np.searchsorted(chunk_ids[order], np.arange(self.chunk_cols * self.chunk_rows + 1))
+
+    def chunk(self, chunk_col, chunk_row):
+        key = (chunk_col, chunk_row)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = self.build_chunk(chunk_col, chunk_row)
+        return chunk
+
+    def tile(self, col, row):
+        return self.chunk(col // CHUNK_TILES, row // CHUNK_TILES).tiles.get((col, row))
+
+    def build_chunk(self, chunk_col, chunk_row):
+        chunk = WorldChunk()
+        if not (0 <= chunk_col < self.chunk_cols and 0 <= chunk_row < self.chunk_rows):
+            return chunk # Fora do mapa: vazio
+        first_col = chunk_col * CHUNK_TILES
+        first_row = chunk_row * CHUNK_TILES
+        block = self.grid[first_row:first_row + CHUNK_TILES, first_col:first_col + CHUNK_TILES]
+        for row, col in np.argwhere(block == WALL).tolist():
+            row += first_row
+            col += first_col
+            wall = Tile((col * TILE_SIZE, row * TILE_SIZE))
+            chunk.tiles[(col, row)] = wall
+            chunk.rects[WALL_LAYER][(col, row)] = wall.rect
+        for row, col in np.argwhere(block == LAVA).tolist():
+            row += first_row
+            col += first_col
+            lava = Lava((col * TILE_SIZE, row * TILE_SIZE), self.grid, row, col)
+            chunk.tiles[(col, row)] = lava
+            chunk.rects[LAVA_LAYER][(col, row)] = lava.rect
+        return chunk
+
+    def stream(self, center):
+        """Chamado a cada passo: se há chunks demais, descarta os mais longe de
+        `center` (pixels) até sobrar 3/4 da capacidade (assim o descarte não
+        roda de novo no passo seguinte)."""
+        if len(self.chunks) <= self.capacity: return
+        chunk_px = CHUNK_TILES * TILE_SIZE
+        center_col, center_row = center[0] // chunk_px, center[1] // chunk_px
+        by_distance = sorted(self.chunks, key=lambda key: max(abs(key[0] - center_col), abs(key[1] - center_row)))
+        for key in by_distance[self.capacity * 3 // 4:]:
+            del self.chunks[key]
+            self.evicted += 1
+            for callback in self.on_evict: callback(key)
+
+    def spawn_candidates(self, center, radius):
+        """Tiles de spawn dos chunks que encostam no quadrado de lado 2 * `radius`
+        em volta de `center` (pixels), como uma TileIndex."""
+        chunk_px = CHUNK_TILES * TILE_SIZE
+        first_col = max(0, int((center[0] - radius) // chunk_px))
+        last_col = min(self.chunk_cols - 1, int((center[0] + radius) // chunk_px))
+        first_row = max(0, int((center[1] - radius) // chunk_px))
+        last_row = min(self.chunk_rows - 1, int((center[1] + radius) // chunk_px))
+        blocks = []
+        for chunk_row in range(first_row, last_row + 1):
+            # Chunks vizinhos na mesma linha são contíguos no índice ordenado
+            start = self.spawn_starts[chunk_row * self.chunk_cols + first_col]
+            end = self.spawn_starts[chunk_row * self.chunk_cols + last_col + 1]
+            blocks.append(self.spawn_index[start:end])
+        index = np.concatenate(blocks) if blocks else self.spawn_index[:0]
+        return TileIndex(index, self.data.width)
+
+    def cell_bounds(self, layer, first_row, last_row, first_col, last_col):
+        """Matriz (linhas, colunas, 4) com left/top/right/bottom do tile da
+        `layer` em cada célula da janela (cortada nas bordas do mapa), tirada
+        direto da grade; células sem tile ficam com tamanho zero."""
+        first_row, first_col = max(first_row, 0), max(first_col, 0)
+        last_row, last_col = min(last_row, self.data.height), min(last_col, self.data.width)
+        if last_row <= first_row or last_col <= first_col:
+            return np.zeros((0, 0, 4), dtype=np.int32)
+        present = self.grid[first_row:last_row, first_col:last_col] == self.LAYER_CODES[layer]
+        dx, dy, w, h = self.shapes[layer]
+        lefts = np.arange(first_col, last_col, dtype=np.int32) * TILE_SIZE + dx
+        tops = np.arange(first_row, last_row, dtype=np.int32) * TILE_SIZE + dy
+        bounds = np.zeros(present.shape + (4,), dtype=np.int32)
+        bounds[..., 0] = lefts[None, :]
+        bounds[..., 1] = tops[:, None]
+        bounds[..., 2] = lefts[None, :] + w
+        bounds[..., 3] = tops[:, None] + h
+        bounds[~present] = 0
+        return bounds